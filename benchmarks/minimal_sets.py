@@ -0,0 +1,70 @@
+"""Compare the algorithms for the minimal set of Motzkin paths for avoiding a
+pattern on the examples in the __main__ block of motzkin.motzkinpatterns.
+
+Each variant is run on each pattern in a fresh process, which is stopped after
+the timeout, so that the caches of one run do not help another.
+
+    python benchmarks/minimal_sets.py [--timeout SECONDS] [PATTERN ...]
+"""
+import argparse
+import multiprocessing
+import queue as queue_module
+import time
+
+from motzkin import MotzkinPath
+
+EXAMPLES = ["HHUUDUUHUU", "UUDU", "UDDUUUDUD", "DDUUDU", "DD"]
+
+VARIANTS = {
+    "new": MotzkinPath._compute_minimal_set_for_avoidance,
+    "bfs": MotzkinPath.minimal_set_for_avoidance_bfs,
+    "rec": MotzkinPath.minimal_set_for_avoidance_rec,
+}
+
+
+def _run(variant, word, queue):
+    patt = MotzkinPath(word, pattern=True)
+    start = time.perf_counter()
+    res = VARIANTS[variant](patt)
+    queue.put((time.perf_counter() - start, sorted(str(p) for p in res)))
+
+
+def time_variant(variant, word, timeout):
+    """Return the time taken and the minimal set found, or None if the variant
+    did not finish within timeout seconds."""
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_run, args=(variant, word, queue))
+    process.start()
+    try:
+        return queue.get(timeout=timeout)
+    except queue_module.Empty:
+        return None
+    finally:
+        process.terminate()
+        process.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("patterns", nargs="*", default=EXAMPLES)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+    print("{:<12}{:>8}".format("pattern", "size"), end="")
+    for variant in VARIANTS:
+        print("{:>12}".format(variant), end="")
+    print()
+    for word in args.patterns:
+        results = {v: time_variant(v, word, args.timeout) for v in VARIANTS}
+        finished = [res[1] for res in results.values() if res is not None]
+        if any(basis != finished[0] for basis in finished):
+            raise AssertionError("The variants disagree on {}".format(word))
+        size = len(finished[0]) if finished else "?"
+        print("{:<12}{:>8}".format(word, size), end="")
+        for res in results.values():
+            cell = "timeout" if res is None else "{:.4f}s".format(res[0])
+            print("{:>12}".format(cell), end="")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""Time the primitives on Motzkin paths, the construction of sets of Motzkin
+paths, the generation of their paths, their emptiness checks and whole
+searches for specifications, and compare two such runs.
+
+Every benchmark draws its inputs from a random number generator with a fixed
+seed, and every repeat starts with the caches of the library cleared, so that
+two runs on the same machine time the same work. The results, with the
+minimum, median and mean of the repeats, are written as JSON.
+
+    python benchmarks/suite.py run [--output FILE] [--repeat N] [--seed N]
+        [--group micro|macro] [BENCHMARK ...]
+    python benchmarks/suite.py compare [--threshold FRACTION] BASE NEW
+
+The comparison shows the ratio of the medians of each benchmark and exits
+with status 1 if one of them is slower by more than the threshold.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from random import Random
+
+import logzero
+
+from motzkin import (
+    MotzkinPath,
+    MotzkinPaths,
+    MotzkinPathsStartingWithH,
+    MotzkinPathsStartingWithU,
+    MotzkinSpecificationFinder,
+)
+from motzkin.cache import clear_caches
+
+SEARCHES = [["UUHD", "DDHU"], ["UHD"], ["HUD", "UDU"], ["HUHD"]]
+
+
+def _words(rng, number, length):
+    return ["".join(rng.choice("UDH") for _ in range(length)) for _ in range(number)]
+
+
+def _patterns(rng, number, length):
+    return [MotzkinPath(word, pattern=True) for word in _words(rng, number, length)]
+
+
+def _bases(rng, number):
+    return [_words(rng, rng.randint(1, 2), rng.randint(2, 4)) for _ in range(number)]
+
+
+def setup_contains(rng):
+    paths = MotzkinPaths().random_samples(30, 500, rng)
+    patterns = _patterns(rng, 50, 5)
+    return lambda: [path.contains(patt) for path in paths for patt in patterns]
+
+
+def setup_minimal_sets(rng):
+    patterns = _patterns(rng, 200, 7)
+    return lambda: [patt.minimal_set_for_avoidance() for patt in patterns]
+
+
+def setup_construction(rng):
+    bases = _bases(rng, 1000)
+    return lambda: [MotzkinPaths(basis) for basis in bases]
+
+
+def setup_objects(rng):
+    comb_class = MotzkinPaths(_words(rng, 1, 3))
+    return lambda: sum(1 for _ in comb_class.objects_of_size(14))
+
+
+def setup_objects_h(rng):
+    patterns = _patterns(rng, 1, 3)
+    comb_class = MotzkinPathsStartingWithH(patterns)
+    return lambda: sum(1 for _ in comb_class.objects_of_size(14))
+
+
+def setup_objects_u(rng):
+    patterns = _patterns(rng, 1, 3)
+    comb_class = MotzkinPathsStartingWithU(patterns)
+    return lambda: sum(1 for _ in comb_class.objects_of_size(14))
+
+
+def setup_is_empty(rng):
+    classes = [
+        MotzkinPaths(avoids, [contains])
+        for avoids, contains in zip(_bases(rng, 1000), _bases(rng, 1000))
+    ]
+    return lambda: [comb_class.is_empty() for comb_class in classes]
+
+
+def _setup_search(patterns):
+    def setup(_):
+        return lambda: MotzkinSpecificationFinder(patterns).auto_search()
+
+    return setup
+
+
+# the benchmarks by name, with their group and the function returning the
+# function to time
+BENCHMARKS = {
+    "contains": ("micro", setup_contains),
+    "minimal_set_for_avoidance": ("micro", setup_minimal_sets),
+    "construction": ("micro", setup_construction),
+    "objects_of_size": ("micro", setup_objects),
+    "objects_of_size_h": ("micro", setup_objects_h),
+    "objects_of_size_u": ("micro", setup_objects_u),
+    "is_empty": ("micro", setup_is_empty),
+}
+for _patterns_searched in SEARCHES:
+    BENCHMARKS["search_" + "_".join(_patterns_searched)] = (
+        "macro",
+        _setup_search(_patterns_searched),
+    )
+
+
+def time_benchmark(name, repeat, seed):
+    """Return the times of repeat runs of the benchmark, each with fresh
+    caches and inputs drawn with the seed."""
+    setup = BENCHMARKS[name][1]
+    times = []
+    for _ in range(repeat):
+        clear_caches()
+        run = setup(Random(seed))
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def _commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    names = args.benchmarks or [
+        name
+        for name, (group, _) in BENCHMARKS.items()
+        if args.group is None or group == args.group
+    ]
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        raise SystemExit("Unknown benchmarks: {}".format(", ".join(unknown)))
+    # the benchmarks must not read specifications or minimal sets from disk,
+    # the library only reads these variables when first asked for them
+    os.environ.pop("MOTZKIN_SPECIFICATION_CACHE", None)
+    os.environ.pop("MOTZKIN_MINIMAL_SET_STORE", None)
+    logzero.loglevel(logging.WARNING)
+    results = {}
+    for name in names:
+        times = time_benchmark(name, args.repeat, args.seed)
+        results[name] = {
+            "group": BENCHMARKS[name][0],
+            "times": times,
+            "min": min(times),
+            "median": statistics.median(times),
+            "mean": statistics.mean(times),
+        }
+        print("{:<32}{:>12.4f}s".format(name, results[name]["median"]))
+    data = {
+        "meta": {
+            "commit": _commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "benchmarks": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(data, f, indent=2)
+
+
+def compare(args):
+    with open(args.base) as f:
+        base = json.load(f)["benchmarks"]
+    with open(args.new) as f:
+        new = json.load(f)["benchmarks"]
+    regressions = []
+    print("{:<32}{:>12}{:>12}{:>10}".format("benchmark", "base", "new", "ratio"))
+    for name in sorted(set(base) & set(new)):
+        ratio = new[name]["median"] / base[name]["median"]
+        flag = ""
+        if ratio > 1 + args.threshold:
+            regressions.append(name)
+            flag = "  slower"
+        elif ratio < 1 / (1 + args.threshold):
+            flag = "  faster"
+        print(
+            "{:<32}{:>11.4f}s{:>11.4f}s{:>10.2f}{}".format(
+                name, base[name]["median"], new[name]["median"], ratio, flag
+            )
+        )
+    for name in sorted(set(base) ^ set(new)):
+        print("{:<32}  only in {}".format(name, "base" if name in base else "new"))
+    if regressions:
+        print("Regressions: {}".format(", ".join(regressions)))
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    subparsers = parser.add_subparsers(dest="command")
+    run_parser = subparsers.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("benchmarks", nargs="*", help="the benchmarks to run")
+    run_parser.add_argument("--output", default="benchmarks.json")
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--group", choices=["micro", "macro"], default=None)
+    compare_parser = subparsers.add_parser("compare", help="compare two runs")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="the fraction by which a benchmark may be slower",
+    )
+    args = parser.parse_args()
+    if args.command is None:
+        parser.error("a command, run or compare, is required")
+    if args.command == "run":
+        run(args)
+    else:
+        compare(args)
+
+
+if __name__ == "__main__":
+    main()
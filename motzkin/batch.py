@@ -0,0 +1,176 @@
+"""This module contains a batch of Motzkin paths of the same size, stored as
+a NumPy array, with vectorised versions of the methods of MotzkinPath.
+
+NumPy is an optional dependency, install it with the extra 'numpy'."""
+from typing import Iterable, List, Optional, Union
+
+import numpy as np
+
+from .motzkinpatterns import CrossingPattern, MotzkinPath, _codes
+
+__all__ = ["PathBatch"]
+
+
+class PathBatch:
+    """A batch of N words of the same size n over {U, D, H}, stored as an
+    (N, n) array of uint8 letter codes, D = 0, H = 1 and U = 2, the same
+    codes as the packed form of MotzkinPath."""
+
+    def __init__(self, steps: np.ndarray):
+        steps = np.asarray(steps, dtype=np.uint8)
+        if steps.ndim != 2:
+            raise ValueError("The steps must be a two dimensional array.")
+        if steps.size and steps.max() > 2:
+            raise ValueError('All letters must be "U", "D", or "H"')
+        self.steps = steps
+
+    @classmethod
+    def from_paths(cls, paths: Iterable[MotzkinPath], size: int = -1) -> "PathBatch":
+        """Return the batch of the paths, which must all have the same size.
+        The size must be given if paths may be empty."""
+        paths = list(paths)
+        if size < 0:
+            if not paths:
+                raise ValueError("The size of an empty batch must be given.")
+            size = len(paths[0])
+        if any(len(path) != size for path in paths):
+            raise ValueError("All paths must have the same size.")
+        data = b"".join([_codes(path._key) for path in paths])
+        return cls(np.frombuffer(data, dtype=np.uint8).reshape(len(paths), size))
+
+    def to_paths(self) -> List[MotzkinPath]:
+        """Return the words as MotzkinPath, those that are not Motzkin paths
+        are patterns."""
+        count, size = self.steps.shape
+        pad = -size & 3
+        steps = self.steps
+        if pad:
+            steps = np.hstack([steps, np.zeros((count, pad), dtype=np.uint8)])
+        groups = steps.reshape(count, (size + pad) >> 2, 4)
+        packed = (
+            (groups[..., 0] << 6)
+            | (groups[..., 1] << 4)
+            | (groups[..., 2] << 2)
+            | groups[..., 3]
+        ).astype(np.uint8)
+        sentinel = 1 << (2 * size)
+        valid = self.motzkin_mask()
+        return [
+            MotzkinPath._from_key(
+                (int.from_bytes(row.tobytes(), "big") >> (2 * pad)) | sentinel,
+                not is_valid,
+            )
+            for row, is_valid in zip(packed, valid.tolist())
+        ]
+
+    @property
+    def size(self) -> int:
+        """The size of each path in the batch."""
+        return int(self.steps.shape[1])
+
+    def heights(self) -> np.ndarray:
+        """Return the (N, n + 1) array of the heights of each path."""
+        count, size = self.steps.shape
+        heights = np.zeros((count, size + 1), dtype=np.int32)
+        np.cumsum(self.steps.astype(np.int32) - 1, axis=1, out=heights[:, 1:])
+        return heights
+
+    def motzkin_mask(self) -> np.ndarray:
+        """Return the mask of the rows that are Motzkin paths."""
+        heights = self.heights()
+        res: np.ndarray = (heights.min(axis=1) >= 0) & (heights[:, -1] == 0)
+        return res
+
+    def first_returns(self) -> np.ndarray:
+        """Return the index of the first return of each path, as used by
+        MotzkinPath.split. If a path has no return it is the last index, and
+        for paths of size 0 it is 0."""
+        if not self.size:
+            return np.zeros(len(self.steps), dtype=np.intp)
+        returns = (self.steps == 0) & (self.heights()[:, 1:] == 0)
+        res: np.ndarray = returns.argmax(axis=1)
+        res[~returns.any(axis=1)] = self.size - 1
+        return res
+
+    def _contains(self, patt: MotzkinPath, active: Optional[np.ndarray]) -> np.ndarray:
+        codes = np.frombuffer(_codes(patt._key), dtype=np.uint8)
+        # a code no letter matches, reached once the pattern is found
+        codes = np.append(codes, np.uint8(255))
+        progress = np.zeros(len(self.steps), dtype=np.intp)
+        for j in range(self.size):
+            found = self.steps[:, j] == codes[progress]
+            if active is not None:
+                found &= active[:, j]
+            progress += found
+        res: np.ndarray = progress == len(codes) - 1
+        return res
+
+    def contains_mask(self, patt: Union[CrossingPattern, MotzkinPath]) -> np.ndarray:
+        """Return the mask of the paths containing the pattern."""
+        if isinstance(patt, CrossingPattern):
+            before = (
+                np.arange(self.size)[np.newaxis, :]
+                <= self.first_returns()[:, np.newaxis]
+            )
+            res: np.ndarray = self._contains(patt.left, before) & self._contains(
+                patt.right, ~before
+            )
+            return res
+        return self._contains(patt, None)
+
+    def avoidance_mask(
+        self, patterns: Iterable[Union[CrossingPattern, MotzkinPath]]
+    ) -> np.ndarray:
+        """Return the mask of the paths avoiding all the patterns."""
+        res = np.ones(len(self.steps), dtype=bool)
+        for patt in patterns:
+            res &= ~self.contains_mask(patt)
+        return res
+
+    def membership_mask(self, motzkin_paths) -> np.ndarray:
+        """Return the mask of the paths in the set of Motzkin paths, moving
+        all the rows through the states of its matcher at once."""
+        matcher = motzkin_paths.matcher()
+        count, size = self.steps.shape
+        res = self.motzkin_mask()
+        if size == 0:
+            res &= matcher.first is None and matcher.is_accepting(matcher.start)
+            return res
+        if matcher.first is not None:
+            res &= self.steps[:, 0] == matcher.first
+        states = np.full(count, matcher.start, dtype=np.int64)
+        returns = self.first_returns() if matcher.crossing else None
+        for j in range(size):
+            states = self._step(matcher, states, self.steps[:, j].astype(np.int64))
+            if returns is not None:
+                crossing = returns == j
+                states[crossing] = self._step(
+                    matcher, states[crossing], np.int64(matcher.CROSS)
+                )
+        unique, inverse = np.unique(states, return_inverse=True)
+        accepting = np.array([matcher.is_accepting(s) for s in unique.tolist()])
+        res &= accepting[inverse.reshape(-1)].astype(bool)
+        return res
+
+    @staticmethod
+    def _step(matcher, states: np.ndarray, codes) -> np.ndarray:
+        keys = states * 4 + codes
+        unique, inverse = np.unique(keys, return_inverse=True)
+        new = np.array(
+            [matcher.step(key >> 2, key & 3) for key in unique.tolist()],
+            dtype=np.int64,
+        )
+        return new[inverse.reshape(-1)]
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    def __getitem__(self, index):
+        """Return the path in row index, or for a slice, an index array or a
+        mask the batch of those rows."""
+        if isinstance(index, (int, np.integer)):
+            return PathBatch(self.steps[[index]]).to_paths()[0]
+        return PathBatch(self.steps[index])
+
+    def __repr__(self) -> str:
+        return "PathBatch({} paths of size {})".format(len(self), self.size)
@@ -0,0 +1,390 @@
+"""This module contains a compact binary form of Motzkin paths, crossing
+patterns, sets of Motzkin paths, the strategies of MotzkinPack and the
+specifications made from them, much smaller and quicker to read than JSON.
+
+The data starts with MAGIC, the version and the kind of object stored. The
+integers are unsigned varints, seven bits to a byte. A path is the varint of
+its key, two bits per step, shifted to make room for its pattern flag, and a
+crossing pattern is its left and right paths. A set of paths is its kind,
+then its avoids and its lists of contains, each with its length first. A
+specification stores each of its sets once, in a table, and its rules refer
+to them by their index.
+
+If trusted is True, the data must have been written by to_binary, and the sets
+are made from the normalised patterns as stored, without normalising them
+again, and the rules of a specification get their children, and those that
+are not empty, as stored, without applying the strategies and checking their
+children for emptiness. Otherwise the paths are checked and the sets and
+rules are made as from_dict makes them.
+
+    data = to_binary(spec)
+    spec = from_binary(data, trusted=True)"""
+import json
+from typing import Any, Callable, Dict, List, Tuple, Union
+
+from comb_spec_searcher import CombinatorialSpecification
+from comb_spec_searcher.strategies.rule import (
+    AbstractRule,
+    EquivalencePathRule,
+    EquivalenceRule,
+    ReverseRule,
+    Rule,
+    VerificationRule,
+)
+from comb_spec_searcher.strategies.strategy import (
+    AbstractStrategy,
+    Strategy,
+    VerificationStrategy,
+)
+
+from .motzkinpaths import (
+    MotzkinPaths,
+    MotzkinPathsStartingWithH,
+    MotzkinPathsStartingWithU,
+)
+from .motzkinpatterns import CrossingPattern, MotzkinPath
+from .strategies import Expansion, Factor, PattInsertion
+
+__all__ = ["from_binary", "to_binary"]
+
+MAGIC = b"MZK"
+VERSION = 1
+
+# the kinds of object stored
+PATH, CROSSING_PATTERN, CLASS, STRATEGY, SPECIFICATION = range(5)
+# the kinds of set of paths, in the order of KIND_CLASSES
+KIND_CLASSES = (MotzkinPaths, MotzkinPathsStartingWithH, MotzkinPathsStartingWithU)
+# the strategies and rules, anything else is stored as JSON
+EXPANSION, FACTOR, PATT_INSERTION, STRATEGY_JSON = range(4)
+RULE, VERIFICATION_RULE, EQUIVALENCE_RULE, EQUIVALENCE_PATH_RULE = range(4)
+REVERSE_RULE, RULE_JSON = 4, 5
+FLAGS = ("ignore_parent", "inferrable", "possibly_empty", "workable")
+
+Pattern = Union[MotzkinPath, CrossingPattern]
+
+
+class _Writer:
+    def __init__(self) -> None:
+        self.data = bytearray()
+        # the indices of the sets in the table of a specification
+        self.classes: Dict[MotzkinPaths, int] = {}
+
+    def uint(self, n: int) -> None:
+        while n > 0x7F:
+            self.data.append((n & 0x7F) | 0x80)
+            n >>= 7
+        self.data.append(n)
+
+    def path(self, path: MotzkinPath) -> None:
+        self.uint(path._key << 1 | path.pattern)
+
+    def crossing_pattern(self, patt: CrossingPattern) -> None:
+        self.path(patt.left)
+        self.path(patt.right)
+
+    def json(self, d: dict) -> None:
+        encoded = json.dumps(d, separators=(",", ":")).encode()
+        self.uint(len(encoded))
+        self.data += encoded
+
+    def comb_class(self, comb_class: MotzkinPaths) -> None:
+        kind = KIND_CLASSES.index(type(comb_class))
+        write: Callable[[Any], None] = self.path
+        if kind == 2:
+            write = self.crossing_pattern
+        self.data.append(kind)
+        self.uint(len(comb_class.avoids))
+        for patt in comb_class.avoids:
+            write(patt)
+        self.uint(len(comb_class.contains))
+        for p_list in comb_class.contains:
+            self.uint(len(p_list))
+            for other in p_list:
+                write(other)
+
+    def class_index(self, comb_class: MotzkinPaths) -> None:
+        self.uint(self.classes[comb_class])
+
+    def strategy(self, strategy: AbstractStrategy) -> None:
+        tag = {Expansion: EXPANSION, Factor: FACTOR, PattInsertion: PATT_INSERTION}
+        kind = tag.get(type(strategy), STRATEGY_JSON)
+        self.data.append(kind)
+        if kind == STRATEGY_JSON:
+            self.json(strategy.to_jsonable())
+            return
+        d = strategy.to_jsonable()
+        self.data.append(sum(1 << i for i, flag in enumerate(FLAGS) if d[flag]))
+        if kind == PATT_INSERTION:
+            assert isinstance(strategy, PattInsertion)
+            if isinstance(strategy.pattern, CrossingPattern):
+                self.data.append(1)
+                self.crossing_pattern(strategy.pattern)
+            else:
+                self.data.append(0)
+                self.path(strategy.pattern)
+
+    def rule(self, rule: AbstractRule) -> None:
+        if isinstance(rule, EquivalencePathRule):
+            self.data.append(EQUIVALENCE_PATH_RULE)
+            self.uint(len(rule.rules))
+            for r in rule.rules:
+                self.rule(r)
+        elif isinstance(rule, EquivalenceRule):
+            self.data.append(EQUIVALENCE_RULE)
+            self.rule(rule.original_rule)
+        elif isinstance(rule, ReverseRule):
+            self.data.append(REVERSE_RULE)
+            self.rule(rule.original_rule)
+            self.uint(rule.idx)
+            self.non_empty_mask(rule)
+        elif type(rule) is VerificationRule:
+            self.data.append(VERIFICATION_RULE)
+            self.strategy(rule.strategy)
+            self.class_index(rule.comb_class)
+        elif type(rule) is Rule:
+            self.data.append(RULE)
+            self.strategy(rule.strategy)
+            self.class_index(rule.comb_class)
+            self.uint(len(rule.children))
+            for child in rule.children:
+                self.class_index(child)
+            self.non_empty_mask(rule)
+        else:
+            self.data.append(RULE_JSON)
+            self.json(rule.to_jsonable())
+
+    def non_empty_mask(self, rule: AbstractRule) -> None:
+        """Write the children of the rule that are not empty, as a bit mask."""
+        non_empty = set(rule.non_empty_children())
+        self.uint(sum(1 << i for i, c in enumerate(rule.children) if c in non_empty))
+
+    def specification(self, spec: CombinatorialSpecification) -> None:
+        rules = list(spec.rules_dict.values())
+        table = [spec.root]
+        for rule in rules:
+            table.extend(_classes_of(rule))
+        for comb_class in table:
+            if comb_class not in self.classes:
+                self.classes[comb_class] = len(self.classes)
+        self.uint(len(self.classes))
+        for comb_class in self.classes:
+            self.comb_class(comb_class)
+        self.class_index(spec.root)
+        self.uint(len(rules))
+        for rule in rules:
+            self.rule(rule)
+
+
+def _classes_of(rule: AbstractRule) -> List[MotzkinPaths]:
+    """Return the sets of the rule and of the rules it is made from."""
+    if isinstance(rule, EquivalencePathRule):
+        return [c for r in rule.rules for c in _classes_of(r)]
+    if isinstance(rule, (EquivalenceRule, ReverseRule)):
+        return _classes_of(rule.original_rule)
+    if type(rule) is VerificationRule:
+        return [rule.comb_class]
+    if type(rule) is Rule:
+        return [rule.comb_class, *rule.children]
+    return []
+
+
+class _Reader:
+    def __init__(self, data: bytes, trusted: bool) -> None:
+        self.data = data
+        self.position = 0
+        self.trusted = trusted
+        self.classes: List[MotzkinPaths] = []
+
+    def byte(self) -> int:
+        res = self.data[self.position]
+        self.position += 1
+        return res
+
+    def uint(self) -> int:
+        data = self.data
+        res = shift = 0
+        while True:
+            b = data[self.position]
+            self.position += 1
+            res |= (b & 0x7F) << shift
+            if b < 0x80:
+                return res
+            shift += 7
+
+    def path(self) -> MotzkinPath:
+        n = self.uint()
+        key, pattern = n >> 1, bool(n & 1)
+        if self.trusted:
+            return MotzkinPath._from_key(key, pattern)
+        length, odd = divmod(key.bit_length() - 1, 2)
+        if length < 0 or odd:
+            raise ValueError("Invalid path in the data.")
+        return MotzkinPath.from_packed(key ^ (1 << (2 * length)), length, pattern)
+
+    def crossing_pattern(self) -> CrossingPattern:
+        left = self.path()
+        right = self.path()
+        if self.trusted:
+            res: CrossingPattern = object.__new__(CrossingPattern)
+            res.left, res.right = left, right
+            return res
+        return CrossingPattern(left, right)
+
+    def json(self) -> dict:
+        length = self.uint()
+        start, end = self.position, self.position + length
+        if end > len(self.data):
+            raise IndexError
+        self.position = end
+        res: dict = json.loads(self.data[start:end].decode())
+        return res
+
+    def comb_class(self) -> MotzkinPaths:
+        kind = self.byte()
+        cls = KIND_CLASSES[kind]
+        read: Callable[[], Any] = self.path
+        if kind == 2:
+            read = self.crossing_pattern
+        avoids = tuple(read() for _ in range(self.uint()))
+        contains = tuple(
+            tuple(read() for _ in range(self.uint())) for _ in range(self.uint())
+        )
+        if self.trusted:
+            return cls._from_normalised(avoids, contains)
+        if cls is MotzkinPathsStartingWithU:
+            return MotzkinPathsStartingWithU(
+                crossing_avoids=avoids, crossing_contains=contains
+            )
+        return cls(avoids, contains)
+
+    def class_index(self) -> MotzkinPaths:
+        return self.classes[self.uint()]
+
+    def strategy(self) -> AbstractStrategy:
+        kind = self.byte()
+        if kind == STRATEGY_JSON:
+            strategy = AbstractStrategy.from_dict(self.json())
+            assert isinstance(strategy, AbstractStrategy)
+            return strategy
+        mask = self.byte()
+        flags = {flag: bool(mask >> i & 1) for i, flag in enumerate(FLAGS)}
+        if kind == EXPANSION:
+            return Expansion(**flags)
+        if kind == FACTOR:
+            return Factor(**flags)
+        if kind == PATT_INSERTION:
+            pattern: Any = self.crossing_pattern() if self.byte() else self.path()
+            return PattInsertion(pattern, **flags)
+        raise ValueError("Unknown strategy in the data.")
+
+    def rule(self) -> AbstractRule:
+        kind = self.byte()
+        if kind == EQUIVALENCE_PATH_RULE:
+            rules: List[Any] = [self.rule() for _ in range(self.uint())]
+            path_rule: EquivalencePathRule = EquivalencePathRule(rules)
+            if self.trusted:
+                path_rule._non_empty_children = path_rule.rules[-1].non_empty_children()
+            return path_rule
+        if kind == EQUIVALENCE_RULE:
+            original_rule = self.rule()
+            assert isinstance(original_rule, Rule)
+            equivalence_rule: EquivalenceRule = EquivalenceRule(original_rule)
+            if self.trusted:
+                # the child of an equivalence is the only one not empty
+                equivalence_rule._non_empty_children = equivalence_rule.children
+            return equivalence_rule
+        if kind == REVERSE_RULE:
+            original_rule = self.rule()
+            assert isinstance(original_rule, Rule)
+            reverse_rule: ReverseRule = ReverseRule(original_rule, self.uint())
+            self.non_empty_children(reverse_rule, self.uint())
+            return reverse_rule
+        if kind == VERIFICATION_RULE:
+            strategy = self.strategy()
+            assert isinstance(strategy, VerificationStrategy)
+            return VerificationRule(strategy, self.class_index())
+        if kind == RULE:
+            strategy = self.strategy()
+            assert isinstance(strategy, Strategy)
+            comb_class = self.class_index()
+            children = tuple(self.class_index() for _ in range(self.uint()))
+            mask = self.uint()
+            if not self.trusted:
+                return Rule(strategy, comb_class)
+            rule: Rule = Rule(strategy, comb_class, children)
+            self.non_empty_children(rule, mask)
+            return rule
+        if kind == RULE_JSON:
+            return AbstractRule.from_dict(self.json())
+        raise ValueError("Unknown rule in the data.")
+
+    def non_empty_children(self, rule: Rule, mask: int) -> None:
+        """If trusted, give the rule the children in the bit mask as those
+        that are not empty, instead of checking them when they are needed."""
+        if self.trusted:
+            rule._non_empty_children = tuple(
+                c for i, c in enumerate(rule.children) if mask >> i & 1
+            )
+
+    def specification(self) -> CombinatorialSpecification:
+        for _ in range(self.uint()):
+            self.classes.append(self.comb_class())
+        root = self.class_index()
+        rules = [self.rule() for _ in range(self.uint())]
+        return CombinatorialSpecification(root, rules)
+
+
+def to_binary(
+    obj: Union[Pattern, MotzkinPaths, AbstractStrategy, CombinatorialSpecification]
+) -> bytes:
+    """Return the binary form of a path, a crossing pattern, a set of paths, a
+    strategy or a specification."""
+    writer = _Writer()
+    writer.data += MAGIC
+    writer.data.append(VERSION)
+    if isinstance(obj, MotzkinPath):
+        writer.data.append(PATH)
+        writer.path(obj)
+    elif isinstance(obj, CrossingPattern):
+        writer.data.append(CROSSING_PATTERN)
+        writer.crossing_pattern(obj)
+    elif isinstance(obj, MotzkinPaths):
+        writer.data.append(CLASS)
+        writer.comb_class(obj)
+    elif isinstance(obj, AbstractStrategy):
+        writer.data.append(STRATEGY)
+        writer.strategy(obj)
+    elif isinstance(obj, CombinatorialSpecification):
+        writer.data.append(SPECIFICATION)
+        writer.specification(obj)
+    else:
+        raise TypeError("Cannot store {} in binary.".format(type(obj).__name__))
+    return bytes(writer.data)
+
+
+def from_binary(data: bytes, trusted: bool = False) -> Any:
+    """Return the object with the binary form data, as returned by to_binary.
+    Only set trusted to True for data written by to_binary, see above."""
+    if data[: len(MAGIC)] != MAGIC or len(data) <= len(MAGIC) + 1:
+        raise ValueError("The data is not in the binary form.")
+    if data[len(MAGIC)] != VERSION:
+        raise ValueError("Unknown version {} of the data.".format(data[len(MAGIC)]))
+    reader = _Reader(data, trusted)
+    reader.position = len(MAGIC) + 2
+    read: Tuple[Callable[[], Any], ...] = (
+        reader.path,
+        reader.crossing_pattern,
+        reader.comb_class,
+        reader.strategy,
+        reader.specification,
+    )
+    kind = data[len(MAGIC) + 1]
+    if kind >= len(read):
+        raise ValueError("Unknown object in the data.")
+    try:
+        res = read[kind]()
+    except IndexError:
+        raise ValueError("The data is truncated or corrupt.") from None
+    if reader.position != len(data):
+        raise ValueError("The data has trailing bytes.")
+    return res
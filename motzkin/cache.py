@@ -0,0 +1,216 @@
+"""This module contains the bounded caches used by the library, for example
+the matchers of the sets of Motzkin paths and the minimal sets of Motzkin
+paths for avoiding a pattern.
+
+Every cache is registered by name, so that they can all be inspected,
+resized and cleared together, or scoped to a single search."""
+import sys
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Set
+
+__all__ = [
+    "BoundedCache",
+    "CacheScope",
+    "cache_stats",
+    "clear_caches",
+    "configure_cache",
+    "get_cache",
+]
+
+CACHES: Dict[str, "BoundedCache"] = {}
+# the scopes open, innermost last, which record the keys new to each cache
+# that are still in it
+_SCOPES: List["CacheScope"] = []
+
+
+def default_sizer(key: Hashable, value: Any) -> int:
+    """Return a rough number of bytes used by an entry, counting the items
+    of a value that is a collection."""
+    size = sys.getsizeof(key) + sys.getsizeof(value)
+    if isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(sys.getsizeof(v) for v in value)
+    return size
+
+
+class BoundedCache:
+    """A dictionary evicting its least recently used entries when it holds
+    more than max_entries entries or more than max_bytes bytes, as measured by
+    sizer. A limit of None means no limit. It counts hits, misses and
+    evictions."""
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        sizer: Callable[[Hashable, Any], int] = default_sizer,
+    ):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizer = sizer
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        CACHES[name] = self
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the value for key, or default if it is not cached."""
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._data.move_to_end(key)
+        return value
+
+    def __getitem__(self, key: Hashable) -> Any:
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            raise
+        self.hits += 1
+        self._data.move_to_end(key)
+        return value
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        if key in self._data:
+            self._remove(key)
+        elif _SCOPES:
+            for scope in _SCOPES:
+                scope.added.setdefault(self.name, set()).add(key)
+        size = self.sizer(key, value) if self.max_bytes is not None else 0
+        self._data[key] = value
+        self._sizes[key] = size
+        self.bytes += size
+        self._evict()
+
+    def __delitem__(self, key: Hashable) -> None:
+        self._remove(key)
+        self._unrecord(key)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._data)
+
+    def _remove(self, key: Hashable) -> None:
+        del self._data[key]
+        self.bytes -= self._sizes.pop(key)
+
+    def _unrecord(self, key: Hashable) -> None:
+        """Stop the open scopes from holding a key no longer cached."""
+        for scope in _SCOPES:
+            keys = scope.added.get(self.name)
+            if keys:
+                keys.discard(key)
+
+    def _evict(self) -> None:
+        while self._data and (
+            (self.max_entries is not None and len(self._data) > self.max_entries)
+            or (self.max_bytes is not None and self.bytes > self.max_bytes)
+        ):
+            key = next(iter(self._data))
+            self._remove(key)
+            self._unrecord(key)
+            self.evictions += 1
+
+    def configure(
+        self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None
+    ) -> None:
+        """Set the limits of the cache, evicting entries if needed. Turning
+        on a byte limit measures the entries already cached."""
+        if max_bytes is not None and self.max_bytes is None:
+            for key, value in self._data.items():
+                self._sizes[key] = self.sizer(key, value)
+            self.bytes = sum(self._sizes.values())
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._evict()
+
+    def clear(self) -> None:
+        """Remove all entries, the counters are kept."""
+        self._data.clear()
+        self._sizes.clear()
+        self.bytes = 0
+        for scope in _SCOPES:
+            scope.added.pop(self.name, None)
+
+    def reset_stats(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._data),
+            "bytes": self.bytes if self.max_bytes is not None else None,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def __repr__(self) -> str:
+        return "BoundedCache({}, max_entries={}, max_bytes={})".format(
+            repr(self.name), self.max_entries, self.max_bytes
+        )
+
+
+def get_cache(name: str) -> BoundedCache:
+    return CACHES[name]
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Return the statistics of every cache, keyed by name."""
+    return {name: cache.stats() for name, cache in CACHES.items()}
+
+
+def clear_caches() -> None:
+    for cache in CACHES.values():
+        cache.clear()
+
+
+def configure_cache(
+    name: str, max_entries: Optional[int] = None, max_bytes: Optional[int] = None
+) -> None:
+    CACHES[name].configure(max_entries=max_entries, max_bytes=max_bytes)
+
+
+class CacheScope:
+    """A context manager in which the caches start with fresh counters and
+    after which the entries added to them in the scope are removed, those
+    cached before are kept. The statistics at exit are kept in stats."""
+
+    def __init__(self) -> None:
+        self.stats: Dict[str, Dict[str, Any]] = {}
+        # the keys added to each cache in the scope and still in it, by the
+        # name of the cache
+        self.added: Dict[str, Set[Hashable]] = {}
+
+    def __enter__(self) -> "CacheScope":
+        for cache in CACHES.values():
+            cache.reset_stats()
+        self.added = {}
+        _SCOPES.append(self)
+        return self
+
+    def __exit__(self, *args) -> None:
+        _SCOPES.remove(self)
+        self.stats = cache_stats()
+        for name, keys in self.added.items():
+            cache = CACHES[name]
+            for key in keys:
+                if key in cache:
+                    del cache[key]
+        self.added = {}
@@ -0,0 +1,477 @@
+"""This module contains a matcher that follows all the patterns avoided and
+contained by a set of Motzkin paths at once, so that membership of a path is
+decided in a single pass over its letters.
+
+The matcher is a deterministic automaton whose states are built the first
+time they are reached. The letters are read as the codes D = 0, H = 1 and
+U = 2. For paths starting with U the patterns are crossing patterns, and the
+extra letter CROSS = 3 is read at the first return of the path.
+
+The states and their transitions are kept with the matcher, and the sets of
+Motzkin paths keep their matchers in a bounded cache. The numbers of
+completions are kept in the bounded cache COMPLETIONS shared by all matchers."""
+import random
+from collections import defaultdict
+from itertools import islice
+from random import Random
+from typing import DefaultDict, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .cache import BoundedCache
+from .motzkinpatterns import (
+    _CODE_LETTERS,
+    _LETTER_CODES,
+    CrossingPattern,
+    MotzkinPath,
+    _codes,
+)
+
+__all__ = ["PatternMatcher"]
+
+Pattern = Union[CrossingPattern, MotzkinPath]
+# (phase, progress of each avoid, progress of each contain list or None)
+StateKey = Tuple[int, Tuple[int, ...], Tuple[Optional[Tuple[int, ...]], ...]]
+
+
+class PatternMatcher:
+    """Track the progress of greedily matching every pattern of avoids and
+    contains. A progress of -1 means the pattern can no longer occur, and a
+    satisfied contain list is replaced by None. The state DEAD is reached as
+    soon as an avoided pattern occurs or a contain list can no longer be
+    satisfied.
+
+    If crossing is True the patterns are crossing patterns, their left must
+    be matched before the letter CROSS is read and their right after it. If
+    first is given, only paths starting with that letter are accepted."""
+
+    DEAD = 0
+    CROSS = 3
+    # the numbers of completions, keyed by the matcher and the triple
+    # (remaining, height, state)
+    COMPLETIONS = BoundedCache("completions", max_entries=1000000)
+
+    def __init__(
+        self,
+        avoids: Iterable[Pattern] = tuple(),
+        contains: Iterable[Iterable[Pattern]] = tuple(),
+        crossing: bool = False,
+        first: Optional[str] = None,
+    ):
+        self.crossing = crossing
+        self.first = None if first is None else _LETTER_CODES[first]
+        self._letters: List[Tuple[int, ...]] = []
+        self._splits: List[int] = []
+        self._avoids = tuple(self._add_pattern(patt) for patt in avoids)
+        self._contains = tuple(
+            tuple(self._add_pattern(patt) for patt in patts) for patts in contains
+        )
+        self._keys: List[Optional[StateKey]] = [None]
+        self._index: Dict[StateKey, int] = {}
+        self._next: List[List[Optional[int]]] = [[0, 0, 0, 0]]
+        self._accepting: List[bool] = [False]
+        self._phases: List[int] = [0]
+        self._needs: List[int] = [0]
+        self.start = self._normalise(
+            0,
+            tuple(0 for _ in self._avoids),
+            tuple(tuple(0 for _ in patts) for patts in self._contains),
+        )
+
+    def _add_pattern(self, patt: Pattern) -> int:
+        if isinstance(patt, CrossingPattern):
+            left, right = patt.left, patt.right
+        else:
+            left, right = patt, MotzkinPath()
+        self._letters.append(tuple(_codes(left._key) + _codes(right._key)))
+        self._splits.append(len(left))
+        return len(self._letters) - 1
+
+    def _normalise(
+        self,
+        phase: int,
+        avoids: Tuple[int, ...],
+        contains: Tuple[Optional[Tuple[int, ...]], ...],
+    ) -> int:
+        """Return the state with the given progress, adding it if new."""
+        letters = self._letters
+        for i, k in zip(self._avoids, avoids):
+            if k == len(letters[i]):
+                return PatternMatcher.DEAD
+        groups: List[Optional[Tuple[int, ...]]] = []
+        need = 0
+        for patts, progress in zip(self._contains, contains):
+            if progress is None or any(
+                k == len(letters[i]) for i, k in zip(patts, progress)
+            ):
+                groups.append(None)
+            elif all(k == -1 for k in progress):
+                return PatternMatcher.DEAD
+            else:
+                groups.append(progress)
+                need = max(
+                    need,
+                    min(
+                        len(letters[i]) - k for i, k in zip(patts, progress) if k != -1
+                    ),
+                )
+        key = (phase, avoids, tuple(groups))
+        state = self._index.get(key)
+        if state is None:
+            state = len(self._keys)
+            self._index[key] = state
+            self._keys.append(key)
+            self._next.append([None, None, None, None])
+            self._accepting.append(
+                (phase == 1 or not self.crossing) and all(g is None for g in groups)
+            )
+            self._phases.append(phase)
+            self._needs.append(need)
+        return state
+
+    def _advance(self, i: int, k: int, phase: int, code: int) -> int:
+        if k < 0:
+            return k
+        letters = self._letters[i]
+        split = self._splits[i]
+        if code == PatternMatcher.CROSS:
+            return -1 if k < split else k
+        if phase == 0:
+            if k < split and letters[k] == code:
+                return k + 1
+        elif split <= k < len(letters) and letters[k] == code:
+            return k + 1
+        return k
+
+    def _compute(self, state: int, code: int) -> int:
+        key = self._keys[state]
+        assert key is not None
+        phase, avoids, contains = key
+        if code == PatternMatcher.CROSS and phase == 1:
+            res = state
+        else:
+            res = self._normalise(
+                1 if code == PatternMatcher.CROSS else phase,
+                tuple(
+                    self._advance(i, k, phase, code)
+                    for i, k in zip(self._avoids, avoids)
+                ),
+                tuple(
+                    None
+                    if progress is None
+                    else tuple(
+                        self._advance(i, k, phase, code)
+                        for i, k in zip(patts, progress)
+                    )
+                    for patts, progress in zip(self._contains, contains)
+                ),
+            )
+        self._next[state][code] = res
+        return res
+
+    def step(self, state: int, code: int) -> int:
+        """Return the state after reading the letter with the given code."""
+        res = self._next[state][code]
+        if res is None:
+            return self._compute(state, code)
+        return res
+
+    def is_accepting(self, state: int) -> bool:
+        """Return True if a path ending in the state is in the set."""
+        return self._accepting[state]
+
+    def needs(self, state: int) -> int:
+        """Return a lower bound on the number of letters still to be read
+        before a path ending in the state could be accepted."""
+        return self._needs[state]
+
+    def is_final(self, state: int, height: int) -> bool:
+        """Return True if a path at the given height in the state ends a
+        path in the set. A path that has not crossed yet has no first
+        return, so its first part is the whole path."""
+        if height:
+            return False
+        if self.crossing and self._phases[state] == 0:
+            state = self.step(state, PatternMatcher.CROSS)
+        return self._accepting[state]
+
+    def successors(
+        self, state: int, height: int, first: bool = False
+    ) -> Iterator[Tuple[int, int, int]]:
+        """Yield the triples (code, state, height) for the letters that can
+        follow a path at the given height in the state, skipping those leading
+        to DEAD or below the x-axis. If first is True the path is empty and
+        the first letter is restricted."""
+        for code in (0, 1, 2):
+            if first and self.first is not None and code != self.first:
+                continue
+            new_height = height + code - 1
+            if new_height < 0:
+                continue
+            new_state = self.step(state, code)
+            if (
+                self.crossing
+                and code == 0
+                and new_height == 0
+                and self._phases[new_state] == 0
+            ):
+                new_state = self.step(new_state, PatternMatcher.CROSS)
+            if new_state != PatternMatcher.DEAD:
+                yield code, new_state, new_height
+
+    def terms(self, n_max: int) -> List[int]:
+        """Return the number of accepted Motzkin paths of each size from 0 to
+        n_max. This is a dynamic program over pairs (height, state) and never
+        generates the paths."""
+        counts = [0] * (n_max + 1)
+        layer: Dict[Tuple[int, int], int] = {(0, self.start): 1}
+        if self.start == PatternMatcher.DEAD:
+            return counts
+        for size in range(n_max + 1):
+            for (height, state), count in layer.items():
+                if self.is_final(state, height) and (size or self.first is None):
+                    counts[size] += count
+            if size == n_max:
+                break
+            remaining = n_max - size - 1
+            new_layer: DefaultDict[Tuple[int, int], int] = defaultdict(int)
+            for (height, state), count in layer.items():
+                for _, new_state, new_height in self.successors(
+                    state, height, size == 0
+                ):
+                    if max(new_height, self._needs[new_state]) <= remaining:
+                        new_layer[(new_height, new_state)] += count
+            layer = new_layer
+        return counts
+
+    def completions(self, state: int, height: int, remaining: int) -> int:
+        """Return the number of ways to extend a path at the given height in
+        the state by exactly remaining letters to a path in the set. The
+        values are cached, and shared by every size asked for."""
+        cache = PatternMatcher.COMPLETIONS
+        res: Optional[int] = cache.get((self, remaining, height, state))
+        if res is not None:
+            return res
+        # the values of this call, so that none is evicted before it is used
+        memo: Dict[Tuple[int, int, int], int] = {}
+        new: List[Tuple[int, int, int]] = []
+        root = (remaining, height, state)
+        stack = [root]
+        while stack:
+            key = stack[-1]
+            if key in memo:
+                stack.pop()
+                continue
+            remaining, height, state = key
+            cached = cache.get((self, remaining, height, state))
+            if cached is not None:
+                memo[key] = cached
+            elif remaining == 0:
+                memo[key] = int(self.is_final(state, height))
+                new.append(key)
+            elif max(height, self._needs[state]) > remaining:
+                memo[key] = 0
+                new.append(key)
+            else:
+                children = [
+                    (remaining - 1, new_height, new_state)
+                    for _, new_state, new_height in self.successors(state, height)
+                ]
+                missing = [child for child in children if child not in memo]
+                if missing:
+                    stack.extend(missing)
+                    continue
+                memo[key] = sum(memo[child] for child in children)
+                new.append(key)
+            stack.pop()
+        for key in new:
+            cache[(self,) + key] = memo[key]
+        return memo[root]
+
+    def paths_of_size(
+        self, size: int, start: int = 0, stop: Optional[int] = None
+    ) -> Iterator[MotzkinPath]:
+        """Yield the accepted Motzkin paths of the given size in
+        lexicographic order, or only those with index from start up to stop.
+        The paths are built letter by letter and a prefix is only extended if
+        it can still be completed, so no work is wasted and only the current
+        prefix is kept."""
+        paths = self._paths_from(size, start)
+        yield from paths if stop is None else islice(paths, max(stop - start, 0))
+
+    def _paths_from(self, size: int, start: int) -> Iterator[MotzkinPath]:
+        if size == 0:
+            if start == 0 and self.first is None and self.is_final(self.start, 0):
+                yield MotzkinPath()
+            return
+        if self.start == PatternMatcher.DEAD or start >= self.count(size):
+            return
+        # the completions asked for by this generation, in front of the cache
+        local: Dict[Tuple[int, int, int], int] = {}
+        # each frame is the key of the prefix and its remaining extensions
+        frames = [(1, self.successors(self.start, 0, True))]
+        if start:
+            # the frames of the prefixes of the path with index start, found
+            # as in unrank, with the extensions before it skipped
+            frames.clear()
+            key, state, height = 1, self.start, 0
+            for depth in range(size):
+                extensions = self.successors(state, height, depth == 0)
+                for code, state, height in extensions:
+                    count = self.completions(state, height, size - depth - 1)
+                    if start < count:
+                        break
+                    start -= count
+                frames.append((key, extensions))
+                key = (key << 2) | code
+            yield MotzkinPath._from_key(key, False)
+        while frames:
+            key, extensions = frames[-1]
+            for code, state, height in extensions:
+                remaining = size - len(frames)
+                completions = local.get((remaining, height, state))
+                if completions is None:
+                    completions = self.completions(state, height, remaining)
+                    local[(remaining, height, state)] = completions
+                if completions:
+                    if remaining == 0:
+                        yield MotzkinPath._from_key((key << 2) | code, False)
+                    else:
+                        frames.append(
+                            ((key << 2) | code, self.successors(state, height))
+                        )
+                        break
+            else:
+                frames.pop()
+
+    def count(self, size: int) -> int:
+        """Return the number of accepted Motzkin paths of the given size."""
+        if size == 0:
+            return int(self.first is None and self.is_final(self.start, 0))
+        if self.start == PatternMatcher.DEAD:
+            return 0
+        return sum(
+            self.completions(state, height, size - 1)
+            for _, state, height in self.successors(self.start, 0, True)
+        )
+
+    def unrank(self, size: int, index: int) -> MotzkinPath:
+        """Return the accepted path of the given size with the given index in
+        lexicographic order, for 0 <= index < count(size). Each letter is
+        chosen by skipping the completions of the smaller letters, so after
+        the completions are cached this takes linear time in size."""
+        if not 0 <= index < self.count(size):
+            raise IndexError("index out of range")
+        key = 1
+        state = self.start
+        height = 0
+        for depth in range(size):
+            for code, new_state, new_height in self.successors(
+                state, height, depth == 0
+            ):
+                count = self.completions(new_state, new_height, size - depth - 1)
+                if index < count:
+                    break
+                index -= count
+            else:
+                raise IndexError("index out of range")
+            key = (key << 2) | code
+            state, height = new_state, new_height
+        return MotzkinPath._from_key(key, False)
+
+    def rank(self, path: MotzkinPath) -> int:
+        """Return the index of the accepted path among the accepted paths of
+        its size in lexicographic order, the inverse of unrank."""
+        if not path.is_motzkin_path() or not self.accepts(path):
+            raise ValueError("The path {} is not accepted.".format(path))
+        codes = _codes(path._key)
+        index = 0
+        state = self.start
+        height = 0
+        for depth, code in enumerate(codes):
+            for letter, new_state, new_height in self.successors(
+                state, height, depth == 0
+            ):
+                if letter == code:
+                    break
+                index += self.completions(new_state, new_height, len(codes) - depth - 1)
+            state, height = new_state, new_height
+        return index
+
+    def random_paths(
+        self, size: int, number: int, rng: Optional[Random] = None
+    ) -> List[MotzkinPath]:
+        """Return number accepted paths of the given size, each drawn
+        uniformly at random and independently. Each draw picks the next
+        letter with probability proportional to the number of completions."""
+        total = self.count(size)
+        if not total:
+            raise ValueError("There are no paths of size {}.".format(size))
+        randrange = random.randrange if rng is None else rng.randrange
+        return [self.unrank(size, randrange(total)) for _ in range(number)]
+
+    def shortest_witness(self, max_size: int) -> Optional[MotzkinPath]:
+        """Return a shortest accepted Motzkin path of size at most max_size,
+        or None if there is none. This is a breadth first search over pairs
+        (height, state), each pair being visited at most once."""
+        if self.start == PatternMatcher.DEAD:
+            return None
+        # the empty path is the only one whose first letter is restricted, so
+        # it is kept apart from the pair (0, start) reached by later letters
+        root = (-1, self.start)
+        parents: Dict[Tuple[int, int], Optional[Tuple[Tuple[int, int], int]]] = {
+            root: None
+        }
+        layer = [root]
+        for size in range(max_size + 1):
+            for height, state in layer:
+                if self.is_final(state, max(height, 0)) and (
+                    size or self.first is None
+                ):
+                    letters = []
+                    parent = parents[(height, state)]
+                    while parent is not None:
+                        node, code = parent
+                        letters.append(_CODE_LETTERS[code])
+                        parent = parents[node]
+                    return MotzkinPath("".join(reversed(letters)))
+            remaining = max_size - size - 1
+            new_layer = []
+            for height, state in layer:
+                for code, new_state, new_height in self.successors(
+                    state, max(height, 0), size == 0
+                ):
+                    node = (new_height, new_state)
+                    if node not in parents and (
+                        max(new_height, self._needs[new_state]) <= remaining
+                    ):
+                        parents[node] = ((height, state), code)
+                        new_layer.append(node)
+            layer = new_layer
+        return None
+
+    def accepts(self, path: MotzkinPath) -> bool:
+        """Return True if the Motzkin path avoids all of the avoids and
+        contains a pattern from each of the contain lists."""
+        codes = _codes(path._key)
+        if self.first is not None and (not codes or codes[0] != self.first):
+            return False
+        state = self.start
+        table = self._next
+        crossed = not self.crossing
+        height = 0
+        for code in codes:
+            nxt = table[state][code]
+            state = self._compute(state, code) if nxt is None else nxt
+            if not crossed:
+                height += code - 1
+                if height == 0 and code == 0:
+                    state = self.step(state, PatternMatcher.CROSS)
+                    crossed = True
+            if state == PatternMatcher.DEAD:
+                return False
+        if not crossed:
+            state = self.step(state, PatternMatcher.CROSS)
+        return self._accepting[state]
+
+    def __len__(self) -> int:
+        """Return the number of states built so far."""
+        return len(self._keys)
@@ -7,18 +7,81 @@ patterns.
 They are all instances of CombinatorialClass, and used for
 performing combinatorial exploration on pattern avoiding Motzkin paths.
 """
+from abc import ABCMeta
 from itertools import chain
-from typing import Iterable, Iterator, List, Optional, Set, Tuple, Union
+from random import Random
+from typing import (
+    Any,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+    cast,
+)
 
 import sympy
 from comb_spec_searcher import CombinatorialClass
 
-from .motzkinpatterns import CrossingPattern, MotzkinPath
+from .cache import BoundedCache
+from .matcher import PatternMatcher
+from .motzkinpatterns import CONTAINMENT, CrossingPattern, MotzkinPath
 
 __all__ = ["MotzkinPaths", "MotzkinPathsStartingWithH", "MotzkinPathsStartingWithU"]
 
 
-class MotzkinPaths(CombinatorialClass):
+def _freeze(value: Any) -> Tuple[Optional[Hashable], Any]:
+    """Return a hashable key for an argument of a constructor, together with
+    the argument where every iterable of patterns has been made a tuple, so
+    that it can be read again."""
+    if isinstance(value, str):
+        return value, value
+    if isinstance(value, MotzkinPath):
+        return ("MotzkinPath", value._key), value
+    if isinstance(value, CrossingPattern):
+        return ("CrossingPattern", value.left._key, value.right._key), value
+    if value is None:
+        return None, None
+    frozen = tuple(_freeze(v) for v in value)
+    return tuple(k for k, _ in frozen), tuple(v for _, v in frozen)
+
+
+class _InternedClass(ABCMeta):
+    """The metaclass of the sets of Motzkin paths, interning the instances.
+
+    A set constructed from the same arguments as an earlier one is the same
+    instance, and is not normalised again. A set normalising to one seen
+    before is replaced by it, so equal sets also share their matcher."""
+
+    CONSTRUCTED = BoundedCache("classes", max_entries=100000)
+    CANONICAL = BoundedCache("canonical_classes", max_entries=100000)
+
+    def __call__(cls, *args, **kwargs):
+        key, args = _freeze(args)
+        frozen = {name: _freeze(value) for name, value in kwargs.items()}
+        key = (cls, key, tuple(sorted((n, k) for n, (k, _) in frozen.items())))
+        res = _InternedClass.CONSTRUCTED.get(key)
+        if res is None:
+            kwargs = {name: value for name, (_, value) in frozen.items()}
+            res = _canonical(super().__call__(*args, **kwargs))
+            _InternedClass.CONSTRUCTED[key] = res
+        return res
+
+
+def _canonical(motzkin_paths: "MotzkinPaths") -> "MotzkinPaths":
+    """Return the interned set equal to motzkin_paths."""
+    res: "MotzkinPaths" = _InternedClass.CANONICAL.get(motzkin_paths, motzkin_paths)
+    _InternedClass.CANONICAL[res] = res
+    return res
+
+
+class MotzkinPaths(CombinatorialClass, metaclass=_InternedClass):
+    # the hash, kept once the patterns are final
+    _hash: Optional[int] = None
+
     def __init__(
         self,
         avoids: Iterable[Iterable[str]] = tuple(),
@@ -34,13 +97,16 @@ class MotzkinPaths(CombinatorialClass):
             for patt in chain(avoids, *contains):
                 if not all(l in ("U", "D", "H") for l in patt):
                     raise ValueError('All letters must be "U", "D", or "H"')
-        self.avoids: Tuple[MotzkinPath, ...] = tuple(sorted(set(avoids)))
-        self.contains: Tuple[MotzkinPath, ...] = tuple(
-            sorted(tuple(sorted(set(p_list))) for p_list in contains)
+        self.avoids: Tuple[Union[CrossingPattern, MotzkinPath], ...] = tuple(
+            sorted(set(avoids))
         )
+        self.contains: Tuple[
+            Tuple[Union[CrossingPattern, MotzkinPath], ...], ...
+        ] = tuple(sorted(tuple(sorted(set(p_list))) for p_list in contains))
         self._cleanup()
         self._motzkinify()
         self._cleanup()
+        self._hash = None
 
     def _motzkinify(self) -> None:
         self.avoids = tuple(
@@ -84,7 +150,7 @@ class MotzkinPaths(CombinatorialClass):
             avoids = self.avoids
         cleaned_av: List[MotzkinPath] = []
         for av in avoids:
-            if all(p not in av for p in cleaned_av):
+            if not CONTAINMENT.contains_any(av, cleaned_av):
                 cleaned_av.append(av)
         return tuple(sorted(cleaned_av))
 
@@ -114,10 +180,10 @@ class MotzkinPaths(CombinatorialClass):
                 for j, c2 in enumerate(co[i + 1 :]):
                     k = j + i + 1
                     if k not in redundant:
-                        if c1 in c2:
+                        if CONTAINMENT.contains(c2, c1):
                             redundant.add(k)
                 if i not in redundant:
-                    if any(p in c1 for p in minimized_avoids):
+                    if CONTAINMENT.contains_any(c1, minimized_avoids):
                         redundant.add(i)
             clean_co = [p for i, p in enumerate(co) if i not in redundant]
             if not clean_co:
@@ -131,16 +197,169 @@ class MotzkinPaths(CombinatorialClass):
             if i not in redundant:
                 for j, cos2 in enumerate(cleaned_cos):
                     if i != j and j not in redundant:
-                        if all(any(p2 in p1 for p2 in cos2) for p1 in cos):
+                        if all(CONTAINMENT.contains_any(p1, cos2) for p1 in cos):
                             redundant.add(j)
         cleaned_cos = [co for i, co in enumerate(cleaned_cos) if i not in redundant]
         return minimized_avoids, tuple(sorted(tuple(sorted(co)) for co in cleaned_cos))
 
+    # the matchers of the sets, built on first use
+    MATCHERS = BoundedCache("matchers", max_entries=10000)
+
+    def matcher(self) -> PatternMatcher:
+        """Return the matcher deciding if a path is in the set, it is built
+        on first use and kept in MATCHERS."""
+        res: Optional[PatternMatcher] = MotzkinPaths.MATCHERS.get(self)
+        if res is None:
+            res = self._build_matcher()
+            MotzkinPaths.MATCHERS[self] = res
+        return res
+
+    def _build_matcher(self) -> PatternMatcher:
+        return PatternMatcher(self.avoids, self.contains)
+
+    EXTENSIONS = BoundedCache("class_extensions", max_entries=100000)
+
     def add_avoid(self, patt: MotzkinPath) -> "MotzkinPaths":
-        return self.__class__(avoids=self.avoids + (patt,), contains=self.contains)
+        return self._extended((patt,), ())
 
     def add_contain(self, patt: MotzkinPath) -> "MotzkinPaths":
-        return self.__class__(avoids=self.avoids, contains=self.contains + ((patt,),))
+        return self._extended((), ((patt,),))
+
+    def _extended(
+        self,
+        avoids: Tuple[Union[CrossingPattern, MotzkinPath], ...],
+        contains: Tuple[Tuple[Union[CrossingPattern, MotzkinPath], ...], ...],
+    ) -> "MotzkinPaths":
+        """Return the set also avoiding avoids and containing contains. If the
+        new patterns are their own minimal sets for avoidance, as the patterns
+        of a set are, only the changes they cause to the already normalised
+        patterns are computed. The result is the same as constructing the set
+        from all the patterns."""
+        key = (self, _freeze(avoids)[0], _freeze(contains)[0])
+        res: Optional[MotzkinPaths] = MotzkinPaths.EXTENSIONS.get(key)
+        if res is None:
+            if all(
+                patt.minimal_set_for_avoidance() == frozenset([patt])
+                for patt in chain(avoids, *contains)
+            ):
+                res = _canonical(self._normalised_extension(avoids, contains))
+            else:
+                res = self._rebuilt(self.avoids + avoids, self.contains + contains)
+            MotzkinPaths.EXTENSIONS[key] = res
+        return res
+
+    def _rebuilt(
+        self,
+        avoids: Tuple[Union[CrossingPattern, MotzkinPath], ...],
+        contains: Tuple[Tuple[Union[CrossingPattern, MotzkinPath], ...], ...],
+    ) -> "MotzkinPaths":
+        return self.__class__(avoids=avoids, contains=contains)
+
+    def _normalised_extension(
+        self,
+        avoids: Tuple[Union[CrossingPattern, MotzkinPath], ...],
+        contains: Tuple[Tuple[Union[CrossingPattern, MotzkinPath], ...], ...],
+    ) -> "MotzkinPaths":
+        """Return the set also avoiding avoids and containing contains, by the
+        same passes as _cleanup. The patterns of self are already minimised
+        against each other, so each pass only compares them with the patterns
+        that are new or changed since the previous pass."""
+        avs: Tuple[Union[CrossingPattern, MotzkinPath], ...] = self.avoids
+        new_avs = tuple(avoids)
+        stable: List[Tuple[Union[CrossingPattern, MotzkinPath], ...]] = list(
+            self.contains
+        )
+        changed = [tuple(sorted(set(p_list))) for p_list in contains]
+        while True:
+            start = (
+                tuple(sorted(set(avs + new_avs))),
+                tuple(sorted(set(stable + changed))),
+            )
+            # the avoids, and those derived from the new avoids or lists
+            candidates = set(new_avs)
+            candidates.update(self._derived_avoids(new_avs, stable + changed))
+            candidates.update(self._derived_avoids(avs, changed))
+            added = [
+                av
+                for av in MotzkinPaths._minimised_avoids(
+                    self, tuple(sorted(candidates))
+                )
+                if not CONTAINMENT.contains_any(av, avs)
+            ]
+            avs = tuple(
+                sorted(
+                    [av for av in avs if not CONTAINMENT.contains_any(av, added)]
+                    + added
+                )
+            )
+            # the lists, only the new ones are compared with all the avoids
+            lists = []
+            for co in stable:
+                clean_co = tuple(
+                    p for p in co if not CONTAINMENT.contains_any(p, added)
+                )
+                if not clean_co:
+                    return self._empty()
+                lists.append((clean_co, clean_co != co))
+            fresh = chain([self.__class__.class_req()], self._split_contains(changed))
+            for co in fresh:
+                if not all(co):
+                    continue
+                clean_co = []
+                for p in co:
+                    if not CONTAINMENT.contains_any(
+                        p, clean_co
+                    ) and not CONTAINMENT.contains_any(p, avs):
+                        clean_co.append(p)
+                if not clean_co:
+                    return self._empty()
+                lists.append((tuple(clean_co), True))
+            # remove the lists implied by others, two unchanged lists do not
+            # imply each other
+            kept: List[Tuple[Union[CrossingPattern, MotzkinPath], ...]] = []
+            for i, (co, is_new) in enumerate(lists):
+                if co in kept:
+                    continue
+                if not any(
+                    (is_new or other_is_new)
+                    and co != other
+                    and all(CONTAINMENT.contains_any(p, co) for p in other)
+                    for j, (other, other_is_new) in enumerate(lists)
+                    if i != j
+                ):
+                    kept.append(co)
+            new_lists = set(co for co, is_new in lists if is_new)
+            stable = [co for co in kept if co not in new_lists]
+            changed = [co for co in kept if co in new_lists]
+            new_avs = tuple(added)
+            if (avs, tuple(sorted(kept))) == start:
+                break
+        res = object.__new__(self.__class__)
+        res.avoids = avs
+        res.contains = tuple(sorted(kept))
+        return cast(MotzkinPaths, res)
+
+    def _empty(self) -> "MotzkinPaths":
+        avoids, contains = self.__class__.obs_reqs_for_empty()
+        res = object.__new__(self.__class__)
+        res.avoids = avoids
+        res.contains = contains
+        return _canonical(res)
+
+    def _derived_avoids(
+        self,
+        avoids: Iterable[Union[CrossingPattern, MotzkinPath]],
+        contains: Iterable[Tuple[Union[CrossingPattern, MotzkinPath], ...]],
+    ) -> List[Union[CrossingPattern, MotzkinPath]]:
+        """Return the avoids implied by the avoids and the lists together."""
+        return []
+
+    def _split_contains(
+        self, contains: Iterable[Tuple[Union[CrossingPattern, MotzkinPath], ...]]
+    ) -> List[Tuple[Union[CrossingPattern, MotzkinPath], ...]]:
+        """Return the lists of patterns where a list may be replaced by lists
+        that together are equivalent to it."""
+        return list(contains)
 
     @classmethod
     def class_req(cls) -> Tuple[MotzkinPath]:
@@ -153,15 +372,13 @@ class MotzkinPaths(CombinatorialClass):
     def is_empty(self) -> bool:
         if (self.avoids, self.contains) == self.__class__.obs_reqs_for_empty():
             return True
-        iterator = chain(*[self.objects_of_size(i) for i in range(self.maxlen() + 1)])
-        try:
-            next(iterator)
-            return False
-        except StopIteration:
-            # if not (self.avoids, self.contains) == self.__class__.obs_reqs_for_empty():
-            #     print(self, self.maxlen())
-            #     input()
-            return True
+        return self.shortest_object() is None
+
+    def shortest_object(self) -> Optional[MotzkinPath]:
+        """Return a path of smallest size in the set, or None if the set is
+        empty. It is found by a search over the states of the matcher and no
+        other paths are generated."""
+        return self.matcher().shortest_witness(self.maxlen())
 
     def maxlen(self) -> int:
         return sum(max(len(p) for p in p_list) for p_list in self.contains)
@@ -192,37 +409,58 @@ class MotzkinPaths(CombinatorialClass):
     def is_positive(self) -> bool:
         return bool(self.contains)
 
-    PATH_CACHE = {}
-
-    def objects_of_size(self, size: int) -> Iterator[MotzkinPath]:
-        if (self, size) not in self.PATH_CACHE:
-            res = []
-            if size == 0:
-                path = MotzkinPath("")
-                if all(path.avoids(p) for p in self.avoids) and all(
-                    any(path.contains(p) for p in patts) for patts in self.contains
-                ):
-                    res.append(MotzkinPath(""))
-            else:
-                res.extend(
-                    MotzkinPathsStartingWithH(
-                        self.avoids, self.contains
-                    ).objects_of_size(size)
-                )
-                res.extend(
-                    MotzkinPathsStartingWithU(
-                        self.avoids, self.contains
-                    ).objects_of_size(size)
-                )
-            self.PATH_CACHE[(self, size)] = res
-        for p in self.PATH_CACHE[(self, size)]:
-            yield p
+    def count_objects_of_size(self, size: int) -> int:
+        """Return the number of paths of the given size, without generating
+        them."""
+        return self.terms(size)[size]
+
+    def terms(self, n_max: int) -> List[int]:
+        """Return the number of paths of each size from 0 to n_max, without
+        generating them."""
+        return self.matcher().terms(n_max)
+
+    def random_sample(self, size: int, rng: Optional[Random] = None) -> MotzkinPath:
+        """Return a path of the given size drawn uniformly at random, using
+        rng if given and the random module otherwise. The counting tables are
+        built by the first call and reused, after that a sample takes linear
+        time in size."""
+        return self.matcher().random_paths(size, 1, rng)[0]
+
+    def random_samples(
+        self, size: int, number: int, rng: Optional[Random] = None
+    ) -> List[MotzkinPath]:
+        """Return number independent uniform samples of the given size, all
+        drawn with the same counting tables."""
+        return self.matcher().random_paths(size, number, rng)
+
+    def rank(self, path: MotzkinPath) -> int:
+        """Return the index of the path among the paths in the set of its
+        size, in the lexicographic order of objects_of_size."""
+        return self.matcher().rank(path)
+
+    def unrank(self, size: int, index: int) -> MotzkinPath:
+        """Return the path of the given size with the given index in the
+        lexicographic order of objects_of_size, for 0 <= index <
+        count_objects_of_size(size). After the counting tables are built by
+        the first call, rank and unrank take linear time in size."""
+        return self.matcher().unrank(size, index)
+
+    def objects_of_size(
+        self, size: int, start: int = 0, stop: Optional[int] = None
+    ) -> Iterator[MotzkinPath]:
+        """Yield the paths of the given size in lexicographic order, or only
+        those with index from start up to stop, see unrank. They are
+        generated one at a time, and a prefix is only extended when it can
+        be completed to a path in the set."""
+        return self.matcher().paths_of_size(size, start, stop)
 
     def to_jsonable(self, prefix="") -> dict:
         d = super().to_jsonable()
         d["prefix"] = prefix
-        d["avoids"] = self.avoids
-        d["contains"] = self.contains
+        d["avoids"] = tuple(p.to_jsonable() for p in self.avoids)
+        d["contains"] = tuple(
+            tuple(p.to_jsonable() for p in ps) for ps in self.contains
+        )
         return d
 
     @classmethod
@@ -250,6 +488,34 @@ class MotzkinPaths(CombinatorialClass):
             return MotzkinPathsStartingWithH(avoids, contains)
         return MotzkinPaths(avoids, contains)
 
+    @classmethod
+    def _from_normalised(
+        cls, avoids: Tuple[Any, ...], contains: Tuple[Tuple[Any, ...], ...]
+    ) -> "MotzkinPaths":
+        """Return the set of paths with avoids and contains, which must be
+        normalised already, without normalising them again."""
+        res = object.__new__(cls)
+        res.avoids = avoids
+        res.contains = contains
+        return _canonical(res)
+
+    def to_binary(self) -> bytes:
+        """Return the binary form of the set, see motzkin.binary."""
+        from .binary import to_binary  # pylint: disable=import-outside-toplevel
+
+        return to_binary(self)
+
+    @classmethod
+    def from_binary(cls, data: bytes, trusted: bool = False) -> "MotzkinPaths":
+        """Return the set with the binary form data. If trusted is True the
+        data must come from to_binary, and the set is not normalised again."""
+        from .binary import from_binary  # pylint: disable=import-outside-toplevel
+
+        res = from_binary(data, trusted)
+        if not isinstance(res, cls):
+            raise ValueError("The data is not a set of Motzkin paths.")
+        return res
+
     def __eq__(self, other) -> bool:
         if isinstance(other, MotzkinPaths):
             return (
@@ -260,7 +526,9 @@ class MotzkinPaths(CombinatorialClass):
         raise NotImplementedError
 
     def __hash__(self) -> int:
-        return hash(hash(self.avoids) + hash(self.contains))
+        if self._hash is None:
+            self._hash = hash(hash(self.avoids) + hash(self.contains))
+        return self._hash
 
     def __repr__(self) -> str:
         return "MotzkinPaths({}, {})".format(repr(self.avoids), repr(self.contains))
@@ -320,22 +588,8 @@ class MotzkinPathsStartingWithH(MotzkinPaths):
     def obs_reqs_for_empty(cls) -> Tuple[Tuple[MotzkinPath], Tuple]:
         return (MotzkinPath(),), tuple()
 
-    def objects_of_size(self, size: int) -> Iterator[MotzkinPath]:
-        if size < 1:
-            return
-
-        def trim(patts):
-            def sub_trim(patt):
-                if len(patt) > 0 and patt[0] == "H":
-                    return MotzkinPath(patt[1:], pattern=True)
-                return patt
-
-            return tuple(sub_trim(patt) for patt in patts)
-
-        for path in MotzkinPaths(
-            trim(self.avoids), tuple(trim(patts) for patts in self.contains)
-        ).objects_of_size(size - 1):
-            yield MotzkinPath(("H",) + path)
+    def _build_matcher(self) -> PatternMatcher:
+        return PatternMatcher(self.avoids, self.contains, first="H")
 
     def maxlen(self) -> int:
         return MotzkinPaths.maxlen(self) + (
@@ -453,25 +707,40 @@ class MotzkinPathsStartingWithU(MotzkinPaths):
     def maxlen(self) -> int:
         return MotzkinPaths.maxlen(self) + 2
 
+    def _build_matcher(self) -> PatternMatcher:
+        return PatternMatcher(self.avoids, self.contains, crossing=True, first="U")
+
     def _minimised_avoids(
         self, avoids: Optional[Tuple[Union[CrossingPattern, MotzkinPath], ...]] = None
     ) -> Tuple[Union[CrossingPattern, MotzkinPath], ...]:
         if avoids is None:
             avoids = self.avoids
         new_av = list(self.avoids)
-        for co in self.contains:
+        new_av.extend(self._derived_avoids(self.avoids, self.contains))
+        avoids = tuple(sorted(new_av))
+        return MotzkinPaths._minimised_avoids(self, avoids=avoids)
+
+    def _derived_avoids(
+        self,
+        avoids: Iterable[Union[CrossingPattern, MotzkinPath]],
+        contains: Iterable[Tuple[Union[CrossingPattern, MotzkinPath], ...]],
+    ) -> List[Union[CrossingPattern, MotzkinPath]]:
+        """Return the avoids implied by a list with a single localised
+        pattern equal to one side of an avoid."""
+        avoids = tuple(avoids)
+        new_av = []
+        for co in contains:
             if len(co) == 1:
                 co = co[0]
                 if co.is_left_localised():
-                    for av in self.avoids:
+                    for av in avoids:
                         if not av.is_left_localised() and av.left == co.left:
                             new_av.append(CrossingPattern([], av.right))
                 if co.is_right_localised():
-                    for av in self.avoids:
+                    for av in avoids:
                         if not av.is_right_localised() and av.right == co.right:
                             new_av.append(CrossingPattern(av.left, []))
-        avoids = tuple(sorted(new_av))
-        return MotzkinPaths._minimised_avoids(self, avoids=avoids)
+        return new_av
 
     def _minimised_contains(
         self,
@@ -487,87 +756,36 @@ class MotzkinPathsStartingWithU(MotzkinPaths):
         contain something which must be avoided. Then removes all container
         lists which are implied by other lists."""
         if contains is None:
-            new_contains = set()
-            for cp_list in self.contains:
-                if len(cp_list) == 1 and not cp_list[0].is_localised():
-                    cp = cp_list[0]
-                    new_contains.add((CrossingPattern(cp.left, ""),))
-                    new_contains.add((CrossingPattern("", cp.right),))
-                else:
-                    new_contains.add(cp_list)
+            new_contains = set(self._split_contains(self.contains))
             contains = tuple(
                 sorted(tuple(sorted(co for co in co_list)) for co_list in new_contains)
             )
         return MotzkinPaths._minimised_contains(self, minimized_avoids, contains)
 
-    def add_avoid(self, patt: CrossingPattern) -> "MotzkinPathsStartingWithU":
-        return MotzkinPathsStartingWithU(
-            crossing_avoids=self.avoids + (patt,), crossing_contains=self.contains
-        )
+    def _split_contains(
+        self, contains: Iterable[Tuple[Union[CrossingPattern, MotzkinPath], ...]]
+    ) -> List[Tuple[Union[CrossingPattern, MotzkinPath], ...]]:
+        """Return the lists where a list with a single pattern that is not
+        localised is replaced by a list with its left and one with its
+        right."""
+        new_contains = []
+        for cp_list in contains:
+            if len(cp_list) == 1 and not cp_list[0].is_localised():
+                cp = cp_list[0]
+                new_contains.append((CrossingPattern(cp.left, ""),))
+                new_contains.append((CrossingPattern("", cp.right),))
+            else:
+                new_contains.append(cp_list)
+        return new_contains
 
-    def add_contain(self, patt: CrossingPattern) -> "MotzkinPathsStartingWithU":
+    def _rebuilt(
+        self,
+        avoids: Tuple[Union[CrossingPattern, MotzkinPath], ...],
+        contains: Tuple[Tuple[Union[CrossingPattern, MotzkinPath], ...], ...],
+    ) -> "MotzkinPathsStartingWithU":
         return MotzkinPathsStartingWithU(
-            crossing_avoids=self.avoids, crossing_contains=self.contains + ((patt,),)
-        )
-
-    def objects_of_size(self, size: int) -> Iterator[MotzkinPath]:
-        if size < 2:
-            return
-
-        def trim(patts):
-            def sub_trim(patt):
-                if len(patt) < 1:
-                    return patt
-                if patt[0] == "U":
-                    if patt[-1] == "D":
-                        return MotzkinPath(patt[1:-1], pattern=True)
-                    return MotzkinPath(patt[1:], pattern=True)
-                if patt[-1] == "D":
-                    return MotzkinPath(patt[:-1], pattern=True)
-                return patt
-
-            return tuple(sub_trim(patt) for patt in patts)
-
-        left_avoids = []
-        right_avoids = []
-        crossing_avoids = []
-        for patt in self.avoids:
-            if len(patt.right) == 0:
-                left_avoids.append(patt.left)
-            if len(patt.left) == 0:
-                right_avoids.append(patt.right)
-            if len(patt.right) > 0 and len(patt.left) > 0:
-                crossing_avoids.append(patt)
-
-        left_contains = []
-        right_contains = []
-        crossing_contains = []
-        for patts in self.contains:
-            left_patts = []
-            right_patts = []
-            for patt in patts:
-                left_patts.append(patt.left)
-                right_patts.append(patt.right)
-            left_contains.append(left_patts)
-            right_contains.append(right_patts)
-            if all(len(patt.left) == 0 for patt in patts) or all(
-                len(patt.right) == 0 for patt in patts
-            ):
-                continue
-            crossing_contains.append(patts)
-        left_paths = MotzkinPaths(
-            trim(left_avoids), [trim(patts) for patts in left_contains]
+            crossing_avoids=avoids, crossing_contains=contains
         )
-        right_paths = MotzkinPaths(right_avoids, right_contains)
-        for i in range(size - 1):
-            for left_path in left_paths.objects_of_size(i):
-                for right_path in right_paths.objects_of_size(size - i - 2):
-                    path = MotzkinPath(("U",) + left_path + ("D",) + right_path)
-                    if all(path.avoids(p) for p in crossing_avoids) and all(
-                        any(path.contains(p) for p in patts)
-                        for patts in crossing_contains
-                    ):
-                        yield path
 
     def to_jsonable(self, prefix="U") -> dict:
         d = CombinatorialClass.to_jsonable(self)
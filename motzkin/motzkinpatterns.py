@@ -1,32 +1,277 @@
 """This module contains a class for Motzkin paths, patterns and crossing
 patterns."""
+import os
 from itertools import product
-from typing import Dict, FrozenSet, Iterable, Iterator, List, Set, Tuple, Union
-
-__all__ = ["MotzkinPath", "CrossingPattern"]
-
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from .cache import BoundedCache
+
+__all__ = ["MotzkinPath", "CrossingPattern", "ContainmentIndex", "CONTAINMENT"]
+
+
+_LETTER_CODES = {"D": 0, "H": 1, "U": 2}
+_CODE_LETTERS = "DHU"
+_ENCODE_TABLE = str.maketrans("DHU", "012")
+# every byte of a packed code holds four steps, these are the words they spell
+_BYTE_WORDS = tuple(
+    "".join(("DHUD"[(b >> s) & 3]) for s in (6, 4, 2, 0)) for b in range(256)
+)
+# and the codes of the four steps, for reading a path as a sequence of codes
+_BYTE_CODES = tuple(bytes((b >> s) & 3 for s in (6, 4, 2, 0)) for b in range(256))
+_STEPS = {"U": 1, "D": -1, "H": 0}
+_REVERSE_COMPLEMENT = str.maketrans("UD", "DU")
+
+
+def _encode(word: str) -> int:
+    """Return the key of a word over {U, D, H}. Each letter takes two bits
+    (D = 0, H = 1, U = 2), the first letter being the most significant, and a
+    sentinel bit above the letters records the length."""
+    return int("1" + word.translate(_ENCODE_TABLE), 4)
+
+
+def _decode(key: int) -> str:
+    """Return the word over {U, D, H} with the given key."""
+    length = (key.bit_length() - 1) >> 1
+    if not length:
+        return ""
+    pad = -length & 3
+    code = (key ^ (1 << (2 * length))) << (2 * pad)
+    data = code.to_bytes((length + pad) >> 2, "big")
+    return "".join([_BYTE_WORDS[b] for b in data])[:length]
+
+
+def _codes(key: int) -> bytes:
+    """Return the letter codes of the word with the given key."""
+    length = (key.bit_length() - 1) >> 1
+    if not length:
+        return b""
+    pad = -length & 3
+    code = (key ^ (1 << (2 * length))) << (2 * pad)
+    data = code.to_bytes((length + pad) >> 2, "big")
+    return b"".join([_BYTE_CODES[b] for b in data])[:length]
+
+
+def _subword_in(masks: Tuple[int, int, int], key: int, high: int, low: int) -> bool:
+    """Return True if the word with the given key is a subword of the letters
+    found at the bits in [low, high) of the path with the given masks. Each
+    letter is matched greedily to the highest, i.e. earliest, bit left."""
+    shift = key.bit_length() - 3
+    while shift >= 0:
+        found = masks[(key >> shift) & 3] & ((1 << high) - 1)
+        high = found.bit_length() - 1
+        if high < low:
+            return False
+        shift -= 2
+    return True
+
+
+def _is_motzkin_word(word: str) -> bool:
+    height = 0
+    for l in word:
+        height += _STEPS[l]
+        if height < 0:
+            return False
+    return height == 0
+
+
+def _minimal_superwords(word: str) -> List[str]:
+    """Return the candidates for the minimal Motzkin paths containing word.
+
+    Every candidate is generated once, from its leftmost occurrence of word:
+    a letter is only inserted before word[i] if it differs from word[i]. A
+    minimal path only needs inserted U and D steps, and no two inserted steps
+    can be deleted leaving a Motzkin path, so an inserted U never matches an
+    inserted D, no inserted D comes before an inserted U, and the height
+    returns below one between the last inserted U and the first inserted D.
+    """
+    n = len(word)
+    # the number of D steps left in word, every inserted U needs one of them
+    downs = [word.count("D", i) for i in range(n + 1)]
+    res = []
+    # a state is the index in word, the word built, its height, the bitmask
+    # of the unmatched U steps that were inserted, the number of these, if a
+    # D was inserted, and the least height since the last inserted U
+    stack = [(0, "", 0, 0, 0, False, 0)]
+    while stack:
+        i, curr, height, inserted, count, closed, low = stack.pop()
+        if i == n and not height:
+            res.append(curr)
+            continue
+        letter = word[i] if i < n else ""
+        top = (inserted >> (height - 1)) & 1 if height else 0
+        if letter == "U":
+            stack.append((i + 1, curr + "U", height + 1, inserted, count, closed, low))
+        elif letter == "H":
+            stack.append(
+                (i + 1, curr + "H", height, inserted, count, closed, min(low, height))
+            )
+        elif letter == "D" and height:
+            stack.append(
+                (
+                    i + 1,
+                    curr + "D",
+                    height - 1,
+                    inserted ^ (top << (height - 1)),
+                    count - top,
+                    closed,
+                    min(low, height - 1),
+                )
+            )
+        if letter != "U" and not closed and downs[i] > count:
+            stack.append(
+                (
+                    i,
+                    curr + "U",
+                    height + 1,
+                    inserted | (1 << height),
+                    count + 1,
+                    closed,
+                    height + 1,
+                )
+            )
+        if letter != "D" and height and not top and low < 1:
+            stack.append(
+                (i, curr + "D", height - 1, inserted, count, True, min(low, height - 1))
+            )
+    return res
+
+
+def _minimal_words(words: Iterable[str]) -> List[str]:
+    """Return the words that contain none of the others. Those kept so far are
+    indexed in a trie, which is searched for a subword of each word."""
+    by_length: Dict[int, List[str]] = {}
+    for word in words:
+        by_length.setdefault(len(word), []).append(word)
+    trie: dict = {}
+    res: List[str] = []
+    lengths = sorted(by_length)
+    for length in lengths:
+        # words of the same length can only contain each other if equal
+        new = [word for word in by_length[length] if not _trie_in(trie, word)]
+        res.extend(new)
+        if length == lengths[-1]:
+            break
+        for word in new:
+            node = trie
+            for l in word:
+                node = node.setdefault(l, {})
+            node[""] = None
+    return res
+
+
+def _trie_in(trie: dict, word: str) -> bool:
+    """Return True if a word in the trie is a subword of word. A word is
+    matched greedily, so each node of the trie is visited at most once."""
+    stack = [(trie, 0)]
+    find = word.find
+    while stack:
+        node, start = stack.pop()
+        for l, child in node.items():
+            if not l:
+                return True
+            index = find(l, start)
+            if index >= 0:
+                stack.append((child, index + 1))
+    return False
+
+
+class MotzkinPath:
+    """A Motzkin path, or if pattern is True any word over {U, D, H}.
+
+    The path is stored packed, two bits per step, and behaves like the tuple
+    of its letters, except that it is only equal to other paths, not to the
+    tuple of its letters, and that a slice of it is a path with pattern set
+    to True, not a tuple. The packed form is available through to_packed and
+    from_packed."""
+
+    __slots__ = ("_key", "pattern")
+    _key: int
+    pattern: bool
 
-class MotzkinPath(tuple):
     def __new__(cls, path: Iterable[str] = tuple(), pattern: bool = False):
-        return tuple.__new__(cls, path)
-
-    def __init__(self, path: Iterable[str] = tuple(), pattern: bool = False):
         """If pattern is set to True, then it has only to be a word over
         {U, D, H}, otherwise it must be a valid Motzkin path."""
-        if not all(l in ("U", "D", "H") for l in path):
-            raise ValueError('All letters must be "U", "D", or "H"')
-        self.pattern = bool(pattern)
+        pattern = bool(pattern)
+        if isinstance(path, MotzkinPath):
+            if not pattern and path.pattern and not path.is_motzkin_path():
+                raise ValueError("Path is not a Motzkin path.")
+            return cls._from_key(path._key, pattern)
+        if isinstance(path, str):
+            word = path
+            if word.count("U") + word.count("D") + word.count("H") != len(word):
+                raise ValueError('All letters must be "U", "D", or "H"')
+        else:
+            letters = tuple(path)
+            if not all(l in ("U", "D", "H") for l in letters):
+                raise ValueError('All letters must be "U", "D", or "H"')
+            word = "".join(letters)
         if not pattern:
             height = 0
-            for l in path:
-                if l == "U":
-                    height += 1
-                elif l == "D":
-                    height -= 1
+            for l in word:
+                height += _STEPS[l]
                 if height < 0:
                     raise ValueError("Path goes below x-axis.")
             if height:
                 raise ValueError("Path does not end on x-axis.")
+        return cls._from_key(_encode(word), pattern)
+
+    @classmethod
+    def _from_key(cls, key: int, pattern: bool) -> "MotzkinPath":
+        """Return the path with the given key, without any validation."""
+        path: MotzkinPath = object.__new__(cls)
+        path._key = key
+        path.pattern = pattern
+        return path
+
+    def to_packed(self) -> Tuple[int, int]:
+        """Return the pair (code, length) where code stores the steps with two
+        bits each, D = 0, H = 1 and U = 2, and the first step is the most
+        significant."""
+        length = len(self)
+        return self._key ^ (1 << (2 * length)), length
+
+    @classmethod
+    def from_packed(
+        cls, code: int, length: int, pattern: bool = False
+    ) -> "MotzkinPath":
+        """Return the path with the packed form (code, length) as returned by
+        to_packed."""
+        if length < 0 or code < 0 or code >> (2 * length):
+            raise ValueError("Code does not fit in the given length.")
+        key = code | (1 << (2 * length))
+        word = _decode(key)
+        if len(word) != length or any(
+            (code >> (2 * i)) & 3 == 3 for i in range(length)
+        ):
+            raise ValueError('All letters must be "U", "D", or "H"')
+        if not pattern and not _is_motzkin_word(word):
+            raise ValueError("Path is not a Motzkin path.")
+        return cls._from_key(key, bool(pattern))
+
+    def lift(self) -> "MotzkinPath":
+        """Return the path U + self + D."""
+        length = len(self)
+        code = self._key ^ (1 << (2 * length))
+        key = (0b110 << (2 * length + 2)) | (code << 2)
+        return MotzkinPath._from_key(key, self.pattern)
+
+    def reverse_complement(self) -> "MotzkinPath":
+        """Return the path read backwards with U and D swapped, the mirror
+        image of the path."""
+        word = _decode(self._key)[::-1].translate(_REVERSE_COMPLEMENT)
+        return MotzkinPath._from_key(_encode(word), self.pattern)
 
     def avoids(self, other: Union["CrossingPattern", "MotzkinPath"]) -> bool:
         return not self.contains(other)
@@ -36,29 +281,69 @@ class MotzkinPath(tuple):
         subword."""
         if isinstance(other, CrossingPattern):
             return other.contained_in(self)
-        else:
-            if len(self) < len(other):
-                return False
-
-            def recursive_check(path, patt):
-                patt = list(reversed(other))
-                while patt and path:
-                    curr = patt.pop()
-                    for i, l in enumerate(path):
-                        if l == curr:
-                            path = path[i + 1 :]
-                            break
-                    else:
-                        return False
-                return not patt
-
-            return recursive_check(self, other)
+        if len(self) < len(other):
+            return False
+        return _subword_in(self._masks(), other._key, 2 * len(self), 0)
+
+    def contains_any(
+        self, patterns: Iterable[Union["CrossingPattern", "MotzkinPath"]]
+    ) -> bool:
+        """Return True if self contains at least one of the patterns. The
+        occurrence table of self is built once and shared by all patterns."""
+        masks = self._masks()
+        top = 2 * len(self)
+        split = None
+        for patt in patterns:
+            if isinstance(patt, CrossingPattern):
+                if split is None:
+                    split = self._split_bit()
+                if _subword_in(masks, patt.left._key, top, split) and _subword_in(
+                    masks, patt.right._key, split, 0
+                ):
+                    return True
+            elif _subword_in(masks, patt._key, top, 0):
+                return True
+        return False
+
+    def avoids_all(
+        self, patterns: Iterable[Union["CrossingPattern", "MotzkinPath"]]
+    ) -> bool:
+        """Return True if self avoids every one of the patterns."""
+        return not self.contains_any(patterns)
+
+    def _masks(self) -> Tuple[int, int, int]:
+        """Return the occurrence table of the path, that is for each of D, H
+        and U the bitmask of the positions of the key where it occurs."""
+        key = self._key
+        even = ((1 << (key.bit_length() - 1)) - 1) // 3
+        hmask = key & even
+        umask = (key >> 1) & even
+        return even ^ hmask ^ umask, hmask, umask
+
+    def _split_bit(self) -> int:
+        """Return the position in the key of the first return, the letters up
+        to and including the first return are the bits at this position and
+        above."""
+        word = _decode(self._key)
+        if "U" not in word:
+            return 0
+        height = 0
+        for i, l in enumerate(word):
+            if l == "U":
+                height += 1
+            elif l == "D":
+                height -= 1
+            else:
+                continue
+            if height == 0:
+                return 2 * (len(word) - i - 1)
+        raise ValueError("something went wrong.")
 
     def heights(self) -> List[int]:
         """Return a list corresponding to the heights of the Motzkin path."""
         height = 0
         heights = [0]
-        for l in self:
+        for l in _decode(self._key):
             if l == "U":
                 height += 1
             elif l == "D":
@@ -67,66 +352,88 @@ class MotzkinPath(tuple):
         return heights
 
     def is_motzkin_path(self) -> bool:
-        height = 0
-        for l in self:
-            if l == "U":
-                height += 1
-            elif l == "D":
-                height -= 1
-            if height < 0:
-                return False
-        return height == 0
+        return _is_motzkin_word(_decode(self._key))
 
-    MINIMAL_SET_CACHE: Dict["MotzkinPath", FrozenSet["MotzkinPath"]] = {}
+    MINIMAL_SET_CACHE = BoundedCache("minimal_sets", max_entries=100000)
+    # the on-disk store of minimal sets, see motzkin.store
+    MINIMAL_SET_STORE: Any = None
 
     def minimal_set_for_avoidance(self) -> FrozenSet["MotzkinPath"]:
-        if self not in MotzkinPath.MINIMAL_SET_CACHE:
+        res: Optional[FrozenSet["MotzkinPath"]] = MotzkinPath.MINIMAL_SET_CACHE.get(
+            self
+        )
+        if res is None:
             if not self.pattern or self.is_motzkin_path():
-                MotzkinPath.MINIMAL_SET_CACHE[self] = frozenset([self])
+                res = frozenset([self])
             else:
-                seen = set()
-                to_process = set([self])
-                minimal_paths: Set["MotzkinPath"] = set()
-                while to_process:
-                    curr = to_process.pop()
-                    seen.add(curr)
-                    if any(p in curr for p in minimal_paths):
-                        continue
-                    if curr.is_motzkin_path():
-                        minimal_paths.add(curr)
-                        continue
-                    heights = curr.heights()
-                    below_indices = [
-                        i for i, v in enumerate(heights) if v < 0 and curr[i - 1] == "D"
-                    ]
-                    if below_indices:
-                        # add U to push above x-axis
-                        last_below = below_indices[-1]
-                        for j in range(last_below):
-                            new_path = MotzkinPath(
-                                curr[:j] + ("U",) + curr[j:], pattern=True
-                            )
-                            if new_path not in seen:
-                                to_process.add(new_path)
-                    else:
-                        # need to consider adding D as it doesn't end on the x-axis
-                        zero_indices = [i for i, v in enumerate(heights) if v == 0]
-                        last_zero = zero_indices[-1]
-                        for k in range(last_zero + 1, len(curr) + 1):
-                            new_path = MotzkinPath(
-                                curr[:k] + ("D",) + curr[k:], pattern=True
-                            )
-                            if new_path not in seen:
-                                to_process.add(new_path)
-                minimal_set: Set[MotzkinPath] = set()
-                for av in sorted(minimal_paths, key=len):
-                    if all(p not in av for p in minimal_set):
-                        minimal_set.add(av)
-                MotzkinPath.MINIMAL_SET_CACHE[self] = frozenset(minimal_set)
-        return MotzkinPath.MINIMAL_SET_CACHE[self]
+                store = _minimal_set_store()
+                if store is not None:
+                    res = store.get(self)
+                if res is None:
+                    res = self._compute_minimal_set_for_avoidance()
+            MotzkinPath.MINIMAL_SET_CACHE[self] = res
+        return res
+
+    def _compute_minimal_set_for_avoidance(self) -> FrozenSet["MotzkinPath"]:
+        """Return the minimal set for avoiding a pattern that is not a Motzkin
+        path, that is the minimal Motzkin paths containing it."""
+        return frozenset(
+            MotzkinPath(word, pattern=True)
+            for word in _minimal_words(_minimal_superwords(str(self)))
+        )
+
+    def minimal_set_for_avoidance_bfs(self) -> FrozenSet["MotzkinPath"]:
+        """Return the minimal set for avoiding the pattern, found by a search
+        over insertions of U and D steps. This is the original algorithm, it is
+        not cached and kept for comparison."""
+        if not self.pattern or self.is_motzkin_path():
+            return frozenset([self])
+        seen = set()
+        to_process = set([self])
+        minimal_paths: Set["MotzkinPath"] = set()
+        while to_process:
+            curr = to_process.pop()
+            seen.add(curr)
+            if any(p in curr for p in minimal_paths):
+                continue
+            if curr.is_motzkin_path():
+                minimal_paths.add(curr)
+                continue
+            heights = curr.heights()
+            below_indices = [
+                i for i, v in enumerate(heights) if v < 0 and curr[i - 1] == "D"
+            ]
+            if below_indices:
+                # add U to push above x-axis
+                last_below = below_indices[-1]
+                for j in range(last_below):
+                    new_path = MotzkinPath(curr[:j] + ("U",) + curr[j:], pattern=True)
+                    if new_path not in seen:
+                        to_process.add(new_path)
+            else:
+                # need to consider adding D as it doesn't end on the x-axis
+                zero_indices = [i for i, v in enumerate(heights) if v == 0]
+                last_zero = zero_indices[-1]
+                for k in range(last_zero + 1, len(curr) + 1):
+                    new_path = MotzkinPath(curr[:k] + ("D",) + curr[k:], pattern=True)
+                    if new_path not in seen:
+                        to_process.add(new_path)
+        minimal_set: Set[MotzkinPath] = set()
+        for av in sorted(minimal_paths, key=len):
+            if all(p not in av for p in minimal_set):
+                minimal_set.add(av)
+        return frozenset(minimal_set)
+
+    MINIMAL_SET_REC_CACHE = BoundedCache("minimal_sets_rec", max_entries=100000)
 
     def minimal_set_for_avoidance_rec(self) -> FrozenSet["MotzkinPath"]:
-        if self not in MotzkinPath.MINIMAL_SET_CACHE:
+        """Return the minimal set for avoiding the pattern, found recursively
+        from the patterns with one more U or D step. It is kept for
+        comparison and has its own cache."""
+        res: Optional[FrozenSet["MotzkinPath"]] = MotzkinPath.MINIMAL_SET_REC_CACHE.get(
+            self
+        )
+        if res is None:
             if self.is_motzkin_path():
                 minimal_set = set([self])
             else:
@@ -159,16 +466,18 @@ class MotzkinPath(tuple):
                 for av in sorted(avoids, key=len):
                     if all(p not in av for p in minimal_set):
                         minimal_set.add(av)
-            MotzkinPath.MINIMAL_SET_CACHE[self] = frozenset(minimal_set)
-        return MotzkinPath.MINIMAL_SET_CACHE[self]
+            res = frozenset(minimal_set)
+            MotzkinPath.MINIMAL_SET_REC_CACHE[self] = res
+        return res
 
     def split(self) -> Tuple["MotzkinPath", "MotzkinPath"]:
         """Return a pair of Motzkin paths where the first is up to the first
         return and the second is the Motzkin path after the first return."""
-        if MotzkinPath("U", pattern=True) not in self:
+        word = _decode(self._key)
+        if "U" not in word:
             return self, MotzkinPath()
         height = 0
-        for i, l in enumerate(self):
+        for i, l in enumerate(word):
             if l == "U":
                 height += 1
             elif l == "D":
@@ -177,7 +486,12 @@ class MotzkinPath(tuple):
                 continue
             if height == 0:
                 # first return
-                return MotzkinPath(self[: i + 1]), MotzkinPath(self[i + 1 :])
+                return (
+                    MotzkinPath._from_key(self._slice_key(0, i + 1), self.pattern),
+                    MotzkinPath._from_key(
+                        self._slice_key(i + 1, len(word)), self.pattern
+                    ),
+                )
         raise ValueError("something went wrong.")
 
     def to_jsonable(self) -> Tuple[str, ...]:
@@ -187,6 +501,23 @@ class MotzkinPath(tuple):
     def from_dict(cls, patt: Iterable[str]) -> "MotzkinPath":
         return MotzkinPath(patt)
 
+    def to_binary(self) -> bytes:
+        """Return the binary form of the path, see motzkin.binary."""
+        from .binary import to_binary  # pylint: disable=import-outside-toplevel
+
+        return to_binary(self)
+
+    @classmethod
+    def from_binary(cls, data: bytes, trusted: bool = False) -> "MotzkinPath":
+        """Return the path with the binary form data. If trusted is True the
+        data must come from to_binary, and the path is not checked."""
+        from .binary import from_binary  # pylint: disable=import-outside-toplevel
+
+        res = from_binary(data, trusted)
+        if not isinstance(res, cls):
+            raise ValueError("The data is not a path.")
+        return res
+
     def ascii_plot(self) -> str:
         height = 0
         res = [[" " for _ in range(len(self))] for _ in range(len(self))]
@@ -205,26 +536,137 @@ class MotzkinPath(tuple):
             return self.contains(other)
         raise NotImplementedError
 
-    def __add__(self, other: Tuple[str, ...]) -> "MotzkinPath":
-        other = self.__class__(other)
-        return MotzkinPath(tuple(self) + tuple(other))
+    def __len__(self) -> int:
+        return (self._key.bit_length() - 1) >> 1
+
+    def __bool__(self) -> bool:
+        return self._key != 1
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(_decode(self._key))
+
+    def __reversed__(self) -> Iterator[str]:
+        return reversed(_decode(self._key))
+
+    def __getitem__(self, index):
+        """Return the letter at index, or for a slice the subword as a
+        pattern."""
+        length = len(self)
+        if isinstance(index, slice):
+            start, stop, step = index.indices(length)
+            if step != 1:
+                return MotzkinPath(_decode(self._key)[index], pattern=True)
+            return MotzkinPath._from_key(self._slice_key(start, stop), True)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("MotzkinPath index out of range")
+        return _CODE_LETTERS[(self._key >> (2 * (length - index - 1))) & 3]
+
+    def _slice_key(self, start: int, stop: int) -> int:
+        """Return the key of the subword from start to stop."""
+        width = max(stop - start, 0)
+        code = (self._key >> (2 * (len(self) - start - width))) & (
+            (1 << (2 * width)) - 1
+        )
+        return code | (1 << (2 * width))
+
+    def count(self, letter: str) -> int:
+        if letter not in _LETTER_CODES:
+            return 0
+        return _decode(self._key).count(letter)
+
+    def index(self, letter: str) -> int:
+        if letter in _LETTER_CODES:
+            i = _decode(self._key).find(letter)
+            if i != -1:
+                return i
+        raise ValueError("{} is not in path".format(repr(letter)))
+
+    def __add__(self, other: Iterable[str]) -> "MotzkinPath":
+        """Return the concatenation. It is a pattern unless both self and
+        other are Motzkin paths."""
+        if not isinstance(other, MotzkinPath):
+            other = MotzkinPath(other, pattern=True)
+        length = len(other)
+        code = other._key ^ (1 << (2 * length))
+        return MotzkinPath._from_key(
+            (self._key << (2 * length)) | code, self.pattern or other.pattern
+        )
+
+    def __radd__(self, other: Iterable[str]) -> "MotzkinPath":
+        return MotzkinPath(other, pattern=True) + self
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, MotzkinPath):
+            return self._key == other._key
+        return NotImplemented
+
+    def __ne__(self, other) -> bool:
+        if isinstance(other, MotzkinPath):
+            return self._key != other._key
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self._key)
 
     def __lt__(self, other) -> bool:
         if isinstance(other, MotzkinPath):
-            return (len(self), tuple(self)) < (len(other), tuple(other))
+            # the key orders by length and then lexicographically
+            return self._key < other._key
+        raise NotImplementedError
+
+    def __le__(self, other) -> bool:
+        if isinstance(other, MotzkinPath):
+            return self._key <= other._key
+        raise NotImplementedError
+
+    def __gt__(self, other) -> bool:
+        if isinstance(other, MotzkinPath):
+            return self._key > other._key
+        raise NotImplementedError
+
+    def __ge__(self, other) -> bool:
+        if isinstance(other, MotzkinPath):
+            return self._key >= other._key
         raise NotImplementedError
 
+    def __sizeof__(self) -> int:
+        return object.__sizeof__(self) + self._key.__sizeof__()
+
+    def __reduce__(self):
+        return (MotzkinPath._from_key, (self._key, self.pattern))
+
     def __repr__(self) -> str:
         return "MotzkinPath({})".format(repr(tuple(self)))
 
     def __str__(self) -> str:
         if not self:
             return "\u03BB"
-        return "".join(l for l in self)
+        return _decode(self._key)
+
+
+def _minimal_set_store():
+    """Return the store of minimal sets in use, opening the one named by the
+    environment variable MOTZKIN_MINIMAL_SET_STORE if none is set."""
+    global _STORE_FROM_ENVIRONMENT  # pylint: disable=global-statement
+    if MotzkinPath.MINIMAL_SET_STORE is None and not _STORE_FROM_ENVIRONMENT:
+        _STORE_FROM_ENVIRONMENT = True
+        filename = os.environ.get("MOTZKIN_MINIMAL_SET_STORE")
+        if filename:
+            from .store import (  # pylint: disable=import-outside-toplevel
+                use_minimal_set_store,
+            )
+
+            use_minimal_set_store(filename)
+    return MotzkinPath.MINIMAL_SET_STORE
+
+
+_STORE_FROM_ENVIRONMENT = False
 
 
 class CrossingPattern(object):
-    def __init__(self, left: Tuple[str, ...], right: Tuple[str, ...]):
+    def __init__(self, left: Iterable[str], right: Iterable[str]):
         if not all(l in ("U", "D", "H") for l in left) or not all(
             l in ("U", "D", "H") for l in right
         ):
@@ -238,8 +680,24 @@ class CrossingPattern(object):
     def contained_in(self, path: MotzkinPath) -> bool:
         """Return True if the Motzkin path contains left before its first
         return and right after its first return."""
-        before, after = path.split()
-        return self.left in before and self.right in after
+        split = path._split_bit()
+        masks = path._masks()
+        return _subword_in(masks, self.left._key, 2 * len(path), split) and (
+            _subword_in(masks, self.right._key, split, 0)
+        )
+
+    def contains_any(self, patterns: Iterable["CrossingPattern"]) -> bool:
+        """Return True if at least one of the crossing patterns is contained
+        in self, with left in left and right in right."""
+        left_masks = self.left._masks()
+        right_masks = self.right._masks()
+        left_top = 2 * len(self.left)
+        right_top = 2 * len(self.right)
+        return any(
+            _subword_in(left_masks, patt.left._key, left_top, 0)
+            and _subword_in(right_masks, patt.right._key, right_top, 0)
+            for patt in patterns
+        )
 
     def is_left_localised(self) -> bool:
         return not self.right
@@ -269,10 +727,28 @@ class CrossingPattern(object):
 
     @classmethod
     def from_dict(cls, d: dict):
-        left = MotzkinPath.from_dict(d.pop("left"))
-        right = MotzkinPath.from_dict(d.pop("right"))
+        # the sides are any words, so are read as patterns
+        left = MotzkinPath(d.pop("left"), pattern=True)
+        right = MotzkinPath(d.pop("right"), pattern=True)
         return CrossingPattern(left, right)
 
+    def to_binary(self) -> bytes:
+        """Return the binary form of the crossing pattern, see motzkin.binary."""
+        from .binary import to_binary  # pylint: disable=import-outside-toplevel
+
+        return to_binary(self)
+
+    @classmethod
+    def from_binary(cls, data: bytes, trusted: bool = False) -> "CrossingPattern":
+        """Return the crossing pattern with the binary form data. If trusted is
+        True the data must come from to_binary, and it is not checked."""
+        from .binary import from_binary  # pylint: disable=import-outside-toplevel
+
+        res = from_binary(data, trusted)
+        if not isinstance(res, cls):
+            raise ValueError("The data is not a crossing pattern.")
+        return res
+
     def __contains__(self, other) -> bool:
         if isinstance(other, CrossingPattern):
             return other.left in self.left and other.right in self.right
@@ -327,6 +803,96 @@ class CrossingPattern(object):
         return "{}-{}".format(str(self.left), str(self.right))
 
 
+class ContainmentIndex:
+    """Decides containment between the patterns of sets of Motzkin paths,
+    either MotzkinPath or CrossingPattern, remembering the answers.
+
+    A pattern can only contain another if it has at least as many of each
+    letter, on each side for crossing patterns, and if it has exactly as many
+    only if they are equal. These pairs are answered from the letter counts
+    without matching the words. The other pairs are matched once and then
+    looked up, as the same pairs are compared in many sets during a search.
+    """
+
+    def __init__(self, max_entries: Optional[int] = 1000000):
+        self.signatures = BoundedCache("signatures", max_entries=max_entries)
+        self.pairs = BoundedCache("containment", max_entries=max_entries)
+        self.checks = 0
+        self.skipped = 0
+
+    @staticmethod
+    def _key(patt: Union["CrossingPattern", MotzkinPath]) -> Hashable:
+        if isinstance(patt, CrossingPattern):
+            return patt.left._key, patt.right._key
+        return patt._key
+
+    def signature(self, patt: Union["CrossingPattern", MotzkinPath]) -> Tuple[int, ...]:
+        """Return the numbers of U, D and H in the pattern, for a crossing
+        pattern those in the left and then those in the right."""
+        key = self._key(patt)
+        res: Optional[Tuple[int, ...]] = self.signatures.get(key)
+        if res is None:
+            if isinstance(patt, CrossingPattern):
+                res = _letter_counts(patt.left) + _letter_counts(patt.right)
+            else:
+                res = _letter_counts(patt)
+            self.signatures[key] = res
+        return res
+
+    def contains(
+        self,
+        patt: Union["CrossingPattern", MotzkinPath],
+        other: Union["CrossingPattern", MotzkinPath],
+    ) -> bool:
+        """Return True if patt contains other."""
+        self.checks += 1
+        key, other_key = self._key(patt), self._key(other)
+        if key == other_key:
+            self.skipped += 1
+            return True
+        signature, other_signature = self.signature(patt), self.signature(other)
+        if signature == other_signature or any(
+            a < b for a, b in zip(signature, other_signature)
+        ):
+            self.skipped += 1
+            return False
+        res: Optional[bool] = self.pairs.get((key, other_key))
+        if res is None:
+            res = other in patt
+            self.pairs[(key, other_key)] = res
+        return res
+
+    def contains_any(
+        self,
+        patt: Union["CrossingPattern", MotzkinPath],
+        patterns: Iterable[Union["CrossingPattern", MotzkinPath]],
+    ) -> bool:
+        """Return True if patt contains at least one of the patterns."""
+        return any(self.contains(patt, other) for other in patterns)
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of containment checks, how many of them were
+        answered from the letter counts, and how many from earlier checks."""
+        return {
+            "checks": self.checks,
+            "skipped": self.skipped,
+            "memoised": self.pairs.hits,
+            "matched": self.pairs.misses,
+        }
+
+    def reset_stats(self) -> None:
+        self.checks = 0
+        self.skipped = 0
+        self.pairs.reset_stats()
+
+
+def _letter_counts(path: MotzkinPath) -> Tuple[int, int, int]:
+    return path.count("U"), path.count("D"), path.count("H")
+
+
+CONTAINMENT = ContainmentIndex()
+
+
 if __name__ == "__main__":
     patt = MotzkinPath("HHUUDUUHUU", True)
     patt = MotzkinPath("UUDU", True)
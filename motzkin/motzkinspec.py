@@ -1,18 +1,103 @@
-from typing import Iterable
+import os
+from typing import Any, Dict, Iterable, Tuple
 
-from comb_spec_searcher import CombinatorialSpecificationSearcher
+from comb_spec_searcher import (
+    CombinatorialSpecification,
+    CombinatorialSpecificationSearcher,
+)
 
+from .cache import CacheScope
 from .motzkinpaths import MotzkinPaths
-from .motzkinpatterns import MotzkinPath
+from .motzkinpatterns import CONTAINMENT, MotzkinPath
 from .strategies import MotzkinPack
+from .symmetry import reverse_complement_class
 
 __all__ = "MotzkinSpecificationFinder"
 
 
 class MotzkinSpecificationFinder(CombinatorialSpecificationSearcher):
     pack = MotzkinPack
+    # the on-disk cache of specifications, see motzkin.speccache
+    SPECIFICATION_CACHE: Any = None
 
-    def __init__(self, patterns: Iterable[Iterable[str]], **kwargs):
+    def __init__(
+        self, patterns: Iterable[Iterable[str]], scope_caches: bool = True, **kwargs
+    ):
+        """If scope_caches is True the entries that auto_search adds to the
+        caches of the library are removed at its end, and their statistics
+        for the search are kept in cache_stats, and those of the containment
+        checks between patterns in containment_stats."""
         patterns = tuple(MotzkinPath(patt, pattern=True) for patt in patterns)
         start_class = MotzkinPaths(patterns)
+        self.start_class = start_class
+        self.scope_caches = scope_caches
+        self.cache_stats: Dict[str, Dict[str, Any]] = {}
+        self.containment_stats: Dict[str, int] = {}
         super().__init__(start_class, MotzkinPack, **kwargs)
+
+    def auto_search(self, **kwargs):
+        """Return the specification for the start class from the cache of
+        specifications if there is one, and otherwise search for it and add
+        it to the cache."""
+        cache = _specification_cache()
+        if cache is not None:
+            spec = cache.get(self.start_class)
+            if spec is not None:
+                return spec
+        spec = self._auto_search(**kwargs)
+        if cache is not None and spec is not None:
+            cache.put(self.start_class, spec)
+        return spec
+
+    def find_symmetric(self, **kwargs) -> Tuple[CombinatorialSpecification, bool]:
+        """Return a specification for the start class or for its reverse
+        complement, and whether it is the one for the reverse complement.
+        That is only returned if it is in the cache of specifications and
+        the one for the start class is not, otherwise this is auto_search.
+
+        The counts of the two classes are the same, and the paths of one are
+        the reverse complements of those of the other, see motzkin.symmetry."""
+        cache = _specification_cache()
+        if cache is not None:
+            spec = cache.get(self.start_class)
+            if spec is not None:
+                return spec, False
+            flipped = reverse_complement_class(self.start_class)
+            if flipped != self.start_class:
+                spec = cache.get(flipped)
+                if spec is not None:
+                    return spec, True
+        return self.auto_search(**kwargs), False
+
+    def _auto_search(self, **kwargs):
+        if not self.scope_caches:
+            return super().auto_search(**kwargs)
+        scope = CacheScope()
+        with scope:
+            CONTAINMENT.reset_stats()
+            spec = super().auto_search(**kwargs)
+            self.containment_stats = CONTAINMENT.stats()
+        self.cache_stats = scope.stats
+        return spec
+
+
+def _specification_cache():
+    """Return the cache of specifications in use, opening the one named by
+    the environment variable MOTZKIN_SPECIFICATION_CACHE if none is set."""
+    global _CACHE_FROM_ENVIRONMENT  # pylint: disable=global-statement
+    if (
+        MotzkinSpecificationFinder.SPECIFICATION_CACHE is None
+        and not _CACHE_FROM_ENVIRONMENT
+    ):
+        _CACHE_FROM_ENVIRONMENT = True
+        directory = os.environ.get("MOTZKIN_SPECIFICATION_CACHE")
+        if directory:
+            from .speccache import (  # pylint: disable=import-outside-toplevel
+                use_specification_cache,
+            )
+
+            use_specification_cache(directory)
+    return MotzkinSpecificationFinder.SPECIFICATION_CACHE
+
+
+_CACHE_FROM_ENVIRONMENT = False
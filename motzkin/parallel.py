@@ -0,0 +1,159 @@
+"""This module generates the paths of a size of a set of Motzkin paths in
+parallel. The paths of a size are ordered lexicographically and the range of
+their indices is split into shards of at most shard_size paths each. A worker
+process starts generating a shard at the path with its first index, found
+with unrank, so the shards need no coordination and each takes time in
+proportion to its number of paths.
+
+The paths can be streamed back in lexicographic order, or each shard can be
+written to its own file, and an interrupted export then resumes with the
+shards whose files are missing.
+
+    python -m motzkin.parallel [--processes N] [--shard-size N]
+        --size N OUTPUT PATTERN ..."""
+import argparse
+import os
+import tempfile
+from multiprocessing import Pool
+from typing import Iterator, List, Optional, Tuple
+
+from .motzkinpaths import MotzkinPaths
+from .motzkinpatterns import MotzkinPath
+
+__all__ = ["export_objects_of_size", "parallel_objects_of_size", "shards"]
+
+# the set of Motzkin paths of a worker process
+_CLASS: Optional[MotzkinPaths] = None
+
+
+def shards(total: int, shard_size: int) -> List[Tuple[int, int]]:
+    """Return the ranges (start, stop) of the indices from 0 to total split
+    into consecutive shards of shard_size indices, the last may be shorter."""
+    if shard_size < 1:
+        raise ValueError("The shards must have at least one path.")
+    return [
+        (start, min(start + shard_size, total)) for start in range(0, total, shard_size)
+    ]
+
+
+def _shards(
+    total: int, shard_size: Optional[int], largest: int
+) -> List[Tuple[int, int]]:
+    """Return the shards, by default 256 of them, or more if they would have
+    more than largest paths, so that the processes are kept busy until the
+    end. The default depends on total only, so that an export is split the
+    same way when it is resumed."""
+    if shard_size is None:
+        shard_size = max(1, min(largest, -(-total // 256)))
+    return shards(total, shard_size)
+
+
+def _initialise(data: dict, size: int) -> None:
+    global _CLASS  # pylint: disable=global-statement
+    _CLASS = MotzkinPaths.from_dict(dict(data))
+    # build the counting tables once for all the shards of the worker
+    _CLASS.count_objects_of_size(size)
+
+
+def _generate(task: Tuple[int, int, int]) -> List[int]:
+    """Return the keys of the paths in the shard."""
+    size, start, stop = task
+    assert _CLASS is not None
+    return [path._key for path in _CLASS.objects_of_size(size, start, stop)]
+
+
+def _write(task: Tuple[int, int, int, str]) -> str:
+    """Write the paths in the shard to filename, one per line."""
+    size, start, stop, filename = task
+    assert _CLASS is not None
+    fd, temporary = tempfile.mkstemp(dir=os.path.dirname(filename))
+    try:
+        with os.fdopen(fd, "w") as f:
+            for path in _CLASS.objects_of_size(size, start, stop):
+                f.write(str(path) + "\n")
+        os.replace(temporary, filename)
+    except BaseException:
+        os.remove(temporary)
+        raise
+    return filename
+
+
+def _pool(comb_class: MotzkinPaths, size: int, processes: Optional[int]):
+    return Pool(
+        processes, initializer=_initialise, initargs=(comb_class.to_jsonable(), size)
+    )
+
+
+def parallel_objects_of_size(
+    comb_class: MotzkinPaths,
+    size: int,
+    processes: Optional[int] = None,
+    shard_size: Optional[int] = None,
+) -> Iterator[MotzkinPath]:
+    """Yield the paths of the given size in comb_class in lexicographic order,
+    as objects_of_size does, generated by processes worker processes. The
+    shards have at most shard_size paths, by default at most 100000."""
+    total = comb_class.count_objects_of_size(size)
+    tasks = [(size, start, stop) for start, stop in _shards(total, shard_size, 100000)]
+    if not tasks:
+        return
+    with _pool(comb_class, size, processes) as pool:
+        for keys in pool.imap(_generate, tasks):
+            for key in keys:
+                yield MotzkinPath._from_key(key, False)
+
+
+def export_objects_of_size(
+    comb_class: MotzkinPaths,
+    size: int,
+    directory: str,
+    processes: Optional[int] = None,
+    shard_size: Optional[int] = None,
+) -> List[str]:
+    """Write the paths of the given size in comb_class, one per line, to a
+    file for each shard in directory, and return the filenames in the order
+    of the shards. The file of a shard is named by the size and its first
+    index, and a shard whose file exists is not generated again, so the
+    shard_size must be the same when resuming an export. By default the
+    shards have at most 1000000 paths."""
+    os.makedirs(directory, exist_ok=True)
+    total = comb_class.count_objects_of_size(size)
+    tasks = [
+        (
+            size,
+            start,
+            stop,
+            os.path.join(directory, "paths-{}-{:012d}.txt".format(size, start)),
+        )
+        for start, stop in _shards(total, shard_size, 1000000)
+    ]
+    missing = [task for task in tasks if not os.path.exists(task[3])]
+    if missing:
+        with _pool(comb_class, size, processes) as pool:
+            for _ in pool.imap_unordered(_write, missing):
+                pass
+    return [task[3] for task in tasks]
+
+
+def main(args: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Write the paths of a size avoiding the patterns to files."
+    )
+    parser.add_argument("output", help="the directory of the files")
+    parser.add_argument("patterns", nargs="+", help="the patterns avoided")
+    parser.add_argument("--size", type=int, required=True)
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--shard-size", type=int, default=None)
+    parsed = parser.parse_args(args)
+    filenames = export_objects_of_size(
+        MotzkinPaths(parsed.patterns),
+        parsed.size,
+        parsed.output,
+        processes=parsed.processes,
+        shard_size=parsed.shard_size,
+    )
+    print("Wrote {} files to {}.".format(len(filenames), parsed.output))
+
+
+if __name__ == "__main__":
+    main()
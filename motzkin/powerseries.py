@@ -0,0 +1,206 @@
+"""This module computes the generating functions gamma and delta of
+motzkin.recurrences as power series in x truncated after n terms, with exact
+integer coefficients instead of sympy expressions.
+
+A series in x is a tuple of n integers. A series in x and y is a tuple of n
+polynomials in y, each a tuple of integers starting with the constant term.
+C is the series of the Catalan numbers in x^2. The divisions by the kernels
+y - x*C and x - y*(1 - x) of the recurrences are exact, and are done one
+coefficient of x at a time by dividing a polynomial by y.
+
+The time taken grows with the cube of n: gamma has up to n coefficients in y
+for each of the n coefficients in x, and substituting a series for y or
+dividing by a kernel costs up to n products for each of them. The products
+are of integers with a number of digits growing linearly with n. For a
+pattern of length 8, 100 terms take a fraction of a second, 400 terms about
+20 seconds and 1000 terms several minutes. These are meant for checking the
+recurrences against the first hundreds of counts, not for computing thousands
+of terms."""
+from itertools import zip_longest
+from typing import List, Optional, Sequence, Tuple
+
+from .cache import BoundedCache
+
+__all__ = ["catalan_series", "delta_series", "gamma_series"]
+
+Series = Tuple[int, ...]
+BivariateSeries = Tuple[Tuple[int, ...], ...]
+Polynomial = List[int]
+
+# the powers of the series substituted for y, by the series and the length
+POWERS_CACHE = BoundedCache("series_powers", max_entries=32)
+# the series of the prefixes of the patterns, by their word and length
+GAMMA_SERIES_CACHE = BoundedCache("gamma_series", max_entries=100000)
+DELTA_SERIES_CACHE = BoundedCache("delta_series", max_entries=100000)
+
+
+def catalan_series(n: int) -> Series:
+    """Return the first n coefficients of C = 2 / (1 + sqrt(1 - 4x^2))."""
+    res = [0] * n
+    catalan = 1
+    for k in range(0, n, 2):
+        res[k] = catalan
+        catalan = catalan * 2 * (k + 1) // (k // 2 + 2)
+    return tuple(res)
+
+
+def _mul(a: Sequence[int], b: Sequence[int], n: int) -> List[int]:
+    res = [0] * n
+    for i, c in enumerate(a[:n]):
+        if c:
+            for j, d in enumerate(b[: n - i]):
+                res[i + j] += c * d
+    return res
+
+
+def _cumsum(a: Sequence[int]) -> List[int]:
+    res = []
+    total = 0
+    for c in a:
+        total += c
+        res.append(total)
+    return res
+
+
+def _add(p: Sequence[int], q: Sequence[int], scale: int = 1) -> Polynomial:
+    """Return p + scale * q without trailing zeros."""
+    res = [c + scale * d for c, d in zip_longest(p, q, fillvalue=0)]
+    while res and not res[-1]:
+        res.pop()
+    return res
+
+
+def _add_into(p: Polynomial, q: Sequence[int], scale: int) -> None:
+    """Add scale * q to p in place, leaving trailing zeros."""
+    if len(q) > len(p):
+        p.extend([0] * (len(q) - len(p)))
+    for i, d in enumerate(q):
+        p[i] += scale * d
+
+
+def _trimmed(p: Polynomial) -> Polynomial:
+    while p and not p[-1]:
+        p.pop()
+    return p
+
+
+def _times_y(p: Sequence[int]) -> Polynomial:
+    return [0] + list(p) if p else []
+
+
+def _over_y(p: Sequence[int]) -> Polynomial:
+    if p and p[0]:
+        raise ValueError("The division by the kernel is not exact.")
+    return list(p[1:])
+
+
+def _powers(name: str, n: int) -> Tuple[Series, ...]:
+    """Return the powers 0 to n - 1 of the series x/(1 - x) or x*C, whichever
+    name is, truncated after n terms."""
+    res: Optional[Tuple[Series, ...]] = POWERS_CACHE.get((name, n))
+    if res is None:
+        if name == "x/(1-x)":
+            base = [0] + [1] * (n - 1)
+        else:
+            base = [0] + list(catalan_series(n - 1))
+        powers = [[1] + [0] * (n - 1)]
+        for _ in range(1, n):
+            powers.append(_mul(powers[-1], base, n))
+        res = tuple(tuple(power) for power in powers)
+        POWERS_CACHE[(name, n)] = res
+    return res
+
+
+def _substitute(g: BivariateSeries, name: str, n: int) -> List[int]:
+    """Return g with y replaced by the series name, see _powers."""
+    powers = _powers(name, n)
+    res = [0] * n
+    for m, poly in enumerate(g):
+        for k, c in enumerate(poly):
+            if c:
+                power = powers[k]
+                for i in range(k, n - m):
+                    res[m + i] += c * power[i]
+    return res
+
+
+def gamma_series(word: str, n: int) -> BivariateSeries:
+    """Return the first n coefficients in x of gamma of the pattern word, as
+    polynomials in y."""
+    res: Optional[BivariateSeries] = GAMMA_SERIES_CACHE.get((word, n))
+    if res is not None:
+        return res
+    if not word:
+        return ((1,),) + ((),) * (n - 1) if n else ()
+    g = gamma_series(word[:-1], n)
+    zero: Polynomial = []
+    series: List[Polynomial] = []
+    if word[-1] == "U":
+        # x*y/((1 - x)(x - y(1 - x))) * (x * g(x/(1 - x)) - y(1 - x) * g)
+        shifted = [0] + _substitute(g, "x/(1-x)", n)
+        previous = zero
+        total = zero
+        for m in range(n):
+            f = _add(
+                [shifted[m]], _times_y(_add(g[m], g[m - 1] if m else zero, -1)), -1
+            )
+            # (x - y(1 - x)) * q = f, so y * q_m = (1 + y) * q_{m - 1} - f_m
+            series.append(_times_y(total))
+            q = _over_y(_add(_add(previous, _times_y(previous)), f, -1))
+            total = _add(total, q)
+            previous = q
+    elif word[-1] == "H":
+        # x/((y - x*C)(1 - x*y - C*x^2)) * (y * g - x*C * g(x*C))
+        xc = [0] + list(catalan_series(n - 1)) if n else []
+        xcg = _mul(xc, _substitute(g, "x*C", n), n)
+        qs: List[Polynomial] = []
+        for m in range(n):
+            # (y - x*C) * q = f, so y * q_m is f_m plus x*C * q at x^m
+            f = _add(_times_y(g[m]), [xcg[m]], -1)
+            for j in range(1, m + 1, 2):
+                _add_into(f, qs[m - j], xc[j])
+            qs.append(_over_y(_trimmed(f)))
+        cxx = [0, 0] + list(catalan_series(n - 2)) if n > 1 else [0] * n
+        hs: List[Polynomial] = []
+        for m in range(n):
+            h = _add(qs[m], _times_y(hs[m - 1]) if m else zero)
+            for j in range(2, m + 1, 2):
+                _add_into(h, hs[m - j], cxx[j])
+            hs.append(_trimmed(h))
+        series = [zero] + hs[: n - 1]
+    elif word[-1] == "D":
+        # x/y * (g/(1 - x*y - x) - g(0)/(1 - x))
+        constants = _cumsum([poly[0] if poly else 0 for poly in g])
+        h = zero
+        qs = []
+        for m in range(n):
+            h = _add(g[m], _add(h, _times_y(h)))
+            qs.append(_over_y(_add(h, [constants[m]], -1)))
+        series = [zero] + qs[: n - 1]
+    else:
+        raise ValueError("this isn't a motzkin path")
+    res = tuple(tuple(poly) for poly in series[:n])
+    GAMMA_SERIES_CACHE[(word, n)] = res
+    return res
+
+
+def delta_series(word: str, n: int) -> Series:
+    """Return the first n coefficients of delta of the pattern word, the
+    generating function of the Motzkin paths avoiding it."""
+    res: Optional[Series] = DELTA_SERIES_CACHE.get((word, n))
+    if res is not None:
+        return res
+    if not word:
+        return (0,) * n
+    g = gamma_series(word[:-1], n)
+    if word[-1] == "D":
+        term = _cumsum([poly[0] if poly else 0 for poly in g])
+    elif word[-1] == "H":
+        term = _mul(catalan_series(n), _substitute(g, "x*C", n), n)
+    elif word[-1] == "U":
+        term = _cumsum(_substitute(g, "x/(1-x)", n))
+    else:
+        raise ValueError("this isn't a motzkin path")
+    res = tuple(a + b for a, b in zip(delta_series(word[:-1], n), term))
+    DELTA_SERIES_CACHE[(word, n)] = res
+    return res
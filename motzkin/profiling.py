@@ -0,0 +1,273 @@
+"""This module contains an opt-in profiler of the hot functions of the library,
+for example the construction of sets of Motzkin paths, their emptiness checks
+and generation, the containment checks between patterns and the minimal sets
+for avoidance.
+
+While a Profiler is enabled the functions in TARGETS are replaced by wrappers
+counting their calls, their cumulative time, the sizes asked for, the results
+of the checks and the paths yielded, and the hits and misses of every cache are
+tallied. When it is disabled the functions are restored, so a profiler that is
+not in use costs nothing.
+
+    with Profiler() as profiler:
+        spec = MotzkinSpecificationFinder(["UHD"]).auto_search()
+    profiler.stats()["functions"]["MotzkinPaths.is_empty"]["calls"]
+    profiler.to_json("profile.json")"""
+import functools
+import importlib
+import json
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+from .cache import CACHES, BoundedCache
+
+__all__ = ["Profiler"]
+
+# the functions profiled: the module, the class, the attribute, the index of
+# the argument that is a size or None, and whether the time is also kept for
+# each set of Motzkin paths it is called on
+TARGETS: Tuple[Tuple[str, str, str, Optional[int], bool], ...] = (
+    ("motzkin.motzkinpaths", "MotzkinPaths", "__init__", None, False),
+    ("motzkin.motzkinpaths", "MotzkinPaths", "_cleanup", None, False),
+    ("motzkin.motzkinpaths", "MotzkinPaths", "_motzkinify", None, False),
+    ("motzkin.motzkinpaths", "MotzkinPaths", "is_empty", None, True),
+    ("motzkin.motzkinpaths", "MotzkinPathsStartingWithH", "is_empty", None, True),
+    ("motzkin.motzkinpaths", "MotzkinPaths", "objects_of_size", 1, True),
+    ("motzkin.motzkinpaths", "MotzkinPaths", "count_objects_of_size", 1, True),
+    ("motzkin.motzkinpaths", "MotzkinPaths", "terms", 1, True),
+    ("motzkin.motzkinpaths", "MotzkinPaths", "random_sample", 1, True),
+    ("motzkin.motzkinpaths", "MotzkinPaths", "_build_matcher", None, False),
+    (
+        "motzkin.motzkinpaths",
+        "MotzkinPathsStartingWithH",
+        "_build_matcher",
+        None,
+        False,
+    ),
+    (
+        "motzkin.motzkinpaths",
+        "MotzkinPathsStartingWithU",
+        "_build_matcher",
+        None,
+        False,
+    ),
+    ("motzkin.motzkinpatterns", "MotzkinPath", "contains", None, False),
+    ("motzkin.motzkinpatterns", "MotzkinPath", "contains_any", None, False),
+    (
+        "motzkin.motzkinpatterns",
+        "MotzkinPath",
+        "minimal_set_for_avoidance",
+        None,
+        False,
+    ),
+    ("motzkin.motzkinpatterns", "ContainmentIndex", "contains", None, False),
+    ("motzkin.matcher", "PatternMatcher", "terms", 1, False),
+    ("motzkin.matcher", "PatternMatcher", "completions", 3, False),
+    ("motzkin.matcher", "PatternMatcher", "paths_of_size", 1, False),
+    ("motzkin.matcher", "PatternMatcher", "shortest_witness", 1, False),
+    ("motzkin.matcher", "PatternMatcher", "accepts", None, False),
+)
+
+_CACHE_COUNTERS = ("hits", "misses", "evictions")
+
+
+def _new_record() -> Dict[str, Any]:
+    return {"calls": 0, "time": 0.0, "sizes": Counter(), "results": Counter()}
+
+
+class Profiler:
+    """Profiles the functions in TARGETS and the caches while it is enabled,
+    either between enable and disable or in a with statement. The counts add
+    up over the times it is enabled, until reset is called."""
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.functions: Dict[str, Dict[str, Any]] = {}
+        # the time and number of calls for each set of Motzkin paths
+        self.classes: Dict[Hashable, List[float]] = {}
+        self.caches: Dict[str, Counter] = {}
+        self._cache_base: Dict[str, Tuple[int, ...]] = {}
+        self._patched: List[Tuple[Any, str, Any]] = []
+        self._active: Counter = Counter()
+        self._class_depth = 0
+
+    def enable(self) -> None:
+        if self.enabled:
+            return
+        for name, cache in CACHES.items():
+            self._cache_base[name] = self._counters(cache)
+        for module, owner, attribute, size_arg, per_class in TARGETS:
+            cls = getattr(importlib.import_module(module), owner)
+            func = cls.__dict__[attribute]
+            wrapper = self._wrap(
+                "{}.{}".format(owner, attribute), func, size_arg, per_class
+            )
+            self._patched.append((cls, attribute, func))
+            setattr(cls, attribute, wrapper)
+        profiler = self
+        reset_stats = BoundedCache.reset_stats
+
+        @functools.wraps(reset_stats)
+        def reset_and_keep(cache: BoundedCache) -> None:
+            profiler._bank(cache)
+            reset_stats(cache)
+            profiler._cache_base[cache.name] = (0, 0, 0)
+
+        self._patched.append((BoundedCache, "reset_stats", reset_stats))
+        BoundedCache.reset_stats = reset_and_keep  # type: ignore
+        self.enabled = True
+
+    def disable(self) -> None:
+        if not self.enabled:
+            return
+        for cls, attribute, func in reversed(self._patched):
+            setattr(cls, attribute, func)
+        self._patched.clear()
+        for cache in CACHES.values():
+            self._bank(cache)
+        self._cache_base.clear()
+        self.enabled = False
+
+    def reset(self) -> None:
+        """Forget everything counted so far."""
+        for record in self.functions.values():
+            record.update(_new_record())
+        self.classes.clear()
+        self.caches.clear()
+        for name, cache in CACHES.items():
+            if name in self._cache_base:
+                self._cache_base[name] = self._counters(cache)
+
+    @staticmethod
+    def _counters(cache: BoundedCache) -> Tuple[int, ...]:
+        return tuple(getattr(cache, counter) for counter in _CACHE_COUNTERS)
+
+    def _bank(self, cache: BoundedCache) -> None:
+        """Add the counts of cache since it was last banked."""
+        base = self._cache_base.get(cache.name, (0, 0, 0))
+        counts = self.caches.setdefault(cache.name, Counter())
+        for counter, value, start in zip(_CACHE_COUNTERS, self._counters(cache), base):
+            counts[counter] += value - start
+        self._cache_base[cache.name] = self._counters(cache)
+
+    def _wrap(
+        self, name: str, func: Callable, size_arg: Optional[int], per_class: bool
+    ) -> Callable:
+        record = self.functions.setdefault(name, _new_record())
+        active = self._active
+        # the result of completions is the number of ways to complete a
+        # prefix, and the prefixes with none are rejected
+        count_nonzero = name == "PatternMatcher.completions"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            record["calls"] += 1
+            if size_arg is not None and len(args) > size_arg:
+                record["sizes"][args[size_arg]] += 1
+            outermost_class = per_class and not self._class_depth
+            self._class_depth += per_class
+            active[name] += 1
+            start = time.perf_counter()
+            try:
+                res = func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                active[name] -= 1
+                self._class_depth -= per_class
+                if not active[name]:
+                    record["time"] += elapsed
+                if outermost_class:
+                    self._add_class(args[0], elapsed)
+            if isinstance(res, bool):
+                record["results"][res] += 1
+            elif count_nonzero:
+                record["results"][bool(res)] += 1
+            elif isinstance(res, Iterator):
+                return self._iterate(record, res, args[0] if outermost_class else None)
+            return res
+
+        return wrapper
+
+    def _iterate(
+        self, record: Dict[str, Any], iterator: Iterator, comb_class: Any
+    ) -> Iterator:
+        """Yield from iterator, adding the time taken to record and the set of
+        Motzkin paths comb_class, and counting the items in record."""
+        record.setdefault("yielded", 0)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                elapsed = time.perf_counter() - start
+                record["time"] += elapsed
+                if comb_class is not None:
+                    self._add_class(comb_class, elapsed, calls=0)
+            record["yielded"] += 1
+            yield item
+
+    def _add_class(self, comb_class: Any, elapsed: float, calls: int = 1) -> None:
+        entry = self.classes.setdefault(comb_class, [0.0, 0])
+        entry[0] += elapsed
+        entry[1] += calls
+
+    def stats(self, top: int = 20) -> Dict[str, Any]:
+        """Return the counts as a dictionary with the keys functions, caches,
+        paths and classes. The classes are the top sets of Motzkin paths by
+        the time spent checking, counting and generating their paths."""
+        functions = {
+            name: dict(
+                record,
+                sizes=dict(sorted(record["sizes"].items())),
+                results={str(k).lower(): v for k, v in record["results"].items()},
+            )
+            for name, record in self.functions.items()
+            if record["calls"]
+        }
+        caches: Dict[str, Dict[str, Any]] = {
+            name: dict(counts) for name, counts in self.caches.items()
+        }
+        if self.enabled:
+            for name, cache in CACHES.items():
+                counts = caches.setdefault(name, dict.fromkeys(_CACHE_COUNTERS, 0))
+                base = self._cache_base.get(name, (0, 0, 0))
+                for counter, value, start in zip(
+                    _CACHE_COUNTERS, self._counters(cache), base
+                ):
+                    counts[counter] += value - start
+        for counts in caches.values():
+            lookups = counts["hits"] + counts["misses"]
+            counts["hit_rate"] = counts["hits"] / lookups if lookups else None
+        completions = self.functions.get("PatternMatcher.completions")
+        paths = self.functions.get("PatternMatcher.paths_of_size")
+        slowest = sorted(self.classes.items(), key=lambda item: -item[1][0])[:top]
+        return {
+            "functions": functions,
+            "caches": caches,
+            "paths": {
+                "generated": paths.get("yielded", 0) if paths else 0,
+                "rejected": completions["results"][False] if completions else 0,
+            },
+            "classes": [
+                {"class": repr(comb_class), "time": elapsed, "calls": calls}
+                for comb_class, (elapsed, calls) in slowest
+            ],
+        }
+
+    def to_json(self, filename: Optional[str] = None, top: int = 20) -> str:
+        """Return the stats as JSON, and write them to filename if given."""
+        res = json.dumps(self.stats(top), indent=2)
+        if filename is not None:
+            with open(filename, "w") as f:
+                f.write(res)
+        return res
+
+    def __enter__(self) -> "Profiler":
+        self.enable()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.disable()
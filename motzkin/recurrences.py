@@ -1,10 +1,13 @@
 # In this file we implement the recurrences that prove the forms of the generating function.
 import logging
+from itertools import product
+from typing import Dict
 
 import logzero
-from sympy import Expr, Number, ratsimp, sqrt, var
+from sympy import Expr, Number, cancel, ratsimp, sqrt, together, var
 
-from motzkin import MotzkinPath, MotzkinSpecificationFinder
+from motzkin import MotzkinPath
+from motzkin.cache import BoundedCache
 
 logzero.loglevel(logging.WARNING)
 
@@ -15,101 +18,101 @@ C = var("C")  # 2 / (1 + sqrt(1 - 4 * x ** 2))  # catalan generating function
 Cgenf = 2 / (1 + sqrt(1 - 4 * x ** 2))  # (1 - sqrt(1 - 4 * x ** 2)) / (2 * x ** 2)
 
 
-def gamma(q: MotzkinPath) -> Expr:
-    if len(q) == 0:
+# The generating functions of the prefixes of the patterns, keyed by their
+# word, so that patterns sharing a prefix share its computation. They are only
+# cancelled, that is put over a common denominator without common factors,
+# which is much cheaper than ratsimp and enough to substitute into them.
+GAMMA_CACHE = BoundedCache("gamma", max_entries=100000)
+DELTA_CACHE = BoundedCache("delta", max_entries=100000)
+
+
+def _gamma(word: str) -> Expr:
+    res = GAMMA_CACHE.get(word)
+    if res is not None:
+        return res
+    if not word:
         return Number(1)
-    qprime = MotzkinPath(q[:-1], pattern=True)
-    gammaprime = gamma(qprime)
-    if q[-1] == "U":
-        return ratsimp(
+    gammaprime = _gamma(word[:-1])
+    if word[-1] == "U":
+        res = cancel(
             (x * y / ((1 - x) * (x - y * (1 - x))))
             * (x * gammaprime.subs({y: x / (1 - x)}) - y * (1 - x) * gammaprime)
         )
-    if q[-1] == "H":
-        return ratsimp(
+    elif word[-1] == "H":
+        res = cancel(
             # (x / (y - x - x * y ** 2))
             (2 * x / ((y - x * C) * (1 - 2 * x * y + 1 - C * 2 * x ** 2)))
             * (y * gammaprime - x * C * gammaprime.subs({y: x * C}))
         )
-    if q[-1] == "D":
-        return ratsimp(
+    elif word[-1] == "D":
+        res = cancel(
             (x / y) * (gammaprime / (1 - x * y - x) - gammaprime.subs({y: 0}) / (1 - x))
         )
-    raise ValueError("this isn't a motzkin path")
+    else:
+        raise ValueError("this isn't a motzkin path")
+    GAMMA_CACHE[word] = res
+    return res
 
 
-def delta(q: MotzkinPath) -> Expr:
-    if len(q) == 0:
+def _delta(word: str) -> Expr:
+    """Return delta as the sum of a term for each letter, which is only put
+    over a common denominator once by the caller."""
+    res = DELTA_CACHE.get(word)
+    if res is not None:
+        return res
+    if not word:
         return Number(0)
-    qprime = MotzkinPath(q[:-1], pattern=True)
-    gammaprime = gamma(qprime)
-    deltaprime = delta(qprime)
-    if q[-1] == "D":
-        return ratsimp(deltaprime + gammaprime.subs({y: 0}) / (1 - x))
-    if q[-1] == "H":
-        return ratsimp(deltaprime + C * gammaprime.subs({y: x * C}))
-    if q[-1] == "U":
-        return ratsimp(deltaprime + gammaprime.subs({y: x / (1 - x)}) / (1 - x))
-    raise ValueError("this isn't a motzkin path")
+    gammaprime = _gamma(word[:-1])
+    if word[-1] == "D":
+        term = gammaprime.subs({y: 0}) / (1 - x)
+    elif word[-1] == "H":
+        term = C * gammaprime.subs({y: x * C})
+    elif word[-1] == "U":
+        term = gammaprime.subs({y: x / (1 - x)}) / (1 - x)
+    else:
+        raise ValueError("this isn't a motzkin path")
+    res = _delta(word[:-1]) + cancel(term)
+    DELTA_CACHE[word] = res
+    return res
+
+
+def gamma(q: MotzkinPath) -> Expr:
+    return ratsimp(_gamma("".join(q)))
+
+
+def delta(q: MotzkinPath) -> Expr:
+    return ratsimp(together(_delta("".join(q))))
+
+
+def generating_functions(
+    max_length: int, simplify: bool = True
+) -> Dict[MotzkinPath, Expr]:
+    """Return delta for every pattern up to length max_length. The patterns
+    are visited in lexicographic order, so the prefixes they share are in the
+    cache when needed. If simplify is False the generating functions are not
+    passed through ratsimp, only put over a common denominator."""
+    res: Dict[MotzkinPath, Expr] = {}
+    for length in range(max_length + 1):
+        for letters in product("UDH", repeat=length):
+            gf = together(_delta("".join(letters)))
+            res[MotzkinPath(letters, pattern=True)] = ratsimp(gf) if simplify else gf
+    return res
 
 
 if __name__ == "__main__":
-    N = 10
-    # ALL:
-    msf = MotzkinSpecificationFinder([])
-    spec = msf.auto_search()
-    for i in range(5, 6):
-        for q in spec.generate_objects_of_size(i):
-            # print(q, type(q))
-            # if sum(1 for l in q if l == "H") == 3:
-            #     continue
-            # if q in (
-            #     MotzkinPath("HHHHH"),
-            #     MotzkinPath("HHHUD"),
-            #     MotzkinPath("HHUDH"),
-            #     # MotzkinPath("HUDHH"),
-            #     # MotzkinPath("HHUHD"),
-            #     # MotzkinPath("HUDUD"),
-            #     # MotzkinPath("HUHDH"),
-            #     # MotzkinPath("HUHHD"),
-            #     # MotzkinPath("HUHHD"),
-            #     # MotzkinPath("HUHHD"),
-            #     # MotzkinPath("HUUDD"),
-            #     # MotzkinPath("UDHHH"),
-            #     # MotzkinPath("UDHUD"),
-            #     # MotzkinPath("UDUDH"),
-            #     # MotzkinPath("UDUHD"),
-            #     # MotzkinPath("UHDHH"),
-            #     # MotzkinPath("UHDUD"),
-            #     # MotzkinPath("UHHDH"),
-            #     # MotzkinPath("UUDDH"),
-            #     # MotzkinPath("UHHDH"),
-            # ):
-            #     continue
-            print("Now cheking", q)
-            gf = delta(MotzkinPath(q, pattern=True))
-            actualgf = gf.subs({C: Cgenf})
-            term = actualgf.series(n=None)
-            try:
-                terms = [next(term) / x ** i for i in range(N)]
-            except:
-                print(gf)
-                print(actualgf)
-                print("Skipped", q)
-                continue
-
-            # q = "H"
-            msf = MotzkinSpecificationFinder([q])
-            qspec = msf.auto_search()
-            actual = [qspec.count_objects_of_size(i) for i in range(N)]
-
-            # print(spec.get_genf())
-            # print(gf)
-            # print(actualgf)
-
-            if actual != terms:
-                print("===== FAIL ====", q, "==== FAIL ====")
-                print(gf)
-                print(actualgf)
-                print("SPEC:", actual)
-                print("RECS:", terms)
+    from motzkin.validation import main
+
+    # check the recurrences of the Motzkin paths of size 5 against the counts
+    # of their specifications, see motzkin.validation
+    main(
+        [
+            "recurrences.jsonl",
+            "--from",
+            "5",
+            "--up-to",
+            "5",
+            "--motzkin-paths",
+            "--method",
+            "spec",
+        ]
+    )
@@ -0,0 +1,113 @@
+"""This module contains an on-disk cache of the specifications found by
+MotzkinSpecificationFinder, keyed by the normalised class the search starts
+from, so that a basis is only ever searched once.
+
+Each specification is a file in the binary form of motzkin.binary, named by
+the SHA-256 of the jsonable start class, and written atomically, so the cache
+can be shared by any number of processes. The files are only ever written by
+the cache, so they are read as trusted, without normalising the classes in
+them again, and the counts are checked instead. Set the environment variable
+MOTZKIN_SPECIFICATION_CACHE to its directory, or call use_specification_cache,
+to have MotzkinSpecificationFinder look up specifications there before
+searching."""
+import hashlib
+import json
+import os
+import tempfile
+from typing import Optional
+
+from comb_spec_searcher import CombinatorialSpecification
+
+from .binary import from_binary, to_binary
+from .cache import BoundedCache
+from .motzkinpaths import MotzkinPaths
+from .motzkinspec import MotzkinSpecificationFinder
+
+__all__ = ["SpecificationCache", "use_specification_cache"]
+
+
+class SpecificationCache:
+    """A directory of specifications. A specification found there is checked
+    against the counts of its start class for the sizes below
+    validation_terms, and is discarded if they differ."""
+
+    # the specifications read from a file, by their filename
+    LOADED = BoundedCache("specifications", max_entries=64)
+
+    def __init__(self, directory: str, validation_terms: int = 8):
+        self.directory = os.path.abspath(directory)
+        self.validation_terms = validation_terms
+
+    @staticmethod
+    def key(comb_class: MotzkinPaths) -> str:
+        """Return the key of the class, the SHA-256 of its jsonable form."""
+        data = json.dumps(comb_class.to_jsonable(), sort_keys=True)
+        return hashlib.sha256(data.encode()).hexdigest()
+
+    def _filename(self, comb_class: MotzkinPaths) -> str:
+        key = SpecificationCache.key(comb_class)
+        return os.path.join(self.directory, key[:2], key + ".bin")
+
+    def get(self, comb_class: MotzkinPaths) -> Optional[CombinatorialSpecification]:
+        """Return the specification for comb_class, or None if it is not in
+        the cache."""
+        filename = self._filename(comb_class)
+        spec: Optional[CombinatorialSpecification] = SpecificationCache.LOADED.get(
+            filename
+        )
+        if spec is not None:
+            return spec
+        try:
+            with open(filename, "rb") as f:
+                spec = from_binary(f.read(), trusted=True)
+        except (FileNotFoundError, ValueError):
+            return None
+        if spec.root != comb_class:
+            return None
+        terms = comb_class.terms(self.validation_terms - 1)
+        if [spec.count_objects_of_size(n) for n in range(len(terms))] != terms:
+            self.discard(comb_class)
+            return None
+        SpecificationCache.LOADED[filename] = spec
+        return spec
+
+    def put(self, comb_class: MotzkinPaths, spec: CombinatorialSpecification) -> None:
+        """Store the specification for comb_class."""
+        filename = self._filename(comb_class)
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        data = to_binary(spec)
+        fd, temporary = tempfile.mkstemp(dir=os.path.dirname(filename))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temporary, filename)
+        except BaseException:
+            os.remove(temporary)
+            raise
+        SpecificationCache.LOADED[filename] = spec
+
+    def discard(self, comb_class: MotzkinPaths) -> None:
+        """Remove the specification for comb_class, if there is one."""
+        filename = self._filename(comb_class)
+        if filename in SpecificationCache.LOADED:
+            del SpecificationCache.LOADED[filename]
+        try:
+            os.remove(filename)
+        except FileNotFoundError:
+            pass
+
+    def __contains__(self, comb_class: MotzkinPaths) -> bool:
+        return os.path.exists(self._filename(comb_class))
+
+    def __repr__(self) -> str:
+        return "SpecificationCache({})".format(repr(self.directory))
+
+
+def use_specification_cache(
+    directory: Optional[str],
+) -> Optional[SpecificationCache]:
+    """Look up specifications in the cache in directory, or in no cache if
+    directory is None, and return the cache."""
+    cache = None if directory is None else SpecificationCache(directory)
+    MotzkinSpecificationFinder.SPECIFICATION_CACHE = cache
+    return cache
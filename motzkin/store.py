@@ -0,0 +1,121 @@
+"""This module contains an on-disk store of the minimal sets of Motzkin paths
+for avoiding a pattern, as computed by MotzkinPath.minimal_set_for_avoidance.
+
+The store is an SQLite file built once for all words up to some length. It
+is opened lazily, read-only and without locking, so it can be shared by any
+number of processes. Set the environment variable MOTZKIN_MINIMAL_SET_STORE
+to its filename, or call use_minimal_set_store, to have MotzkinPath look up
+minimal sets there before computing them."""
+import os
+import sqlite3
+from itertools import product
+from typing import FrozenSet, Optional
+from urllib.parse import quote
+
+from .motzkinpatterns import MotzkinPath
+
+__all__ = ["MinimalSetStore", "build_minimal_set_store", "use_minimal_set_store"]
+
+# the keys are stored as SQLite integers, which are signed 64-bit
+MAX_STORED_LENGTH = 31
+
+
+class MinimalSetStore:
+    """A read-only view of a store of minimal sets built by
+    build_minimal_set_store. The connection is opened on the first lookup,
+    and again in a process forked after it."""
+
+    def __init__(self, filename: str):
+        self.filename = os.path.abspath(filename)
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._max_length: Optional[int] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None or self._pid != os.getpid():
+            if not os.path.exists(self.filename):
+                raise FileNotFoundError(self.filename)
+            uri = "file:{}?mode=ro&immutable=1".format(quote(self.filename))
+            self._connection = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            self._pid = os.getpid()
+            row = self._connection.execute(
+                "SELECT value FROM meta WHERE name = 'max_length'"
+            ).fetchone()
+            self._max_length = int(row[0])
+        return self._connection
+
+    @property
+    def max_length(self) -> int:
+        """All patterns up to this length are in the store."""
+        self._connect()
+        assert self._max_length is not None
+        return self._max_length
+
+    def get(self, patt: MotzkinPath) -> Optional[FrozenSet[MotzkinPath]]:
+        """Return the minimal set for avoiding patt, or None if it is not in
+        the store."""
+        connection = self._connect()
+        if len(patt) > MAX_STORED_LENGTH:
+            return None
+        row = connection.execute(
+            "SELECT paths FROM minimal_sets WHERE key = ?", (patt._key,)
+        ).fetchone()
+        if row is None:
+            return None
+        return frozenset(
+            MotzkinPath._from_key(int(key), True) for key in row[0].split()
+        )
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def __getstate__(self):
+        return {"filename": self.filename}
+
+    def __setstate__(self, state):
+        self.__init__(state["filename"])
+
+    def __repr__(self) -> str:
+        return "MinimalSetStore({})".format(repr(self.filename))
+
+
+def build_minimal_set_store(filename: str, max_length: int) -> MinimalSetStore:
+    """Compute the minimal sets of every pattern up to length max_length that
+    is not a Motzkin path and write them to a new store in filename."""
+    if not 0 <= max_length <= MAX_STORED_LENGTH:
+        raise ValueError(
+            "The length must be between 0 and {}.".format(MAX_STORED_LENGTH)
+        )
+    if os.path.exists(filename):
+        raise FileExistsError(filename)
+    connection = sqlite3.connect(filename)
+    with connection:
+        connection.execute("CREATE TABLE meta (name TEXT PRIMARY KEY, value TEXT)")
+        connection.execute(
+            "CREATE TABLE minimal_sets (key INTEGER PRIMARY KEY, paths TEXT)"
+        )
+        connection.execute(
+            "INSERT INTO meta VALUES ('max_length', ?)", (str(max_length),)
+        )
+        for length in range(max_length + 1):
+            rows = []
+            for letters in product("UDH", repeat=length):
+                patt = MotzkinPath(letters, pattern=True)
+                if patt.is_motzkin_path():
+                    continue
+                minimal_set = patt._compute_minimal_set_for_avoidance()
+                paths = " ".join(str(p._key) for p in sorted(minimal_set))
+                rows.append((patt._key, paths))
+            connection.executemany("INSERT INTO minimal_sets VALUES (?, ?)", rows)
+    connection.close()
+    return MinimalSetStore(filename)
+
+
+def use_minimal_set_store(filename: Optional[str]) -> Optional[MinimalSetStore]:
+    """Look up minimal sets in the store in filename, or in no store if
+    filename is None, and return the store."""
+    store = None if filename is None else MinimalSetStore(filename)
+    MotzkinPath.MINIMAL_SET_STORE = store
+    return store
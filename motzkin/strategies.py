@@ -1,5 +1,5 @@
 from itertools import chain
-from typing import Iterator, Optional, Tuple, cast
+from typing import Iterator, Optional, Tuple, Union, cast
 
 from comb_spec_searcher import (
     AtomStrategy,
@@ -67,7 +67,7 @@ class Expansion(DisjointUnionStrategy):
 class PattInsertion(DisjointUnionStrategy):
     def __init__(
         self,
-        pattern: MotzkinPath,
+        pattern: Union[CrossingPattern, MotzkinPath],
         ignore_parent=False,
         inferrable=True,
         possibly_empty=True,
@@ -101,9 +101,9 @@ class PattInsertion(DisjointUnionStrategy):
     def from_dict(cls, d: dict) -> "PattInsertion":
         patt = d.pop("pattern")
         return PattInsertion(
-            pattern=MotzkinPath.from_dict(patt)
-            if isinstance(patt, tuple)
-            else CrossingPattern.from_dict(patt),
+            pattern=CrossingPattern.from_dict(patt)
+            if isinstance(patt, dict)
+            else MotzkinPath.from_dict(patt),
             ignore_parent=d.pop("ignore_parent"),
             inferrable=d.pop("inferrable"),
             possibly_empty=d.pop("possibly_empty"),
@@ -127,6 +127,7 @@ class PattInsertionFactory(StrategyFactory):
     ) -> Iterator[PattInsertion]:
         if isinstance(motzkin_paths, MotzkinPathsStartingWithU):
             for cp in chain(motzkin_paths.avoids, *motzkin_paths.contains):
+                assert isinstance(cp, CrossingPattern)
                 if not cp.is_localised():
                     cpleft = CrossingPattern(cp.left, "")
                     cpright = CrossingPattern("", cp.right)
@@ -178,10 +179,11 @@ class Factor(CartesianProductStrategy):
     ) -> Iterator[MotzkinPath]:
         if isinstance(motzkin_paths, MotzkinPathsStartingWithU):
             assert isinstance(objs[1], MotzkinPath)
-            yield MotzkinPath(("U",) + objs[1] + ("D",) + objs[2])
+            assert isinstance(objs[2], MotzkinPath)
+            yield objs[1].lift() + objs[2]
         elif isinstance(motzkin_paths, MotzkinPathsStartingWithH):
             assert isinstance(objs[1], MotzkinPath)
-            yield MotzkinPath(("H",) + objs[1])
+            yield MotzkinPath("H") + objs[1]
 
     def forward_map(
         self,
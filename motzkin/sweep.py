@@ -0,0 +1,375 @@
+"""This module runs MotzkinSpecificationFinder on many sets of patterns, each
+in its own process with a timeout and a memory limit, so that a slow or large
+class only holds up one of the workers.
+
+The result of each search is appended to a JSON lines file as soon as it
+finishes, with the keys patterns, status ("ok", "timeout", "memory" or
+"error"), time, counts and spec (the jsonable specification) or error. A sweep
+that is interrupted can be run again on the same file and only searches the
+sets of patterns without a result. Of two sets of patterns that are the
+reverse complements of each other only one is searched, see motzkin.symmetry.
+
+    python -m motzkin.sweep [--processes N] [--timeout SECONDS]
+        [--memory MEGABYTES] [--terms N] [--up-to LENGTH] [--size K]
+        [--retry] [--no-symmetry] [--profile] OUTPUT [FILE ...]
+
+Each line of a FILE is a set of patterns separated by spaces or commas."""
+import argparse
+import json
+import logging
+import os
+import time
+from collections import Counter, deque
+from itertools import combinations, product
+from multiprocessing import Pipe, Process
+from multiprocessing.connection import Connection, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, cast
+
+import logzero  # type: ignore
+
+from .motzkinpatterns import CONTAINMENT, MotzkinPath
+from .motzkinspec import MotzkinSpecificationFinder
+from .profiling import Profiler
+from .symmetry import canonical_basis, reverse_complement_basis
+
+__all__ = ["bases_up_to", "read_results", "read_tasks", "run_sweep", "run_tasks"]
+
+Task = Tuple[str, ...]
+
+
+def _task(patterns: Iterable[Iterable[str]]) -> Task:
+    return tuple(sorted(set("".join(patt) for patt in patterns)))
+
+
+def read_tasks(filename: str) -> Iterator[Task]:
+    """Yield the sets of patterns in filename, one for each line that is not
+    blank or a comment starting with #."""
+    with open(filename) as f:
+        for line in f:
+            line = line.split("#", 1)[0].replace(",", " ")
+            if line.strip():
+                yield _task(line.split())
+
+
+def bases_up_to(length: int, size: int = 1) -> Iterator[Task]:
+    """Yield every set of size patterns of length 1 to length, none of which
+    contains another."""
+    patterns = [
+        MotzkinPath(letters, pattern=True)
+        for n in range(1, length + 1)
+        for letters in product("UDH", repeat=n)
+    ]
+    for basis in combinations(patterns, size):
+        if not any(
+            CONTAINMENT.contains(patt, other)
+            for patt, other in product(basis, repeat=2)
+            if patt is not other
+        ):
+            yield _task(basis)
+
+
+def read_results(filename: str) -> Dict[Task, Dict[str, Any]]:
+    """Return the results in the JSON lines file written by run_sweep, by
+    their set of patterns. A line cut short by an interrupted sweep is
+    ignored."""
+    res: Dict[Task, Dict[str, Any]] = {}
+    if not os.path.exists(filename):
+        return res
+    with open(filename) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            res[_task(record["patterns"])] = record
+    return res
+
+
+def _work(
+    target: Callable[..., Dict[str, Any]],
+    task: Task,
+    args: Tuple[Any, ...],
+    memory: Optional[int],
+    connection,
+) -> None:
+    """Send on connection the record returned by target(task, *args), with
+    the keys patterns and time added. This is the target of the worker
+    processes."""
+    logzero.loglevel(logging.WARNING)
+    if memory is not None:
+        import resource  # pylint: disable=import-outside-toplevel
+
+        resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    start = time.perf_counter()
+    try:
+        record = target(task, *args)
+    except MemoryError:
+        record = {"status": "memory"}
+    except Exception as e:  # pylint: disable=broad-except
+        record = {"status": "error", "error": repr(e)}
+    record = {"patterns": list(task), **record}
+    record["time"] = time.perf_counter() - start
+    try:
+        connection.send(record)
+    except MemoryError:
+        connection.send({"patterns": list(task), "status": "memory"})
+
+
+def run_tasks(
+    tasks: Iterable[Task],
+    target: Callable[..., Dict[str, Any]],
+    args: Tuple[Any, ...],
+    output: str,
+    processes: Optional[int] = None,
+    timeout: Optional[float] = None,
+    memory: Optional[int] = None,
+    records: Iterable[Dict[str, Any]] = (),
+    related: Optional[Callable[[Dict[str, Any]], List[Dict[str, Any]]]] = None,
+) -> Dict[str, int]:
+    """Call target(task, *args) for each task, each in its own process and up
+    to processes at once, and append the record it returns to output as soon
+    as it finishes. The records given are appended first.
+
+    Each process is stopped after timeout seconds, and may use at most memory
+    bytes. The record of a task has the keys patterns, status and time, and
+    the status is "timeout", "memory" or "error" if its process is stopped or
+    fails. The records returned by related, called on each record, are
+    appended after it. Return the number of records with each status."""
+    pending = deque(tasks)
+    processes = processes or os.cpu_count() or 1
+    running: Dict[Connection, Tuple[Task, Process, float]] = {}
+    statuses: Counter = Counter()
+    with open(output, "a+") as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell():
+            f.seek(f.tell() - 1)
+            if f.read(1) != "\n":
+                f.write("\n")
+
+        def finish(record: Dict[str, Any]) -> None:
+            for rec in [record] + (related(record) if related is not None else []):
+                f.write(json.dumps(rec) + "\n")
+                statuses[rec["status"]] += 1
+            f.flush()
+
+        for record in records:
+            finish(record)
+        try:
+            while pending or running:
+                while pending and len(running) < processes:
+                    task = pending.popleft()
+                    receiver, sender = Pipe(duplex=False)
+                    process = Process(
+                        target=_work,
+                        args=(target, task, args, memory, sender),
+                        daemon=True,
+                    )
+                    process.start()
+                    sender.close()
+                    running[receiver] = (task, process, time.perf_counter())
+                wait_time = None
+                if timeout is not None:
+                    started = min(start for _, _, start in running.values())
+                    wait_time = max(0.0, started + timeout - time.perf_counter())
+                ready = cast(List[Connection], wait(list(running), wait_time))
+                for receiver in ready:
+                    task, process, start = running.pop(receiver)
+                    try:
+                        record = receiver.recv()
+                    except EOFError:
+                        process.join()
+                        record = {
+                            "patterns": list(task),
+                            "status": "error",
+                            "error": "The process exited with code {}.".format(
+                                process.exitcode
+                            ),
+                            "time": time.perf_counter() - start,
+                        }
+                    receiver.close()
+                    process.join()
+                    finish(record)
+                if timeout is not None:
+                    now = time.perf_counter()
+                    for receiver, (task, process, start) in list(running.items()):
+                        if now - start >= timeout:
+                            del running[receiver]
+                            process.terminate()
+                            process.join()
+                            receiver.close()
+                            finish(
+                                {
+                                    "patterns": list(task),
+                                    "status": "timeout",
+                                    "time": now - start,
+                                }
+                            )
+        finally:
+            for receiver, (_, process, _) in running.items():
+                process.terminate()
+                process.join()
+                receiver.close()
+    return dict(statuses)
+
+
+def _search(patterns: Task, terms: int, profile: bool) -> Dict[str, Any]:
+    profiler = Profiler()
+    if profile:
+        profiler.enable()
+    spec, flipped = MotzkinSpecificationFinder(patterns).find_symmetric()
+    profiler.disable()
+    res: Dict[str, Any] = {
+        "counts": [spec.count_objects_of_size(n) for n in range(terms)],
+        "status": "ok",
+    }
+    if flipped:
+        # the cached spec is that of the reverse complement of the patterns
+        res["symmetric_to"] = list(_task(reverse_complement_basis(patterns)))
+    res["spec"] = spec.to_jsonable()
+    if profile:
+        res["profile"] = profiler.stats()
+    return res
+
+
+def _symmetric_record(record: Dict[str, Any], task: Task) -> Dict[str, Any]:
+    """Return the result for task, the reverse complement of the set of
+    patterns of record."""
+    res = {
+        "patterns": list(task),
+        "status": record["status"],
+        "time": 0.0,
+        "symmetric_to": record["patterns"],
+    }
+    if "counts" in record:
+        res["counts"] = record["counts"]
+    return res
+
+
+def run_sweep(
+    tasks: Iterable[Iterable[Iterable[str]]],
+    output: str,
+    processes: Optional[int] = None,
+    timeout: Optional[float] = None,
+    memory: Optional[int] = None,
+    terms: int = 10,
+    retry: bool = False,
+    symmetric: bool = True,
+    profile: bool = False,
+) -> Dict[str, int]:
+    """Search for a specification for each set of patterns in tasks, running
+    up to processes searches at once, and append the results to output.
+
+    Each search is stopped after timeout seconds, and its process may use at
+    most memory bytes. The sets of patterns with a result in output are
+    skipped, unless retry is True and their search did not succeed.
+
+    If symmetric is True only one set of patterns of each orbit under
+    reverse complement is searched, and the result of the other has the key
+    symmetric_to, the set searched, and no spec. A search answered by the
+    cached specification of the reverse complement has symmetric_to and that
+    specification as its spec. If profile is True each search is profiled,
+    see motzkin.profiling, and the result has the key profile. Return the
+    number of sets of patterns with each status."""
+    done = read_results(output)
+    pending: List[Task] = []
+    # the set searched for each orbit, and the other sets of its orbit
+    searched: Dict[Task, Task] = {}
+    orbits: Dict[Task, List[Task]] = {}
+    derived: List[Dict[str, Any]] = []
+    for task in map(_task, tasks):
+        if task in done and (not retry or done[task]["status"] == "ok"):
+            continue
+        orbit = _task(canonical_basis(task)[0]) if symmetric else task
+        if orbit in searched:
+            if task != searched[orbit] and task not in orbits[searched[orbit]]:
+                orbits[searched[orbit]].append(task)
+            continue
+        flipped = _task(reverse_complement_basis(task))
+        if symmetric and done.get(flipped, {}).get("status") == "ok":
+            derived.append(_symmetric_record(done[flipped], task))
+            continue
+        searched[orbit] = task
+        orbits[task] = []
+        pending.append(task)
+
+    def related(record: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [
+            _symmetric_record(record, task)
+            for task in orbits.pop(_task(record["patterns"]), [])
+        ]
+
+    return run_tasks(
+        pending,
+        _search,
+        (terms, profile),
+        output,
+        processes=processes,
+        timeout=timeout,
+        memory=memory,
+        records=derived,
+        related=related,
+    )
+
+
+def main(args: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Search for specifications for many sets of patterns."
+    )
+    parser.add_argument("output", help="the JSON lines file of the results")
+    parser.add_argument("files", nargs="*", help="files of sets of patterns")
+    parser.add_argument(
+        "--up-to",
+        type=int,
+        metavar="LENGTH",
+        default=0,
+        help="also every basis of patterns up to LENGTH",
+    )
+    parser.add_argument(
+        "--size", type=int, default=1, help="the number of patterns in these bases"
+    )
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--timeout", type=float, default=None, metavar="SECONDS")
+    parser.add_argument("--memory", type=float, default=None, metavar="MEGABYTES")
+    parser.add_argument(
+        "--terms", type=int, default=10, help="the number of counts to record"
+    )
+    parser.add_argument(
+        "--retry",
+        action="store_true",
+        help="search again the sets whose search did not succeed",
+    )
+    parser.add_argument(
+        "--no-symmetry",
+        action="store_true",
+        help="search both sets of each orbit under reverse complement",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="record the profile of each search",
+    )
+    parsed = parser.parse_args(args)
+    tasks: List[Task] = []
+    for filename in parsed.files:
+        tasks.extend(read_tasks(filename))
+    if parsed.up_to:
+        tasks.extend(bases_up_to(parsed.up_to, parsed.size))
+    statuses = run_sweep(
+        tasks,
+        parsed.output,
+        processes=parsed.processes,
+        timeout=parsed.timeout,
+        memory=None if parsed.memory is None else int(parsed.memory * 2 ** 20),
+        terms=parsed.terms,
+        retry=parsed.retry,
+        symmetric=not parsed.no_symmetry,
+        profile=parsed.profile,
+    )
+    if not statuses:
+        print("Every set of patterns already has a result.")
+    else:
+        print(", ".join("{} {}".format(n, s) for s, n in sorted(statuses.items())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""This module contains the symmetry of Motzkin paths that reverses a path and
+swaps U and D. A path contains a pattern if and only if its reverse
+complement contains the reverse complement of the pattern, so the class
+avoiding a basis and the class avoiding the reverse complements of the basis
+are in bijection and have the same counts.
+
+A basis and its reverse complement form an orbit of size one or two, and
+canonical_basis picks a representative, so that only one class of each orbit
+has to be searched. MotzkinSpecificationFinder.find_symmetric answers a search
+with the cached specification of the reverse complement."""
+from typing import Any, Iterable, Tuple
+
+from .motzkinpaths import MotzkinPaths
+from .motzkinpatterns import MotzkinPath
+
+__all__ = ["canonical_basis", "reverse_complement_basis", "reverse_complement_class"]
+
+Basis = Tuple[MotzkinPath, ...]
+
+
+def _basis(patterns: Iterable[Iterable[str]]) -> Basis:
+    return tuple(sorted(set(MotzkinPath(patt, pattern=True) for patt in patterns)))
+
+
+def reverse_complement_basis(patterns: Iterable[Iterable[str]]) -> Basis:
+    """Return the sorted reverse complements of the patterns."""
+    return _basis(patt.reverse_complement() for patt in _basis(patterns))
+
+
+def canonical_basis(patterns: Iterable[Iterable[str]]) -> Tuple[Basis, bool]:
+    """Return the representative of the orbit of the patterns, the smaller of
+    the sorted patterns and their reverse complements, and whether it is the
+    reverse complements."""
+    basis = _basis(patterns)
+    flipped = reverse_complement_basis(basis)
+    if flipped < basis:
+        return flipped, True
+    return basis, False
+
+
+def reverse_complement_class(comb_class: MotzkinPaths) -> MotzkinPaths:
+    """Return the class of the reverse complements of the paths in the class.
+    The subclasses of paths starting with H or U are not closed under the
+    symmetry, so only a MotzkinPaths itself can be flipped."""
+    if type(comb_class) is not MotzkinPaths:  # pylint: disable=unidiomatic-typecheck
+        raise ValueError("Only a MotzkinPaths can be reverse complemented.")
+    return MotzkinPaths(
+        _reverse_complements(comb_class.avoids),
+        tuple(_reverse_complements(patts) for patts in comb_class.contains),
+    )
+
+
+def _reverse_complements(patterns: Iterable[Any]) -> Basis:
+    return tuple(patt.reverse_complement() for patt in patterns)
@@ -0,0 +1,180 @@
+"""This module checks the generating functions of motzkin.recurrences against
+the counts of the Motzkin paths avoiding each pattern, for many patterns at
+once. The terms of delta are computed with motzkin.powerseries, and the counts
+by the dynamic programme of MotzkinPaths.terms, or from a specification found
+by MotzkinSpecificationFinder if the method is "spec".
+
+Each pattern is checked in its own process, see motzkin.sweep.run_tasks, and
+the result is appended to a JSON lines file with the keys patterns, status
+("match", "mismatch", "timeout", "memory" or "error"), method, recurrence,
+counts, times (of the recurrence and of the counts) and time. A validation
+that is interrupted can be run again on the same file and only checks the
+patterns without a result by the method, and with --retry it checks again
+those that did not match, so that a slow or failing pattern can be re-run on
+its own, with a longer timeout.
+
+    python -m motzkin.validation [--processes N] [--timeout SECONDS]
+        [--memory MEGABYTES] [--terms N] [--method count|spec]
+        [--up-to LENGTH] [--from LENGTH] [--motzkin-paths] [--retry]
+        OUTPUT [PATTERN ...]"""
+import argparse
+import time
+from itertools import product
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from .motzkinpaths import MotzkinPaths
+from .motzkinpatterns import MotzkinPath
+from .motzkinspec import MotzkinSpecificationFinder
+from .powerseries import delta_series
+from .sweep import Task, read_results, run_tasks
+
+__all__ = ["patterns_of_length", "run_validation"]
+
+METHODS = ("count", "spec")
+
+
+def patterns_of_length(
+    length: int, motzkin_paths: bool = False
+) -> Iterator[MotzkinPath]:
+    """Yield the patterns of the given length, or only those that are Motzkin
+    paths if motzkin_paths is True."""
+    for letters in product("UDH", repeat=length):
+        path = MotzkinPath(letters, pattern=True)
+        if not motzkin_paths or path.is_motzkin_path():
+            yield path
+
+
+def _validate(patterns: Task, terms: int, method: str) -> Dict[str, Any]:
+    (word,) = patterns
+    start = time.perf_counter()
+    recurrence = list(delta_series(word, terms))
+    recurrence_time = time.perf_counter() - start
+    start = time.perf_counter()
+    if method == "spec":
+        spec = MotzkinSpecificationFinder([word]).auto_search()
+        counts = [spec.count_objects_of_size(n) for n in range(terms)]
+    else:
+        counts = MotzkinPaths([word]).terms(terms - 1)
+    counts_time = time.perf_counter() - start
+    return {
+        "status": "match" if recurrence == counts else "mismatch",
+        "method": method,
+        "recurrence": recurrence,
+        "counts": counts,
+        "times": {"recurrence": recurrence_time, "counts": counts_time},
+    }
+
+
+def run_validation(
+    patterns: Iterable[Iterable[str]],
+    output: str,
+    processes: Optional[int] = None,
+    timeout: Optional[float] = None,
+    memory: Optional[int] = None,
+    terms: int = 10,
+    method: str = "count",
+    retry: bool = False,
+) -> Dict[str, int]:
+    """Check the first terms coefficients of delta of each pattern against
+    the counts of the paths avoiding it found by method, running up to
+    processes checks at once, and append the results to output.
+
+    Each check is stopped after timeout seconds, and its process may use at
+    most memory bytes. The patterns with a result by the same method in
+    output are skipped, unless retry is True and they did not match. Return
+    the number of patterns with each status."""
+    if method not in METHODS:
+        raise ValueError("The method must be one of {}.".format(", ".join(METHODS)))
+    done = read_results(output)
+    tasks: List[Task] = []
+    for patt in patterns:
+        task = ("".join(patt),)
+        record = done.get(task)
+        if task in tasks or (
+            record is not None
+            and record.get("method", method) == method
+            and (not retry or record["status"] == "match")
+        ):
+            continue
+        tasks.append(task)
+    return run_tasks(
+        tasks,
+        _validate,
+        (terms, method),
+        output,
+        processes=processes,
+        timeout=timeout,
+        memory=memory,
+    )
+
+
+def main(args: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Check the recurrences against the counts of many patterns."
+    )
+    parser.add_argument("output", help="the JSON lines file of the results")
+    parser.add_argument("patterns", nargs="*", help="the patterns to check")
+    parser.add_argument(
+        "--up-to",
+        type=int,
+        metavar="LENGTH",
+        default=0,
+        help="also every pattern up to LENGTH",
+    )
+    parser.add_argument(
+        "--from",
+        dest="from_length",
+        type=int,
+        metavar="LENGTH",
+        default=1,
+        help="the shortest of these patterns",
+    )
+    parser.add_argument(
+        "--motzkin-paths",
+        action="store_true",
+        help="only the patterns up to LENGTH that are Motzkin paths",
+    )
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--timeout", type=float, default=None, metavar="SECONDS")
+    parser.add_argument("--memory", type=float, default=None, metavar="MEGABYTES")
+    parser.add_argument(
+        "--terms", type=int, default=10, help="the number of terms to compare"
+    )
+    parser.add_argument(
+        "--method",
+        choices=METHODS,
+        default="count",
+        help="count the paths directly or with a specification",
+    )
+    parser.add_argument(
+        "--retry",
+        action="store_true",
+        help="check again the patterns that did not match",
+    )
+    parsed = parser.parse_args(args)
+    patterns: List[str] = list(parsed.patterns)
+    for length in range(parsed.from_length, parsed.up_to + 1):
+        patterns.extend(
+            str(patt) for patt in patterns_of_length(length, parsed.motzkin_paths)
+        )
+    statuses = run_validation(
+        patterns,
+        parsed.output,
+        processes=parsed.processes,
+        timeout=parsed.timeout,
+        memory=None if parsed.memory is None else int(parsed.memory * 2 ** 20),
+        terms=parsed.terms,
+        method=parsed.method,
+        retry=parsed.retry,
+    )
+    if not statuses:
+        print("Every pattern already has a result.")
+    else:
+        print(", ".join("{} {}".format(n, s) for s, n in sorted(statuses.items())))
+    for task, record in sorted(read_results(parsed.output).items()):
+        if record["status"] != "match":
+            print(task[0], record["status"])
+
+
+if __name__ == "__main__":
+    main()
@@ -43,4 +43,14 @@ setup(
     install_requires=[
         "comb_spec_searcher==3.0.0",
     ],
+    extras_require={
+        "numpy": ["numpy"],
+    },
+    entry_points={
+        "console_scripts": [
+            "motzkin-sweep=motzkin.sweep:main",
+            "motzkin-validate=motzkin.validation:main",
+            "motzkin-export=motzkin.parallel:main",
+        ]
+    },
 )
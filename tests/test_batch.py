@@ -0,0 +1,89 @@
+from itertools import product
+
+import pytest
+
+from motzkin import (
+    CrossingPattern,
+    MotzkinPath,
+    MotzkinPaths,
+    MotzkinPathsStartingWithH,
+    MotzkinPathsStartingWithU,
+)
+
+np = pytest.importorskip("numpy")
+PathBatch = pytest.importorskip("motzkin.batch").PathBatch
+
+PATTERNS = [
+    MotzkinPath("UD"),
+    MotzkinPath("HUD", pattern=True),
+    MotzkinPath("DU", pattern=True),
+    CrossingPattern("UH", "D"),
+    CrossingPattern("", "H"),
+]
+
+
+def words(size):
+    return [
+        MotzkinPath(letters, pattern=True) for letters in product("DHU", repeat=size)
+    ]
+
+
+@pytest.mark.parametrize("size", range(6))
+def test_against_paths(size):
+    paths = words(size)
+    batch = PathBatch.from_paths(paths, size)
+    assert batch.size == size
+    assert len(batch) == len(paths)
+    assert batch.to_paths() == paths
+    assert [bool(v) for v in batch.motzkin_mask()] == [
+        p.is_motzkin_path() for p in paths
+    ]
+    assert batch.heights().tolist() == [p.heights() for p in paths]
+    motzkin = [p for p in paths if p.is_motzkin_path()]
+    motzkin_batch = PathBatch.from_paths(motzkin, size)
+    if size:
+        assert motzkin_batch.first_returns().tolist() == [
+            len(p.split()[0]) - 1 for p in motzkin
+        ]
+    for patt in PATTERNS:
+        expected = [patt in p for p in motzkin]
+        assert motzkin_batch.contains_mask(patt).tolist() == expected
+    assert motzkin_batch.avoidance_mask(PATTERNS[:3]).tolist() == [
+        p.avoids_all(PATTERNS[:3]) for p in motzkin
+    ]
+
+
+@pytest.mark.parametrize("size", range(6))
+def test_membership_mask(size):
+    paths = words(size)
+    batch = PathBatch.from_paths(paths, size)
+    patterns = [MotzkinPath("UHD", pattern=True)]
+    for comb_class in (
+        MotzkinPaths(patterns),
+        MotzkinPathsStartingWithH(patterns),
+        MotzkinPathsStartingWithU(patterns),
+    ):
+        members = set(comb_class.objects_of_size(size))
+        assert batch.membership_mask(comb_class).tolist() == [
+            p in members for p in paths
+        ]
+
+
+def test_empty_batches():
+    for count, size in ((3, 0), (0, 0), (0, 4)):
+        batch = PathBatch(np.zeros((count, size), dtype=np.uint8))
+        assert batch.first_returns().tolist() == [0 if not size else 3] * count
+        assert batch.to_paths() == [MotzkinPath()] * count
+        for patt in PATTERNS:
+            assert batch.contains_mask(patt).tolist() == [
+                patt in MotzkinPath() for _ in range(count)
+            ]
+
+
+def test_from_paths_checks_sizes():
+    with pytest.raises(ValueError):
+        PathBatch.from_paths([])
+    with pytest.raises(ValueError):
+        PathBatch.from_paths([MotzkinPath("UD"), MotzkinPath("H")])
+    with pytest.raises(ValueError):
+        PathBatch(np.array([[3]]))
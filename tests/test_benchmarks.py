@@ -0,0 +1,51 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SUITE = os.path.join(ROOT, "benchmarks", "suite.py")
+
+
+def suite(*args):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    return subprocess.run(
+        [sys.executable, SUITE] + list(args),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        env=env,
+        check=False,
+    )
+
+
+def test_run_and_compare(tmp_path):
+    base = str(tmp_path / "base.json")
+    res = suite("run", "construction", "--repeat", "2", "--output", base)
+    assert res.returncode == 0, res.stderr
+    with open(base) as f:
+        data = json.load(f)
+    results = data["benchmarks"]["construction"]
+    assert data["meta"]["repeat"] == 2 and len(results["times"]) == 2
+    assert results["min"] <= results["median"] <= max(results["times"])
+    res = suite("compare", base, base)
+    assert res.returncode == 0 and "1.00" in res.stdout
+    # a run twice as slow is a regression
+    slow = str(tmp_path / "slow.json")
+    results["median"] *= 2
+    with open(slow, "w") as f:
+        json.dump(data, f)
+    res = suite("compare", base, slow)
+    assert res.returncode == 1 and "Regressions: construction" in res.stdout
+
+
+def test_unknown_benchmark(tmp_path):
+    res = suite("run", "nothing", "--output", str(tmp_path / "out.json"))
+    assert res.returncode == 1 and "Unknown benchmarks: nothing" in res.stderr
+
+
+def test_missing_command():
+    res = suite()
+    assert (
+        res.returncode == 2 and "a command, run or compare, is required" in res.stderr
+    )
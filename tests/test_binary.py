@@ -0,0 +1,81 @@
+from itertools import product
+
+import pytest
+
+from motzkin import (
+    CrossingPattern,
+    MotzkinPath,
+    MotzkinPaths,
+    MotzkinPathsStartingWithH,
+    MotzkinPathsStartingWithU,
+    MotzkinSpecificationFinder,
+)
+from motzkin.binary import from_binary, to_binary
+from motzkin.strategies import PattInsertion
+
+
+def test_paths():
+    for length in range(7):
+        for letters in product("DHU", repeat=length):
+            path = MotzkinPath(letters, pattern=True)
+            res = from_binary(to_binary(path))
+            assert res == path and res.pattern
+    path = MotzkinPath("UHUDD")
+    assert not from_binary(to_binary(path)).pattern
+    assert from_binary(path.to_binary()) == path
+
+
+def test_crossing_patterns():
+    for patt in (CrossingPattern("UH", "D"), CrossingPattern("", "H")):
+        res = from_binary(to_binary(patt))
+        assert res == patt
+        assert res.to_jsonable() == patt.to_jsonable()
+
+
+@pytest.mark.parametrize("trusted", [False, True])
+def test_classes(trusted):
+    patterns = [MotzkinPath("UHD", pattern=True), MotzkinPath("HH", pattern=True)]
+    for comb_class in (
+        MotzkinPaths(["UHD", "HH"], [["UUDD", "UDUD"]]),
+        MotzkinPathsStartingWithH(patterns),
+        MotzkinPathsStartingWithU(patterns),
+    ):
+        res = from_binary(to_binary(comb_class), trusted)
+        assert res == comb_class
+        assert res.to_jsonable() == comb_class.to_jsonable()
+        assert MotzkinPaths.from_binary(comb_class.to_binary()) == comb_class
+        # the searcher does not compress the classes it stores
+        with pytest.raises(NotImplementedError):
+            comb_class.to_bytes()
+
+
+def test_strategies():
+    for strategy in (
+        PattInsertion(MotzkinPath("UD")),
+        PattInsertion(CrossingPattern("UH", "D")),
+    ):
+        res = from_binary(to_binary(strategy))
+        assert res.to_jsonable() == strategy.to_jsonable()
+
+
+@pytest.mark.parametrize("trusted", [False, True])
+def test_specification(trusted):
+    spec = MotzkinSpecificationFinder(["UHD"]).auto_search()
+    res = from_binary(to_binary(spec), trusted)
+    assert res.root == spec.root
+    assert res.to_jsonable() == spec.to_jsonable()
+    assert [res.count_objects_of_size(n) for n in range(10)] == MotzkinPaths(
+        ["UHD"]
+    ).terms(9)
+
+
+def test_bad_data():
+    data = to_binary(MotzkinPaths(["UHD"]))
+    with pytest.raises(ValueError):
+        from_binary(b"nope" + data)
+    with pytest.raises(ValueError):
+        from_binary(data[:-1])
+    with pytest.raises(ValueError):
+        from_binary(data + b"\0")
+    with pytest.raises(TypeError):
+        to_binary("UHD")
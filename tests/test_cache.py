@@ -0,0 +1,79 @@
+import motzkin.speccache  # noqa: F401, registers the specifications cache
+from motzkin import MotzkinPaths, MotzkinSpecificationFinder
+from motzkin.cache import CACHES, BoundedCache, CacheScope, cache_stats, clear_caches
+
+
+def test_lru_eviction():
+    cache = BoundedCache("test_lru", max_entries=2)
+    cache[1] = "a"
+    cache[2] = "b"
+    assert cache[1] == "a"
+    cache[3] = "c"
+    assert 1 in cache and 3 in cache and 2 not in cache
+    assert cache.stats()["evictions"] == 1
+    assert cache.get(2) is None
+    assert cache.stats()["misses"] == 1
+    cache.configure(max_entries=1)
+    assert list(cache) == [3]
+
+
+def test_byte_limit():
+    cache = BoundedCache("test_bytes", max_bytes=10 ** 6, sizer=lambda k, v: v)
+    cache["a"] = 6 * 10 ** 5
+    cache["b"] = 6 * 10 ** 5
+    assert "a" not in cache and "b" in cache
+    assert cache.bytes == 6 * 10 ** 5
+
+
+def test_clear_caches():
+    cache = BoundedCache("test_clear")
+    cache["a"] = 1
+    assert cache_stats()["test_clear"]["entries"] == 1
+    clear_caches()
+    assert len(cache) == 0
+
+
+def test_scope_removes_only_its_entries():
+    cache = BoundedCache("test_scope")
+    cache["before"] = 1
+    with CacheScope() as outer:
+        cache["outer"] = 2
+        with CacheScope() as inner:
+            cache["inner"] = 3
+            cache["before"] = 4
+        assert "inner" not in cache and "outer" in cache
+        assert inner.stats["test_scope"]["entries"] == 3
+    assert list(cache) == ["before"]
+    assert cache["before"] == 4
+    assert outer.stats["test_scope"]["entries"] == 2
+
+
+def test_scope_holds_only_cached_keys():
+    cache = BoundedCache("test_scope_bounded", max_entries=10)
+    with CacheScope() as outer:
+        with CacheScope() as inner:
+            for key in range(200):
+                cache[key] = key
+            del cache[199]
+            assert inner.added["test_scope_bounded"] == set(range(190, 199))
+            assert outer.added["test_scope_bounded"] == set(range(190, 199))
+            cache.clear()
+            assert not inner.added and not outer.added
+            cache["inner"] = 1
+        assert not outer.added["test_scope_bounded"]
+    assert len(cache) == 0
+
+
+def test_search_keeps_caches_it_did_not_fill():
+    specifications = CACHES["specifications"]
+    specifications["kept"] = None
+    MotzkinPaths(["UDUD", "HH"]).is_empty()
+    msf = MotzkinSpecificationFinder(["UHD"])
+    before = {name: set(cache) for name, cache in CACHES.items()}
+    spec = msf.auto_search()
+    assert {name: set(cache) for name, cache in CACHES.items()} == before
+    assert "kept" in specifications
+    assert msf.cache_stats["classes"]["misses"] > 0
+    assert [spec.count_objects_of_size(n) for n in range(8)] == MotzkinPaths(
+        ["UHD"]
+    ).terms(7)
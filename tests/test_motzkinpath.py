@@ -0,0 +1,189 @@
+import pickle
+from itertools import product
+
+import pytest
+
+from motzkin.cache import clear_caches
+from motzkin.motzkinpatterns import CONTAINMENT, CrossingPattern, MotzkinPath
+
+
+def words(length):
+    return ["".join(w) for w in product("DHU", repeat=length)]
+
+
+def is_motzkin(word):
+    height = 0
+    for letter in word:
+        height += {"U": 1, "D": -1, "H": 0}[letter]
+        if height < 0:
+            return False
+    return height == 0
+
+
+def is_subword(patt, word):
+    it = iter(word)
+    return all(letter in it for letter in patt)
+
+
+def test_round_trip():
+    for length in range(7):
+        for word in words(length):
+            path = MotzkinPath(word, pattern=True)
+            assert len(path) == length
+            assert str(path) == (word or "λ")
+            assert tuple(path) == tuple(word)
+            assert list(reversed(path)) == list(reversed(word))
+            assert [path[i] for i in range(length)] == list(word)
+            assert MotzkinPath.from_packed(*path.to_packed(), pattern=True) == path
+            assert pickle.loads(pickle.dumps(path)) == path
+
+
+def test_validation():
+    assert MotzkinPath("UHD").pattern is False
+    with pytest.raises(ValueError):
+        MotzkinPath("DU")
+    with pytest.raises(ValueError):
+        MotzkinPath("UH")
+    with pytest.raises(ValueError):
+        MotzkinPath("UXD", pattern=True)
+    with pytest.raises(ValueError):
+        MotzkinPath.from_packed(0b11, 1, pattern=True)
+    with pytest.raises(ValueError):
+        MotzkinPath.from_packed(0b10, 1)
+    for length in range(7):
+        for word in words(length):
+            assert MotzkinPath(word, pattern=True).is_motzkin_path() == is_motzkin(word)
+
+
+def test_to_packed():
+    assert MotzkinPath("UHD").to_packed() == (0b100100, 3)
+    assert MotzkinPath().to_packed() == (0, 0)
+
+
+def test_order():
+    paths = [MotzkinPath(w, pattern=True) for n in range(4) for w in words(n)]
+    expected = sorted(paths, key=lambda p: (len(p), str(p).replace("λ", "")))
+    assert sorted(paths) == expected
+
+
+def test_contains():
+    patterns = [MotzkinPath(w, pattern=True) for n in range(4) for w in words(n)]
+    for word in words(5):
+        path = MotzkinPath(word, pattern=True)
+        for patt in patterns:
+            expected = is_subword(str(patt) if patt else "", word)
+            assert (patt in path) == expected
+            assert path.avoids(patt) != expected
+        assert path.contains_any(patterns[5:9]) == any(
+            is_subword(str(p), word) for p in patterns[5:9]
+        )
+
+
+def test_crossing_pattern_contained_in():
+    patt = CrossingPattern("UH", "D")
+    for word in ("UHDD", "UUHDDUD", "UDUD", "UHUDHD", "UHDUDD"):
+        path = MotzkinPath(word, pattern=True)
+        first, rest = path.split()
+        expected = is_subword("UH", str(first)) and is_subword("D", str(rest))
+        assert patt.contained_in(path) == expected
+
+
+def test_contains_any_crossing_patterns():
+    patterns = [
+        cp
+        for n in range(4)
+        for w in words(n)
+        for cp in CrossingPattern.all_crossing_patterns(MotzkinPath(w, pattern=True))
+    ]
+    for n in range(7):
+        for word in filter(is_motzkin, words(n)):
+            path = MotzkinPath(word)
+            first, rest = (str(p) if p else "" for p in path.split())
+            expected = [
+                is_subword(str(cp.left) if cp.left else "", first)
+                and is_subword(str(cp.right) if cp.right else "", rest)
+                for cp in patterns
+            ]
+            assert [cp.contained_in(path) for cp in patterns] == expected
+            for start in range(0, len(patterns), 7):
+                stop = start + 7
+                assert path.contains_any(patterns[start:stop]) == any(
+                    expected[start:stop]
+                )
+                assert path.avoids_all(patterns[start:stop]) != any(
+                    expected[start:stop]
+                )
+
+
+def test_minimal_set_for_avoidance():
+    for length in range(6):
+        for word in words(length):
+            patt = MotzkinPath(word, pattern=True)
+            minimal_set = patt.minimal_set_for_avoidance()
+            assert minimal_set == patt.minimal_set_for_avoidance_bfs()
+            # the recursive algorithm takes minutes from length 4
+            if length < 4:
+                assert minimal_set == patt.minimal_set_for_avoidance_rec()
+            assert all(p.is_motzkin_path() and patt in p for p in minimal_set)
+    assert MotzkinPath("DU", pattern=True).minimal_set_for_avoidance() == {
+        MotzkinPath("UDUD")
+    }
+
+
+def test_containment_index():
+    clear_caches()
+    index = CONTAINMENT
+    index.reset_stats()
+    paths = [MotzkinPath(w, pattern=True) for n in range(5) for w in words(n)]
+    crossing = [
+        CrossingPattern(p[:i], p[i:]) for p in paths[:40] for i in range(len(p) + 1)
+    ]
+    for patterns in (paths, crossing):
+        expected = [[other in patt for other in patterns] for patt in patterns]
+        for _ in range(2):
+            assert [
+                [index.contains(patt, other) for other in patterns] for patt in patterns
+            ] == expected
+    stats = index.stats()
+    assert stats["checks"] == 2 * (len(paths) ** 2 + len(crossing) ** 2)
+    assert stats["memoised"] == stats["matched"]
+    assert stats["skipped"] + stats["memoised"] + stats["matched"] == stats["checks"]
+    index.reset_stats()
+    assert index.stats()["checks"] == 0
+
+
+def test_lift_split_reverse_complement():
+    path = MotzkinPath("UHDUD")
+    assert path.lift() == MotzkinPath("UUHDUDD")
+    assert path.split() == (MotzkinPath("UHD"), MotzkinPath("UD"))
+    assert MotzkinPath("HH").split() == (MotzkinPath("HH"), MotzkinPath())
+    assert MotzkinPath("UUHDD").reverse_complement() == MotzkinPath("UUHDD")
+    assert MotzkinPath("UHDUD").reverse_complement() == MotzkinPath("UDUHD")
+
+
+def test_not_equal_to_tuples():
+    # unlike the tuple it used to be, a path is only equal to paths
+    path = MotzkinPath("UD")
+    assert path != ("U", "D")
+    assert path == MotzkinPath(("U", "D"))
+    assert path == MotzkinPath("UD", pattern=True)
+    assert hash(path) == hash(MotzkinPath("UD", pattern=True))
+
+
+def test_slice_is_pattern():
+    # a slice is a pattern, not a tuple
+    path = MotzkinPath("UHDUD")
+    head = path[:2]
+    assert isinstance(head, MotzkinPath)
+    assert head.pattern
+    assert head == MotzkinPath("UH", pattern=True)
+    assert path[1:4] == MotzkinPath("HDU", pattern=True)
+    assert path[::2] == MotzkinPath("UDD", pattern=True)
+    assert path[3:1] == MotzkinPath()
+    assert path[:2] + ("D",) + path[2:] == MotzkinPath("UHDDUD", pattern=True)
+
+
+def test_concatenation():
+    assert not (MotzkinPath("UD") + MotzkinPath("H")).pattern
+    assert (MotzkinPath("UD") + "U").pattern
+    assert ("H",) + MotzkinPath("UD") == MotzkinPath("HUD", pattern=True)
@@ -0,0 +1,216 @@
+from functools import lru_cache
+from itertools import product
+from random import Random
+
+import pytest
+
+from motzkin import (
+    CrossingPattern,
+    MotzkinPath,
+    MotzkinPaths,
+    MotzkinPathsStartingWithH,
+    MotzkinPathsStartingWithU,
+)
+from motzkin.cache import CACHES, clear_caches
+from motzkin.matcher import PatternMatcher
+
+BASES = [
+    ([], []),
+    (["UHD"], []),
+    (["UUHD", "DDHU"], []),
+    (["HUD", "UDU"], []),
+    (["UH"], [["UD", "HH"]]),
+    (["UDUD"], [["UUDD"]]),
+]
+
+MOTZKIN_NUMBERS = [1, 1, 2, 4, 9, 21, 51, 127, 323, 835, 2188, 5798, 15511]
+
+
+@lru_cache(maxsize=None)
+def motzkin_paths(size):
+    """Return the Motzkin paths of the given size by filtering all words."""
+    res = []
+    for letters in product("DHU", repeat=size):
+        height = 0
+        for letter in letters:
+            height += {"U": 1, "D": -1, "H": 0}[letter]
+            if height < 0:
+                break
+        else:
+            if height == 0:
+                res.append(MotzkinPath(letters))
+    return res
+
+
+def brute_force(avoids, contains, size, first=None):
+    avoids = [MotzkinPath(p, pattern=True) for p in avoids]
+    contains = [[MotzkinPath(p, pattern=True) for p in co] for co in contains]
+    return [
+        path
+        for path in motzkin_paths(size)
+        if (first is None or (path and path[0] == first))
+        and all(path.avoids(p) for p in avoids)
+        and all(any(p in path for p in co) for co in contains)
+    ]
+
+
+def comb_classes(avoids, contains):
+    patterns = [MotzkinPath(p, pattern=True) for p in avoids]
+    lists = [[MotzkinPath(p, pattern=True) for p in co] for co in contains]
+    yield MotzkinPaths(avoids, contains), None
+    yield MotzkinPathsStartingWithH(patterns, lists), "H"
+    yield MotzkinPathsStartingWithU(patterns, lists), "U"
+
+
+@pytest.mark.parametrize("avoids, contains", BASES)
+def test_objects_of_size(avoids, contains):
+    for comb_class, first in comb_classes(avoids, contains):
+        for size in range(9):
+            expected = brute_force(avoids, contains, size, first)
+            assert list(comb_class.objects_of_size(size)) == sorted(expected)
+
+
+@pytest.mark.parametrize("avoids, contains", BASES)
+def test_terms(avoids, contains):
+    for comb_class, first in comb_classes(avoids, contains):
+        expected = [len(brute_force(avoids, contains, n, first)) for n in range(9)]
+        assert comb_class.terms(8) == expected
+        assert [comb_class.count_objects_of_size(n) for n in range(9)] == expected
+
+
+def test_motzkin_numbers():
+    assert MotzkinPaths().terms(12) == MOTZKIN_NUMBERS
+    assert MotzkinPaths(["H"]).terms(8) == [1, 0, 1, 0, 2, 0, 5, 0, 14]
+
+
+@pytest.mark.parametrize("avoids, contains", BASES)
+def test_matcher_accepts(avoids, contains):
+    for comb_class, first in comb_classes(avoids, contains):
+        matcher = comb_class.matcher()
+        for size in range(9):
+            expected = set(brute_force(avoids, contains, size, first))
+            for path in motzkin_paths(size):
+                assert matcher.accepts(path) == (path in expected)
+
+
+def test_is_empty():
+    rng = Random(5)
+    letters = ["".join(w) for n in range(1, 4) for w in product("DHU", repeat=n)]
+    for _ in range(100):
+        avoids = rng.sample(letters, rng.randrange(3))
+        contains = [rng.sample(letters, 2) for _ in range(rng.randrange(3))]
+        for comb_class, first in comb_classes(avoids, contains):
+            sizes = [n for n in range(9) if brute_force(avoids, contains, n, first)]
+            assert comb_class.is_empty() == (not sizes)
+            if sizes:
+                assert len(comb_class.shortest_object()) == sizes[0]
+
+
+def test_is_empty_first_letter():
+    # reading the H can lead back to the start state at height 0
+    comb_class = MotzkinPathsStartingWithH(
+        [MotzkinPath("UHD")], [[MotzkinPath("UDH", pattern=True)]]
+    )
+    assert not comb_class.is_empty()
+    assert comb_class.shortest_object() == MotzkinPath("HUDH")
+    assert MotzkinPathsStartingWithH([MotzkinPath("H")]).is_empty()
+
+
+@pytest.mark.parametrize("avoids, contains", BASES)
+def test_random_samples(avoids, contains):
+    for comb_class, first in comb_classes(avoids, contains):
+        expected = brute_force(avoids, contains, 6, first)
+        if not expected:
+            with pytest.raises(ValueError):
+                comb_class.random_sample(6)
+            continue
+        samples = comb_class.random_samples(6, 40 * len(expected), Random(1))
+        assert set(samples) == set(expected)
+        assert samples == comb_class.random_samples(6, len(samples), Random(1))
+        assert comb_class.random_sample(6) in expected
+
+
+@pytest.mark.parametrize("avoids, contains", BASES)
+def test_rank_unrank(avoids, contains):
+    for comb_class, first in comb_classes(avoids, contains):
+        for size in range(9):
+            expected = sorted(brute_force(avoids, contains, size, first))
+            assert [comb_class.unrank(size, i) for i in range(len(expected))] == (
+                expected
+            )
+            assert [comb_class.rank(path) for path in expected] == list(
+                range(len(expected))
+            )
+            assert list(comb_class.objects_of_size(size, 2, 5)) == expected[2:5]
+            with pytest.raises(IndexError):
+                comb_class.unrank(size, len(expected))
+    with pytest.raises(ValueError):
+        MotzkinPaths(["UHD"]).rank(MotzkinPath("UUHDD"))
+
+
+def test_interning():
+    comb_class = MotzkinPaths(["UHD", "HH"])
+    assert MotzkinPaths(["UHD", "HH"]) is comb_class
+    assert MotzkinPaths(("HH", "UHD")) is comb_class
+    assert MotzkinPaths([MotzkinPath("HH"), MotzkinPath("UHD")]) is comb_class
+    assert MotzkinPaths.from_dict(comb_class.to_jsonable()) is comb_class
+    # DU normalises to UDUD
+    assert MotzkinPaths(["DU"]) is MotzkinPaths(["UDUD"])
+    assert MotzkinPathsStartingWithH(comb_class.avoids) is not comb_class
+    clear_caches()
+    assert MotzkinPaths(["UHD", "HH"]) == comb_class
+    assert hash(MotzkinPaths(["UHD", "HH"])) == hash(comb_class)
+
+
+def test_add_avoid_and_contain():
+    rng = Random(13)
+    letters = ["".join(w) for n in range(1, 5) for w in product("DHU", repeat=n)]
+    for _ in range(100):
+        avoids = rng.sample(letters, rng.randrange(3))
+        contains = [rng.sample(letters, 2) for _ in range(rng.randrange(3))]
+        patt = MotzkinPath(rng.choice(letters), pattern=True)
+        patterns = [MotzkinPath(p, pattern=True) for p in avoids]
+        lists = [[MotzkinPath(p, pattern=True) for p in co] for co in contains]
+        for comb_class in (
+            MotzkinPaths(patterns, lists),
+            MotzkinPathsStartingWithH(patterns, lists),
+        ):
+            cls = type(comb_class)
+            assert comb_class.add_avoid(patt) == cls(patterns + [patt], lists)
+            assert comb_class.add_contain(patt) == cls(patterns, lists + [[patt]])
+        crossing = CrossingPattern(patt, "")
+        comb_class = MotzkinPathsStartingWithU(patterns, lists)
+        assert comb_class.add_avoid(crossing) == MotzkinPathsStartingWithU(
+            crossing_avoids=comb_class.avoids + (crossing,),
+            crossing_contains=comb_class.contains,
+        )
+        assert comb_class.add_contain(crossing) == MotzkinPathsStartingWithU(
+            crossing_avoids=comb_class.avoids,
+            crossing_contains=comb_class.contains + ((crossing,),),
+        )
+
+
+def test_matchers_are_cached():
+    clear_caches()
+    comb_class = MotzkinPaths(["UHD"])
+    assert comb_class.matcher() is comb_class.matcher()
+    assert len(CACHES["matchers"]) == 1
+    assert len(list(comb_class.objects_of_size(10))) == len(
+        brute_force(["UHD"], [], 10)
+    )
+    assert len(PatternMatcher.COMPLETIONS) > 0
+    clear_caches()
+    assert len(CACHES["matchers"]) == 0
+    assert len(PatternMatcher.COMPLETIONS) == 0
+
+
+def test_completions_survive_eviction():
+    comb_class = MotzkinPaths(["UUHD", "DDHU"])
+    expected = [len(brute_force(["UUHD", "DDHU"], [], n)) for n in range(11)]
+    PatternMatcher.COMPLETIONS.configure(max_entries=5)
+    try:
+        clear_caches()
+        assert [comb_class.count_objects_of_size(n) for n in range(11)] == expected
+        assert len(list(comb_class.objects_of_size(10))) == expected[10]
+    finally:
+        PatternMatcher.COMPLETIONS.configure(max_entries=1000000)
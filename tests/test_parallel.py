@@ -0,0 +1,50 @@
+import os
+
+import pytest
+
+from motzkin import MotzkinPath, MotzkinPaths, MotzkinPathsStartingWithU
+from motzkin.parallel import export_objects_of_size, parallel_objects_of_size, shards
+
+
+def test_shards():
+    assert shards(10, 4) == [(0, 4), (4, 8), (8, 10)]
+    assert shards(8, 4) == [(0, 4), (4, 8)]
+    assert shards(0, 4) == []
+    with pytest.raises(ValueError):
+        shards(10, 0)
+
+
+def test_parallel_objects_of_size():
+    for comb_class in (
+        MotzkinPaths(["UHD"]),
+        MotzkinPathsStartingWithU([MotzkinPath("UHD")]),
+    ):
+        expected = list(comb_class.objects_of_size(10))
+        for shard_size in (None, 1, 7, len(expected)):
+            assert (
+                list(parallel_objects_of_size(comb_class, 10, 2, shard_size))
+                == expected
+            )
+    assert list(parallel_objects_of_size(MotzkinPaths(["H", "UD"]), 4, 2)) == []
+
+
+def test_export_objects_of_size(tmp_path):
+    comb_class = MotzkinPaths(["UHD"])
+    expected = [str(path) for path in comb_class.objects_of_size(9)]
+    directory = str(tmp_path / "paths")
+    filenames = export_objects_of_size(comb_class, 9, directory, 2, 10)
+    assert len(filenames) == len(shards(len(expected), 10))
+    lines = []
+    for filename in filenames:
+        with open(filename) as f:
+            lines.extend(f.read().split())
+    assert lines == expected
+    # an interrupted export only generates the missing shards
+    os.remove(filenames[1])
+    with open(filenames[0], "w") as f:
+        f.write("kept\n")
+    assert export_objects_of_size(comb_class, 9, directory, 2, 10) == filenames
+    with open(filenames[0]) as f:
+        assert f.read() == "kept\n"
+    with open(filenames[1]) as f:
+        assert f.read().split() == expected[10:20]
@@ -0,0 +1,31 @@
+from itertools import product
+
+from sympy import series
+
+from motzkin import MotzkinPath, MotzkinPaths
+from motzkin.powerseries import catalan_series, delta_series, gamma_series
+from motzkin.recurrences import C, Cgenf, gamma, x, y
+
+
+def test_catalan_series():
+    assert catalan_series(11) == (1, 0, 1, 0, 2, 0, 5, 0, 14, 0, 42)
+    assert catalan_series(0) == ()
+
+
+def test_delta_series():
+    for length in range(1, 5):
+        for letters in product("UDH", repeat=length):
+            word = "".join(letters)
+            assert list(delta_series(word, 12)) == MotzkinPaths([word]).terms(11)
+    assert delta_series("", 3) == (0, 0, 0)
+    assert delta_series("UHD", 5) == delta_series("UHD", 8)[:5]
+
+
+def test_gamma_series():
+    for word in ("U", "UH", "HD", "UUD", "DHU"):
+        expansion = series(
+            gamma(MotzkinPath(word, pattern=True)).subs({C: Cgenf}), x, 0, 6
+        ).removeO()
+        expected = [expansion.coeff(x, m).expand() for m in range(6)]
+        res = gamma_series(word, 6)
+        assert [sum(c * y ** k for k, c in enumerate(poly)) for poly in res] == expected
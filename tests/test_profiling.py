@@ -0,0 +1,35 @@
+import json
+
+from motzkin import MotzkinPaths
+from motzkin.cache import clear_caches
+from motzkin.profiling import Profiler
+
+
+def test_profiler(tmp_path):
+    clear_caches()
+    is_empty = MotzkinPaths.is_empty
+    with Profiler() as profiler:
+        comb_class = MotzkinPaths(["UHD", "HH"])
+        assert not comb_class.is_empty()
+        paths = list(comb_class.objects_of_size(6))
+        assert comb_class.count_objects_of_size(6) == len(paths)
+    assert MotzkinPaths.is_empty is is_empty
+    stats = profiler.stats()
+    functions = stats["functions"]
+    assert functions["MotzkinPaths.is_empty"]["calls"] == 1
+    assert functions["MotzkinPaths.is_empty"]["results"] == {"false": 1}
+    assert functions["MotzkinPaths.objects_of_size"]["sizes"] == {6: 1}
+    assert functions["MotzkinPaths.objects_of_size"]["yielded"] == len(paths)
+    assert stats["paths"]["generated"] == len(paths)
+    assert stats["caches"]["matchers"]["misses"] == 1
+    assert stats["caches"]["matchers"]["hits"] > 0
+    assert stats["classes"][0]["class"] == repr(comb_class)
+    # nothing is counted while the profiler is disabled
+    comb_class.is_empty()
+    assert profiler.stats() == stats
+    filename = str(tmp_path / "profile.json")
+    profiler.to_json(filename)
+    with open(filename) as f:
+        assert json.load(f)["paths"] == stats["paths"]
+    profiler.reset()
+    assert profiler.stats()["functions"] == {}
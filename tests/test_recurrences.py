@@ -0,0 +1,31 @@
+from itertools import product
+
+from sympy import ratsimp, series
+
+from motzkin import MotzkinPath, MotzkinPaths
+from motzkin.cache import clear_caches
+from motzkin.recurrences import C, Cgenf, delta, gamma, generating_functions, x
+
+
+def coefficients(gf, n):
+    expansion = series(gf.subs({C: Cgenf}), x, 0, n).removeO()
+    return [expansion.coeff(x, k) for k in range(n)]
+
+
+def test_delta_counts_the_paths():
+    for length in range(1, 3):
+        for letters in product("UDH", repeat=length):
+            patt = MotzkinPath(letters, pattern=True)
+            assert coefficients(delta(patt), 8) == MotzkinPaths([patt]).terms(7)
+    assert delta(MotzkinPath()) == 0
+
+
+def test_generating_functions():
+    gfs = generating_functions(2)
+    assert len(gfs) == 1 + 3 + 9
+    clear_caches()
+    for patt, gf in gfs.items():
+        assert gf == delta(patt)
+    for patt, gf in generating_functions(2, simplify=False).items():
+        assert ratsimp(gf - gfs[patt]) == 0
+    assert gamma(MotzkinPath()) == 1
@@ -0,0 +1,48 @@
+import pytest
+
+from motzkin import MotzkinPaths, MotzkinSpecificationFinder
+from motzkin.cache import clear_caches
+from motzkin.speccache import SpecificationCache, use_specification_cache
+
+
+@pytest.fixture
+def spec_cache(tmp_path):
+    yield use_specification_cache(str(tmp_path / "specs"))
+    use_specification_cache(None)
+
+
+def test_found_specifications_are_cached(spec_cache):
+    comb_class = MotzkinPaths(["UHD"])
+    assert comb_class not in spec_cache
+    spec = MotzkinSpecificationFinder(["UHD"]).auto_search()
+    assert comb_class in spec_cache
+    assert MotzkinSpecificationFinder(["UHD"]).auto_search() is spec
+    clear_caches()
+    res = spec_cache.get(comb_class)
+    assert res is not spec
+    assert res.to_jsonable() == spec.to_jsonable()
+    assert MotzkinSpecificationFinder(["UHD"]).auto_search() is res
+    spec_cache.discard(comb_class)
+    assert comb_class not in spec_cache
+    assert spec_cache.get(comb_class) is None
+
+
+def test_bad_files_are_ignored(spec_cache):
+    comb_class = MotzkinPaths(["UHD"])
+    other = MotzkinPaths(["HH"])
+    spec_cache.put(other, MotzkinSpecificationFinder(["HH"]).auto_search())
+    filename = spec_cache._filename(other)
+    # the file of another class
+    spec_cache.put(comb_class, spec_cache.get(other))
+    clear_caches()
+    assert spec_cache.get(comb_class) is None
+    with open(filename, "wb") as f:
+        f.write(b"not a specification")
+    assert spec_cache.get(other) is None
+
+
+def test_key():
+    key = SpecificationCache.key(MotzkinPaths(["UHD", "HH"]))
+    clear_caches()
+    assert SpecificationCache.key(MotzkinPaths(["HH", "UHD"])) == key
+    assert SpecificationCache.key(MotzkinPaths(["UHD"])) != key
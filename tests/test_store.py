@@ -0,0 +1,52 @@
+import pickle
+from itertools import product
+
+import pytest
+
+from motzkin import MotzkinPath, MotzkinPaths
+from motzkin.cache import clear_caches
+from motzkin.store import build_minimal_set_store, use_minimal_set_store
+
+
+@pytest.fixture
+def store_file(tmp_path):
+    filename = str(tmp_path / "minimal_sets.db")
+    build_minimal_set_store(filename, 5).close()
+    yield filename
+    use_minimal_set_store(None)
+    clear_caches()
+
+
+def test_store(store_file):
+    store = pickle.loads(pickle.dumps(use_minimal_set_store(store_file)))
+    assert store.max_length == 5
+    for length in range(7):
+        for letters in product("DHU", repeat=length):
+            patt = MotzkinPath(letters, pattern=True)
+            stored = store.get(patt)
+            if length > 5 or patt.is_motzkin_path():
+                assert stored is None
+            else:
+                assert stored == patt._compute_minimal_set_for_avoidance()
+    store.close()
+
+
+def test_minimal_sets_from_store(store_file):
+    terms = MotzkinPaths(["DU", "HUH"]).terms(8)
+    clear_caches()
+    store = use_minimal_set_store(store_file)
+    looked_up = []
+    get = store.get
+    store.get = lambda patt: looked_up.append(patt) or get(patt)
+    assert MotzkinPath("DU", pattern=True).minimal_set_for_avoidance() == {
+        MotzkinPath("UDUD")
+    }
+    assert MotzkinPaths(["DU", "HUH"]).terms(8) == terms
+    assert MotzkinPath("DU", pattern=True) in looked_up
+
+
+def test_build_checks(store_file):
+    with pytest.raises(FileExistsError):
+        build_minimal_set_store(store_file, 3)
+    with pytest.raises(ValueError):
+        build_minimal_set_store(store_file + "2", 32)
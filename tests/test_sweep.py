@@ -0,0 +1,71 @@
+import json
+import time
+
+from motzkin import MotzkinPath, MotzkinPaths
+from motzkin.motzkinpatterns import CONTAINMENT
+from motzkin.sweep import bases_up_to, read_results, read_tasks, run_sweep, run_tasks
+
+
+def _sleep(task):
+    time.sleep(60)
+    return {"status": "ok"}
+
+
+def _fail(task):
+    raise ValueError(task)
+
+
+def _echo(task, extra):
+    return {"status": "ok", "extra": extra}
+
+
+def test_read_tasks(tmp_path):
+    filename = tmp_path / "tasks.txt"
+    filename.write_text("UHD\n# a comment\n\nHH, UD UD # the pairs\n")
+    assert list(read_tasks(str(filename))) == [("UHD",), ("HH", "UD")]
+
+
+def test_bases_up_to():
+    bases = list(bases_up_to(2, 2))
+    assert ("H", "UD") in bases and ("H", "HH") not in bases
+    for basis in bases:
+        patterns = [MotzkinPath(p, pattern=True) for p in basis]
+        assert not CONTAINMENT.contains(*patterns)
+        assert not CONTAINMENT.contains(*reversed(patterns))
+
+
+def test_run_tasks(tmp_path):
+    output = str(tmp_path / "results.jsonl")
+    statuses = run_tasks(
+        [("UD",), ("H",), ("HH",)], _echo, ("more",), output, processes=2
+    )
+    assert statuses == {"ok": 3}
+    assert run_tasks([("UD",), ("H",)], _fail, (), output) == {"error": 2}
+    assert run_tasks([("UD",)], _sleep, (), output, timeout=0.5) == {"timeout": 1}
+    with open(output) as f:
+        records = [json.loads(line) for line in f]
+    assert [r["status"] for r in records] == ["ok"] * 3 + ["error"] * 2 + ["timeout"]
+    assert all(r["extra"] == "more" for r in records[:3])
+    assert records[3]["error"] == "ValueError(('UD',))"
+
+
+def test_run_sweep(tmp_path):
+    output = str(tmp_path / "results.jsonl")
+    tasks = [["UHD"], ["HH", "UDUHD"], ["UHDUD", "HH"]]
+    assert run_sweep(tasks, output, processes=2, terms=8) == {"ok": 3}
+    results = read_results(output)
+    for task in (("UHD",), ("HH", "UDUHD")):
+        assert results[task]["counts"] == MotzkinPaths(task).terms(7)
+        assert "spec" in results[task]
+    # only the first of the pair is searched
+    derived = results[("HH", "UHDUD")]
+    assert derived["symmetric_to"] == ["HH", "UDUHD"]
+    assert derived["counts"] == results[("HH", "UDUHD")]["counts"]
+    assert "spec" not in derived
+    # an interrupted line is ignored and the sweep resumes
+    with open(output, "a") as f:
+        f.write('{"patterns": ["H"], "sta')
+    assert read_results(output) == results
+    assert run_sweep(tasks, output) == {}
+    assert run_sweep(tasks + [["H"]], output, terms=8) == {"ok": 1}
+    assert read_results(output)[("H",)]["counts"] == [1, 0, 1, 0, 2, 0, 5, 0]
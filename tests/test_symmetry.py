@@ -0,0 +1,75 @@
+import json
+
+import pytest
+from comb_spec_searcher import CombinatorialSpecification
+
+from motzkin import MotzkinPath, MotzkinPaths, MotzkinSpecificationFinder
+from motzkin.speccache import use_specification_cache
+from motzkin.sweep import _search, run_sweep
+from motzkin.symmetry import (
+    canonical_basis,
+    reverse_complement_basis,
+    reverse_complement_class,
+)
+
+
+@pytest.fixture
+def spec_cache(tmp_path):
+    yield use_specification_cache(str(tmp_path / "specs"))
+    use_specification_cache(None)
+
+
+def test_bases():
+    basis = (MotzkinPath("UHDUD", pattern=True),)
+    assert reverse_complement_basis(["UHDUD"]) == (MotzkinPath("UDUHD"),)
+    assert canonical_basis(["UHDUD"]) == ((MotzkinPath("UDUHD"),), True)
+    assert canonical_basis(["UDUHD"]) == ((MotzkinPath("UDUHD"),), False)
+    assert reverse_complement_basis(reverse_complement_basis(basis)) == basis
+
+
+def test_reverse_complement_class():
+    comb_class = MotzkinPaths(["UHDUD", "HH"])
+    flipped = reverse_complement_class(comb_class)
+    assert flipped == MotzkinPaths(["UDUHD", "HH"])
+    for n in range(8):
+        assert sorted(
+            path.reverse_complement() for path in comb_class.objects_of_size(n)
+        ) == list(flipped.objects_of_size(n))
+
+
+def test_specification_of_reverse_complement(spec_cache):
+    spec = MotzkinSpecificationFinder(["UDUHD", "HH"]).auto_search()
+    assert spec_cache.get(spec.root) is not None
+    res, flipped = MotzkinSpecificationFinder(["UHDUD", "HH"]).find_symmetric()
+    assert flipped and res is spec
+    res, flipped = MotzkinSpecificationFinder(["UDUHD", "HH"]).find_symmetric()
+    assert not flipped and res is spec
+    res = MotzkinSpecificationFinder(["UHDUD", "HH"]).auto_search()
+    assert isinstance(res, CombinatorialSpecification)
+    assert res.root == MotzkinPaths(["UHDUD", "HH"])
+    for n in range(8):
+        assert res.count_objects_of_size(n) == spec.count_objects_of_size(n)
+    # once its own specification is cached it is the one found
+    assert MotzkinSpecificationFinder(["UHDUD", "HH"]).find_symmetric() == (res, False)
+
+
+def test_sweep_records_symmetric_to(spec_cache, tmp_path):
+    MotzkinSpecificationFinder(["UDUHD", "HH"]).auto_search()
+    record = _search(("HH", "UHDUD"), 6, False)
+    assert record["symmetric_to"] == ["HH", "UDUHD"]
+    spec = spec_cache.get(MotzkinPaths(["UDUHD", "HH"]))
+    assert record["spec"] == spec.to_jsonable()
+    assert record["counts"] == MotzkinPaths(["UHDUD", "HH"]).terms(5)
+
+    output = str(tmp_path / "results.jsonl")
+    run_sweep([["UHDUD", "HH"], ["UDUHD", "HH"]], output, processes=1, terms=6)
+    with open(output) as f:
+        records = {tuple(r["patterns"]): r for r in map(json.loads, f)}
+    # the first set is searched, and answered by the spec of the second
+    searched = records[("HH", "UHDUD")]
+    assert searched["symmetric_to"] == ["HH", "UDUHD"]
+    assert MotzkinPaths.from_dict(searched["spec"]["root"]) == spec.root
+    derived = records[("HH", "UDUHD")]
+    assert derived["symmetric_to"] == ["HH", "UHDUD"]
+    assert "spec" not in derived
+    assert derived["counts"] == record["counts"]
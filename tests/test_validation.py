@@ -0,0 +1,43 @@
+import pytest
+
+from motzkin.sweep import read_results
+from motzkin.validation import main, patterns_of_length, run_validation
+
+
+def test_patterns_of_length():
+    assert len(list(patterns_of_length(3))) == 27
+    assert [str(p) for p in patterns_of_length(4, motzkin_paths=True)] == [
+        "UUDD",
+        "UDUD",
+        "UDHH",
+        "UHDH",
+        "UHHD",
+        "HUDH",
+        "HUHD",
+        "HHUD",
+        "HHHH",
+    ]
+
+
+def test_run_validation(tmp_path):
+    output = str(tmp_path / "results.jsonl")
+    patterns = ["UD", "H", "UHD", "DU", "UD"]
+    assert run_validation(patterns, output, processes=2) == {"match": 4}
+    results = read_results(output)
+    assert results[("UHD",)]["counts"] == results[("UHD",)]["recurrence"]
+    assert results[("UHD",)]["method"] == "count"
+    assert run_validation(patterns, output) == {}
+    assert run_validation(["UHD", "HH"], output, method="spec") == {"match": 2}
+    assert read_results(output)[("UHD",)]["method"] == "spec"
+    with pytest.raises(ValueError):
+        run_validation(patterns, output, method="guess")
+
+
+def test_main(tmp_path, capsys):
+    output = str(tmp_path / "results.jsonl")
+    main([output, "--up-to", "2", "--terms", "8"])
+    assert capsys.readouterr().out.splitlines() == ["12 match"]
+    main([output, "--up-to", "2"])
+    assert capsys.readouterr().out.splitlines() == [
+        "Every pattern already has a result."
+    ]